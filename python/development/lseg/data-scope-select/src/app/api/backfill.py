@@ -0,0 +1,239 @@
+import os
+import gzip
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+import requests
+from app.api.client import DataScopeClient
+from app.core.logger import get_logger
+from app.utils.file_handler import open_decompressed
+
+logger = get_logger(__name__)
+
+
+def plan_windows(start_date: str, end_date: str, window_days: int) -> List[Tuple[str, str]]:
+    """
+    期間を指定した日数ごとの区間に分割する
+
+    Args:
+        start_date (str): 開始日（YYYY-MM-DD形式）
+        end_date (str): 終了日（YYYY-MM-DD形式。この日を含む）
+        window_days (int): 1区間の日数
+
+    Returns:
+        List[Tuple[str, str]]: (開始日, 終了日) の昇順のリスト。各区間は重複せず、終了日を含む
+
+    Raises:
+        ValueError: 日付の形式が不正、開始日が終了日より後、または window_days が1未満の場合
+    """
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    if start > end:
+        raise ValueError(f"開始日が終了日より後になっています: {start_date} ～ {end_date}")
+    if window_days < 1:
+        raise ValueError(f"区間の日数には1以上を指定してください: {window_days}")
+
+    windows = []
+    while start <= end:
+        window_end = min(start + timedelta(days=window_days - 1), end)
+        windows.append((start.isoformat(), window_end.isoformat()))
+        start = window_end + timedelta(days=1)
+    return windows
+
+
+class HistoricalBackfill:
+    """
+    期間を分割したHistorical抽出（バックフィル）
+
+    長期間の抽出を1つのスケジュールで行うと、抽出に長時間かかり、失敗した場合は全体をやり直すことになります。
+    このクラスは期間を backfill.window_days ごとの区間に分割し、区間ごとのスケジュールを
+    最大 backfill.max_workers 並列で実行します。リクエストはクライアントのレートリミッターを共有します。
+
+    区間ごとの進捗（スケジュールID、ダウンロード済みのファイル）を状態ファイルに記録するため、
+    中断・一部失敗した場合は再実行すると未完了の区間のみを処理します。
+    すべての区間が完了したら、区間のファイルを日付順に連結して1つのファイルにします。
+    """
+
+    def __init__(
+        self,
+        client: DataScopeClient,
+        list_id: str,
+        report_template_id: str,
+        name: str,
+        work_dir: str = None,
+        window_days: int = None,
+        max_workers: int = None
+    ):
+        """
+        Args:
+            client (DataScopeClient): 認証済みのクライアント
+            list_id (str): 銘柄リストのID
+            report_template_id (str): レポートテンプレートのID
+            name (str): バックフィルの名前（スケジュール名・状態ファイル名に使用）
+            work_dir (str, optional): 状態ファイルと区間ごとのファイルの保存先。未指定の場合は backfill.work_dir の値
+            window_days (int, optional): 1区間の日数。未指定の場合は backfill.window_days の値
+            max_workers (int, optional): 同時に実行するスケジュール数。未指定の場合は backfill.max_workers の値
+        """
+        backfill_config = client.config.get('backfill', {})
+        self.client = client
+        self.list_id = list_id
+        self.report_template_id = report_template_id
+        self.name = name
+        self.window_days = window_days or backfill_config.get('window_days', 90)
+        self.max_workers = max_workers or backfill_config.get('max_workers', 4)
+        self.work_dir = os.path.join(work_dir or backfill_config.get('work_dir', 'output/backfill'), name)
+        self.state_path = os.path.join(self.work_dir, 'state.json')
+        self._lock = threading.Lock()
+
+    def run(self, start_date: str, end_date: str, output_path: str) -> List[Dict]:
+        """
+        バックフィルを実行し、結果を1つのファイルに連結する
+
+        Args:
+            start_date (str): 開始日（YYYY-MM-DD形式）
+            end_date (str): 終了日（YYYY-MM-DD形式。この日を含む）
+            output_path (str): 連結したファイルの保存先
+
+        Returns:
+            List[Dict]: 区間ごとの状態（start, end, status, schedule_id, path, error）の日付順のリスト。
+                1つでも status が 'completed' でない区間がある場合、ファイルは連結しません
+
+        Raises:
+            ValueError: 期間の指定が不正な場合
+            IOError: ファイルの読み書き失敗時
+        """
+        windows = plan_windows(start_date, end_date, self.window_days)
+        state = self._load_state()
+        pending = [window for window in windows if self._window_state(state, window).get('status') != 'completed']
+        logger.info(
+            f"バックフィル '{self.name}'（{start_date} ～ {end_date}）: {len(windows)} 区間のうち "
+            f"{len(pending)} 区間を最大 {self.max_workers} 並列で抽出します"
+        )
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(pending)))) as executor:
+                list(executor.map(lambda window: self._run_window(state, window), pending))
+
+        results = [{'start': start, 'end': end, **self._window_state(state, (start, end))} for start, end in windows]
+        failed = [result for result in results if result.get('status') != 'completed']
+        if failed:
+            logger.error(f"{len(failed)} 区間の抽出が完了していないため、ファイルを連結しません。再実行すると未完了の区間から再開します")
+            return results
+
+        self._merge([result['path'] for result in results], output_path)
+        return results
+
+    def _run_window(self, state: Dict, window: Tuple[str, str]) -> None:
+        """1区間のスケジュールを作成（または前回のスケジュールを再利用）し、抽出結果をダウンロードする"""
+        start, end = window
+        window_state = self._window_state(state, window)
+        window_path = os.path.join(self.work_dir, f"{start}_{end}.csv.gz")
+        try:
+            schedule_id = window_state.get('schedule_id')
+            status = None
+            if schedule_id:
+                logger.info(f"区間 {start} ～ {end} は前回のスケジュール {schedule_id} の結果を確認します")
+                try:
+                    status = self.client.wait_for_extraction(schedule_id)
+                except requests.exceptions.HTTPError as e:
+                    if e.response is None or e.response.status_code != 404:
+                        raise
+                    logger.warning(f"スケジュール {schedule_id} が存在しないため作り直します")
+                    schedule_id = None
+
+            if not schedule_id:
+                schedule_id = self.client.create_schedule(
+                    f"{self.name}_{start}_{end}", self.list_id, self.report_template_id,
+                    'Historical', start_date=start, end_date=end, immediate=True
+                )
+                self._update_window(state, window, status='submitted', schedule_id=schedule_id)
+                status = self.client.wait_for_extraction(schedule_id)
+
+            if status.get('State', status.get('Status')) != 'Completed':
+                # 失敗したスケジュールは再利用しない（サーバーから削除し、再実行時に作り直す）
+                self._delete_schedule(schedule_id)
+                self._update_window(state, window, status='failed', schedule_id=None, error=str(status))
+                logger.error(f"区間 {start} ～ {end} の抽出に失敗しました: {status}")
+                return
+
+            self.client.download_extracted_file(status['Result']['FileId'], window_path)
+            self._update_window(state, window, status='completed', path=window_path, error=None)
+            logger.info(f"区間 {start} ～ {end} の抽出が完了しました")
+            self._delete_schedule(schedule_id)
+
+        except (requests.exceptions.RequestException, TimeoutError, IOError, ValueError) as e:
+            self._update_window(state, window, status='failed', error=str(e))
+            logger.error(f"区間 {start} ～ {end} の抽出中にエラーが発生しました: {str(e)}")
+
+    def _delete_schedule(self, schedule_id: str) -> None:
+        """完了・失敗した区間のスケジュールを削除する（削除に失敗しても処理は続行）"""
+        try:
+            self.client.delete_schedule(schedule_id)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"スケジュール {schedule_id} の削除に失敗しました: {str(e)}")
+
+    def _merge(self, paths: List[str], output_path: str) -> None:
+        """
+        区間ごとのファイルを日付順に連結する
+
+        各ファイルはgzip圧縮の有無を判定して展開し、2つ目以降のファイルのヘッダー行を除いて
+        CSVとして連結します。output_path の拡張子が .gz の場合はgzip圧縮して保存します。
+        """
+        logger.info(f"{len(paths)} 区間のファイルを連結します: {output_path}")
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        temp_file_path = f"{output_path}.tmp"
+        try:
+            open_output = gzip.open if output_path.endswith('.gz') else open
+            with open_output(temp_file_path, 'wb') as output:
+                for index, path in enumerate(paths):
+                    with open(path, 'rb') as f:
+                        stream = open_decompressed(f)
+                        header = stream.readline()
+                        if index == 0:
+                            output.write(header)
+                        last = header[-1:]
+                        for chunk in iter(lambda: stream.read(1024 * 1024), b''):
+                            output.write(chunk)
+                            last = chunk[-1:]
+                        # 末尾に改行がないファイルの最終行が次の区間の行と連結されないようにする
+                        if last and last != b'\n':
+                            output.write(b'\n')
+            os.replace(temp_file_path, output_path)
+        except Exception:
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+            raise
+        logger.info(f"連結したファイルを保存しました: {output_path}")
+
+    def _window_state(self, state: Dict, window: Tuple[str, str]) -> Dict:
+        with self._lock:
+            return dict(state['windows'].get(f"{window[0]}_{window[1]}", {}))
+
+    def _update_window(self, state: Dict, window: Tuple[str, str], **values) -> None:
+        """区間の状態を更新して状態ファイルに書き込む"""
+        with self._lock:
+            state['windows'].setdefault(f"{window[0]}_{window[1]}", {}).update(values)
+            self._save_state(state)
+
+    def _load_state(self) -> Dict:
+        """状態ファイルを読み込む（存在しない場合は空の状態）"""
+        if not os.path.exists(self.state_path):
+            return {'windows': {}}
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        # 完了済みでもファイルが削除されている区間は再取得する
+        for window_state in state['windows'].values():
+            if window_state.get('status') == 'completed' and not os.path.exists(window_state.get('path', '')):
+                window_state['status'] = 'pending'
+        return state
+
+    def _save_state(self, state: Dict) -> None:
+        """状態ファイルを書き込む（別名で書き込んでから置き換える）"""
+        os.makedirs(self.work_dir, exist_ok=True)
+        with open(f"{self.state_path}.new", 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(f"{self.state_path}.new", self.state_path)
@@ -1,13 +1,34 @@
 import os
+import io
+import json
+import time
+import uuid
+import email
+import random
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote, urlencode
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from typing import List, Dict, Optional
+from typing import BinaryIO, Iterator, List, Dict, Optional, Tuple, Any
 from app.core.config import get_connection_config
 from app.core.logger import get_logger
+from app.utils.cache import IdCache, TokenCache
+from app.utils.json_stream import iter_odata_values
+from app.utils.metrics import ClientMetrics, InstrumentationHooks, endpoint_of
+from app.utils.rate_limiter import TokenBucket
 
 logger = get_logger(__name__)
 
+
+class _RangeNotSupportedError(Exception):
+    """分割ダウンロードの区間の要求に、サーバーが部分レスポンス（206）を返さなかった場合の例外"""
+
+
 class DataScopeClient:
     """
     DataScope Select APIクライアント
@@ -26,9 +47,25 @@ class DataScopeClient:
     - proxies: プロキシ設定（必要な場合）
     - headers: HTTPヘッダー設定
     - retry: リトライ設定
+    - rate_limit: レート制限設定（任意。通常リクエストの送信レート、プロセス間での共有）
+    - data_availability: データ提供時刻に合わせた抽出の設定（任意。グループ化の単位、待機の余裕など）
     - polling: ポーリング設定
+    - batch: OData $batch の設定（任意。準備段階のリクエストをまとめて送信するかどうか）
+    - download: ダウンロード設定（任意。分割ダウンロードの同時接続数など）
+    - cache: キャッシュ設定（任意。名前→IDキャッシュ・認証トークンの保存先と有効期間）
+    - metrics: 計測設定（任意。リクエストの計測値を集計するかどうかと、出力先）
     """
 
+    # コレクション名 → (IDのフィールド名, ログ出力用の種類名)
+    _OBJECT_KINDS = {
+        'InstrumentLists': ('ListId', '銘柄リスト'),
+        'ReportTemplates': ('ReportTemplateId', 'レポートテンプレート'),
+        'Schedules': ('ScheduleId', 'スケジュール'),
+    }
+
+    # 5xxの応答でリトライするHTTPメソッド（サーバーで処理済みの場合に再送信しても結果が変わらないもの）
+    _IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'})
+
     def __init__(self):
         """
         クライアントの初期化
@@ -41,11 +78,66 @@ class DataScopeClient:
         self.base_url = self.config['api']['base_url']
         self.headers = self.config['headers']
         self.polling_config = self.config['polling']
+        self.download_config = self.config.get('download', {})
         self.session = self._init_session()
         self.token = None
-        self._rate_limiter = self._init_rate_limiter()
+        self._batch_enabled = self.config.get('batch', {}).get('enabled', True)
+        self._rate_limiter, self._retry_limiter = self._init_rate_limiter()
+        cache_config = self.config.get('cache', {})
+        self._id_cache = IdCache(
+            os.path.join(cache_config.get('dir', 'output/cache'), 'id_cache.json'),
+            cache_config.get('id_ttl_seconds', 86400)
+        )
+        self._token_cache = TokenCache(
+            os.path.join(cache_config.get('dir', 'output/cache'), 'token.json'),
+            f"{self.base_url}|{self.config['api']['username']}"
+        )
+        self._hooks: List[InstrumentationHooks] = []
+        self.metrics = None
+        if self.config.get('metrics', {}).get('enabled', False):
+            self.metrics = ClientMetrics()
+            self.add_instrumentation_hook(self.metrics)
         logger.info("DataScopeClientを初期化しました")
 
+    def add_instrumentation_hook(self, hook: InstrumentationHooks) -> None:
+        """
+        計測用のフックを登録する
+
+        登録したフックは、リクエストの送信・リトライ・データの受信・レートリミッターによる待機のたびに
+        呼び出されます（InstrumentationHooks を参照）。
+
+        Args:
+            hook (InstrumentationHooks): 登録するフック
+        """
+        self._hooks.append(hook)
+
+    def _emit(self, event: str, *args) -> None:
+        """登録されたフックの event メソッドを呼び出す（フックの例外はリクエストの処理に影響させない）"""
+        for hook in self._hooks:
+            try:
+                getattr(hook, event)(*args)
+            except Exception as e:
+                logger.warning(f"計測用フック {type(hook).__name__}.{event} でエラーが発生しました: {str(e)}")
+
+    def export_metrics(self) -> None:
+        """
+        集計した計測値をファイルに出力する
+
+        metrics.enabled が true の場合のみ、metrics.prometheus_path に Prometheus のテキスト形式、
+        metrics.summary_path に JSON のサマリーを出力します。
+        出力に失敗した場合はログに記録し、例外は送出しません。
+        """
+        if not self.metrics:
+            return
+        metrics_config = self.config.get('metrics', {})
+        try:
+            if metrics_config.get('prometheus_path'):
+                self.metrics.write_prometheus(metrics_config['prometheus_path'])
+            if metrics_config.get('summary_path'):
+                self.metrics.write_summary(metrics_config['summary_path'])
+        except OSError as e:
+            logger.warning(f"計測結果の出力に失敗しました: {str(e)}")
+
     def _init_session(self):
         """
         HTTPセッションを初期化する
@@ -61,13 +153,15 @@ class DataScopeClient:
         """
         session = requests.Session()
         
-        # リトライ戦略の設定
+        # リトライ戦略の設定（接続エラーのみ。5xxのリトライはリトライ用のレート制限を適用するため _send で行う）
         retry_strategy = Retry(
             total=self.config['retry']['max_attempts'],
-            backoff_factor=self.config['retry']['backoff_factor'],
-            status_forcelist=self.config['retry']['status_forcelist']
+            backoff_factor=self.config['retry']['backoff_factor']
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        # 分割ダウンロードの同時接続数・同時ダウンロードファイル数に合わせてコネクションプールを確保
+        download_config = self.config.get('download', {})
+        pool_size = max(10, download_config.get('parallel_connections', 1) * download_config.get('parallel_files', 1))
+        adapter = HTTPAdapter(max_retries=retry_strategy, pool_maxsize=pool_size)
         session.mount('http://', adapter)
         session.mount('https://', adapter)
         
@@ -83,59 +177,48 @@ class DataScopeClient:
         
         return session
 
-    def _init_rate_limiter(self):
+    def _init_rate_limiter(self) -> Tuple[TokenBucket, TokenBucket]:
         """
         レートリミッターを初期化する
 
-        APIリクエストの頻度を制御するためのレートリミッターを設定します。
-        設定された時間枠内でのリクエスト数を制限し、API利用制限を超えないようにします。
+        APIリクエストの頻度を制御するため、通常のリクエスト用とリトライ用の
+        2つのトークンバケットを作成します。
+        - 通常のリクエスト: rate_limit.requests_per_second のレートで、最大 rate_limit.burst 件まで連続送信
+        - 5xxエラーのリトライ: 1分あたり retry.max_retries_per_minute 回まで
+          ※DSSのベストプラクティスでは、502以上のエラーに対して「1分あたり3回以下、最大10回まで」のリトライを推奨しています
+        rate_limit.shared_state_dir を指定した場合は、同じディレクトリを指定したプロセス間でバジェットを共有します。
 
         Returns:
-            RateLimiter: レートリミッターオブジェクト
+            Tuple[TokenBucket, TokenBucket]: (通常のリクエスト用, リトライ用) のレートリミッター
         """
-        from datetime import datetime, timedelta
-        
-        class RateLimiter:
-            def __init__(self, max_retries_per_minute):
-                """
-                Args:
-                    max_retries_per_minute (int): 1分あたりの最大リトライ回数
-                    ※DSSのベストプラクティスでは、502以上のエラーに対して「1分あたり3回以下、最大10回まで」のリトライを推奨しています
-
-                """
-                self.max_retries = max_retries_per_minute
-                self.retry_times = []
-            
-            def can_retry(self):
-                """
-                現在リトライ可能かどうかを判定する
-
-                Returns:
-                    bool: リトライ可能な場合はTrue
-                """
-                now = datetime.now()
-                # 1分以上前のリトライ記録を削除
-                self.retry_times = [t for t in self.retry_times if now - t < timedelta(minutes=1)]
-                return len(self.retry_times) < self.max_retries
-            
-            def add_retry(self):
-                """リトライ実行を記録する"""
-                self.retry_times.append(datetime.now())
-        
-        return RateLimiter(self.config['retry']['max_retries_per_minute'])
+        rate_limit_config = self.config.get('rate_limit', {})
+        shared_state_dir = rate_limit_config.get('shared_state_dir')
+        request_state_path = os.path.join(shared_state_dir, 'rate_limit_requests.json') if shared_state_dir else None
+        retry_state_path = os.path.join(shared_state_dir, 'rate_limit_retries.json') if shared_state_dir else None
+
+        max_retries_per_minute = self.config['retry']['max_retries_per_minute']
+        request_limiter = TokenBucket(
+            rate_limit_config.get('requests_per_second', 10),
+            rate_limit_config.get('burst', 20),
+            request_state_path
+        )
+        retry_limiter = TokenBucket(max_retries_per_minute / 60, max_retries_per_minute, retry_state_path)
+        return request_limiter, retry_limiter
 
     def _request(self, method: str, path: str, **kwargs) -> requests.Response:
         """
         共通のリクエスト処理を行う
 
-        - レートリミットのチェック
+        - レートリミットによる送信待機
         - リクエストの実行
+        - サーバーエラー（冪等なリクエストの5xx・429）時のリトライ
+        - 認証トークン失効時（401）の再認証と再実行
         - エラーハンドリング
         を一元的に管理します。
 
         Args:
             method (str): HTTPメソッド（GET, POST, etc.）
-            path (str): APIエンドポイントのパス
+            path (str): APIエンドポイントのパス（@odata.nextLink などの絶対URLも可）
             **kwargs: requestsライブラリに渡す追加のパラメータ
 
         Returns:
@@ -144,32 +227,400 @@ class DataScopeClient:
         Raises:
             requests.exceptions.RequestException: リクエスト失敗時
         """
-        url = f"{self.base_url}/{path}"
+        url = path if path.startswith(('http://', 'https://')) else f"{self.base_url}/{path}"
         logger.debug(f"リクエスト実行: {method} {url}")
         
         try:
-            # レートリミットのチェック
-            if not self._rate_limiter.can_retry():
-                logger.warning("レートリミットに到達しました。待機が必要です。")
-                # ここで必要に応じて待機ロジックを実装可能
-            
-            response = self.session.request(method, url, headers=self.headers, **kwargs)
+            response = self._send(method, url, **kwargs)
             response.raise_for_status()
-            
-            # 成功時はリトライカウントを更新
-            self._rate_limiter.add_retry()
             return response
             
         except requests.exceptions.RequestException as e:
             logger.error(f"リクエストが失敗しました: {str(e)}")
+            if e.response is not None and e.response.status_code == 404:
+                # キャッシュしたIDのオブジェクトが削除されている場合は次回取得し直す
+                self._id_cache.invalidate_path(path)
             raise
 
-    def get_auth_token(self) -> str:
+    def _send(
+        self,
+        method: str,
+        url: str,
+        extra_headers: Dict[str, str] = None,
+        idempotent: bool = None,
+        **kwargs
+    ) -> requests.Response:
+        """
+        レート制限・リトライ・再認証を適用してリクエストを送信する
+
+        通常のリクエストは通常用のレートリミッターで送信間隔を調整します。
+        429（未処理）が返された場合と、冪等なリクエストに retry.status_forcelist のステータスが返された場合は、
+        リトライ用のレートリミッターの範囲内で最大 retry.max_attempts 回（上限10回）リトライします
+        （Retry-After があればそれ以上待機）。POST・PATCH はサーバーで処理済みの可能性があり、
+        再送信するとスケジュールの重複作成や抽出の重複実行になるため、5xxの応答をそのまま返します。
+        401が返された場合は一度だけ再認証して再送信します。
+        ステータスコードによる例外は送出しないため、呼び出し側で raise_for_status を行ってください。
+        各送信の応答時間・ステータスコード、リトライ、レートリミッターによる待機時間、
+        ストリーミングでない応答の本文のサイズを計測用のフックに通知します。
+
+        Args:
+            method (str): HTTPメソッド
+            url (str): リクエストURL
+            extra_headers (Dict[str, str], optional): 共通ヘッダーに追加するヘッダー（Range など）
+            idempotent (bool, optional): 再送信しても安全なリクエストかどうか。
+                未指定の場合は GET, HEAD, PUT, DELETE, OPTIONS のみ冪等として扱う
+            **kwargs: requestsライブラリに渡す追加のパラメータ
+
+        Returns:
+            requests.Response: 最後に受信したレスポンス
+
+        Raises:
+            requests.exceptions.RequestException: 通信失敗時
+        """
+        retry_config = self.config['retry']
+        retry_limit = min(retry_config['max_attempts'], 10)
+        if idempotent is None:
+            idempotent = method.upper() in self._IDEMPOTENT_METHODS
+        retry_statuses = (set(retry_config['status_forcelist']) | {429}) if idempotent else {429}
+
+        endpoint = endpoint_of(url)
+
+        def send() -> requests.Response:
+            # 再認証後のトークンを反映するため、送信のたびにヘッダーを組み立てる
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, headers={**self.headers, **(extra_headers or {})}, **kwargs)
+            except requests.exceptions.RequestException:
+                self._emit('on_request', method, endpoint, 0, time.monotonic() - started)
+                raise
+            self._emit('on_request', method, endpoint, response.status_code, time.monotonic() - started)
+            if not kwargs.get('stream'):
+                self._emit('on_bytes_received', method, endpoint, len(response.content))
+            return response
+
+        def acquire(limiter: TokenBucket, name: str) -> float:
+            waited = limiter.acquire()
+            if waited:
+                self._emit('on_rate_limit_wait', name, waited)
+            return waited
+
+        acquire(self._rate_limiter, 'requests')
+        used_token = self.token
+        response = send()
+        if response.status_code == 401 and used_token and not url.endswith('Authentication/RequestToken'):
+            # トークンが失効している場合は一度だけ再認証してリクエストを再実行する
+            logger.warning("認証トークンが無効です。再認証してリクエストを再実行します")
+            response.close()
+            self.get_auth_token(invalid_token=used_token)
+            acquire(self._rate_limiter, 'requests')
+            response = send()
+
+        retry_count = 0
+        while response.status_code in retry_statuses and retry_count < retry_limit:
+            retry_count += 1
+            retry_after = self._parse_retry_after(response.headers.get('Retry-After')) or 0
+            response.close()
+            self._emit('on_retry', method, endpoint, response.status_code, retry_count)
+            waited = acquire(self._retry_limiter, 'retries')
+            delay = max(retry_config['backoff_factor'] * 2 ** (retry_count - 1) - waited, retry_after - waited, 0)
+            logger.warning(
+                f"ステータス {response.status_code} が返されたため、リトライします"
+                f"（{retry_count}/{retry_limit}、{waited + delay:.1f}秒待機）"
+            )
+            time.sleep(delay)
+            response = send()
+        return response
+
+    def _iter_collection(self, path: str, params: Dict[str, str] = None) -> Iterator[Dict]:
+        """
+        コレクションの要素を順に取得する
+
+        各ページの応答は全体を読み込まずに逐次解析し、要素を1件ずつ返します。
+        レスポンスに @odata.nextLink が含まれる場合は、次のページを続けて取得します。
+        途中で読むのをやめた場合、残りのページは取得しません。
+
+        Args:
+            path (str): コレクションのパス
+            params (Dict[str, str], optional): クエリパラメータ（$filter, $select など）
+
+        Yields:
+            Dict: コレクションの各要素
+
+        Raises:
+            requests.exceptions.RequestException: API呼び出し失敗時
+        """
+        next_path = path
+        while next_path:
+            metadata = {}
+            with self._request('GET', next_path, params=params, stream=True) as response:
+                chunks = self._count_received('GET', next_path, response.iter_content(chunk_size=65536))
+                yield from iter_odata_values(chunks, metadata)
+            # nextLink には元のクエリが含まれるため、2ページ目以降はパラメータを付けない
+            next_path = metadata.get('@odata.nextLink')
+            params = None
+
+    def _find_id_by_name(self, kind: str, id_field: str, name: str, label: str) -> Optional[str]:
+        """
+        名前を指定してオブジェクトのIDを取得する
+
+        有効期間内のキャッシュがあればそれを返し、なければ OData の $filter と $select で
+        該当するオブジェクトのみを取得します。サーバーが $filter に対応していない場合は
+        一覧全体を（@odata.nextLink をたどって）取得して検索します。
+
+        Args:
+            kind (str): コレクション名（'InstrumentLists', 'ReportTemplates', 'Schedules'）
+            id_field (str): IDのフィールド名（'ListId' など）
+            name (str): 検索する名前
+            label (str): ログ出力用の種類名
+
+        Returns:
+            Optional[str]: オブジェクトのID。存在しない場合はNone
+
+        Raises:
+            requests.exceptions.RequestException: API呼び出し失敗時
+        """
+        logger.info(f"{label} '{name}' のIDを検索します")
+        object_id = self._id_cache.get(kind, name)
+        if object_id:
+            logger.info(f"{label} '{name}' のIDをキャッシュから取得しました: {object_id}")
+            return object_id
+
+        path = f"Extractions/{kind}"
+        params = self._name_filter_params(name, id_field)
+        try:
+            items = self._iter_collection(path, params)
+            item = next((item for item in items if item['Name'] == name), None)
+        except requests.exceptions.HTTPError as e:
+            if e.response is None or e.response.status_code not in (400, 501):
+                raise
+            logger.warning(f"$filter による検索に失敗したため、{label}の一覧から検索します")
+            item = next((item for item in self._iter_collection(path) if item['Name'] == name), None)
+
+        if item is None:
+            logger.warning(f"{label} '{name}' は存在しません")
+            return None
+
+        object_id = item[id_field]
+        self._id_cache.set(kind, name, object_id)
+        logger.info(f"{label} '{name}' のIDを発見: {object_id}")
+        return object_id
+
+    @staticmethod
+    def _name_filter_params(name: str, id_field: str) -> Dict[str, str]:
+        """名前で検索するための $filter・$select のクエリパラメータを作成する"""
+        escaped_name = name.replace("'", "''")
+        return {'$filter': f"Name eq '{escaped_name}'", '$select': f"{id_field},Name"}
+
+    def execute_batch(self, operations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        複数の操作を OData の $batch リクエストとしてまとめて送信する
+
+        各操作を multipart/mixed の1つのリクエストで送信し、操作ごとの応答を解析して返します。
+        GET 以外の操作は、それぞれ1つの変更セット（changeset）として送信します。
+        操作は記載した順に実行されます。
+        サーバーが $batch に対応していない場合（400, 404, 405, 501）や batch.enabled が false の場合は、
+        各操作を個別のリクエストとして順に送信します（結果の形式は同じ）。
+
+        Args:
+            operations (List[Dict[str, Any]]): 操作のリスト。各操作は以下のキーを持つ辞書
+                - method (str): HTTPメソッド（'GET', 'PATCH' など）
+                - path (str): APIエンドポイントのパス
+                - params (Dict[str, str], optional): クエリパラメータ
+                - json (Any, optional): リクエスト本文
+
+        Returns:
+            List[Dict[str, Any]]: 操作と同じ順の応答のリスト。各応答は以下のキーを持つ辞書
+                - status (int): ステータスコード
+                - headers (Dict[str, str]): レスポンスヘッダー
+                - body (Any): JSONとして解析した本文（本文がない場合はNone）
+            個々の操作のエラーは例外ではなく status で返します
+
+        Raises:
+            requests.exceptions.RequestException: $batch リクエスト自体の失敗時
+        """
+        if len(operations) > 1 and self._batch_enabled:
+            boundary = f"batch_{uuid.uuid4().hex}"
+            logger.info(f"{len(operations)} 件の操作を $batch リクエストで送信します")
+            try:
+                response = self._request(
+                    'POST', '$batch',
+                    data=self._build_batch_body(operations, boundary),
+                    extra_headers={'Content-Type': f"multipart/mixed; boundary={boundary}"},
+                    # 参照のみの $batch は再送信しても安全
+                    idempotent=all(operation['method'] == 'GET' for operation in operations)
+                )
+                results = self._parse_batch_response(response)
+                if len(results) == len(operations):
+                    return results
+                logger.warning(f"$batch の応答数が操作数と一致しません（{len(results)}/{len(operations)}）")
+            except requests.exceptions.HTTPError as e:
+                if e.response is None or e.response.status_code not in (400, 404, 405, 501):
+                    raise
+                logger.warning("サーバーが $batch に対応していないため、以降は操作を個別に送信します")
+            self._batch_enabled = False
+
+        return [self._execute_operation(operation) for operation in operations]
+
+    def _execute_operation(self, operation: Dict[str, Any]) -> Dict[str, Any]:
+        """1つの操作を個別のリクエストとして送信し、execute_batch と同じ形式の応答を返す"""
+        url = f"{self.base_url}/{operation['path']}"
+        response = self._send(operation['method'], url, params=operation.get('params'), json=operation.get('json'))
+        if response.status_code == 404:
+            self._id_cache.invalidate_path(operation['path'])
+        return self._to_batch_result(response.status_code, dict(response.headers), response.content)
+
+    @staticmethod
+    def _build_batch_body(operations: List[Dict[str, Any]], boundary: str) -> bytes:
+        """$batch リクエストの本文（multipart/mixed）を作成する"""
+        lines = []
+        for content_id, operation in enumerate(operations, start=1):
+            path = operation['path']
+            if operation.get('params'):
+                path = f"{path}?{urlencode(operation['params'], quote_via=quote)}"
+            request = [
+                'Content-Type: application/http',
+                'Content-Transfer-Encoding: binary',
+                f"Content-ID: {content_id}",
+                '',
+                f"{operation['method']} {path} HTTP/1.1",
+                'Accept: application/json',
+            ]
+            if operation.get('json') is not None:
+                request += ['Content-Type: application/json', '', json.dumps(operation['json'])]
+            else:
+                request += ['']
+
+            if operation['method'] == 'GET':
+                lines += [f"--{boundary}", *request]
+            else:
+                changeset = f"changeset_{uuid.uuid4().hex}"
+                lines += [
+                    f"--{boundary}",
+                    f"Content-Type: multipart/mixed; boundary={changeset}",
+                    '',
+                    f"--{changeset}",
+                    *request,
+                    f"--{changeset}--",
+                ]
+        lines += [f"--{boundary}--", '']
+        return '\r\n'.join(lines).encode('utf-8')
+
+    def _parse_batch_response(self, response: requests.Response) -> List[Dict[str, Any]]:
+        """$batch の応答（multipart/mixed）を操作ごとの応答に分割する（変更セット内の応答も順に展開）"""
+        message = email.message_from_bytes(
+            f"Content-Type: {response.headers.get('Content-Type', '')}\r\n\r\n".encode() + response.content
+        )
+        results = []
+        for part in message.walk():
+            if part.get_content_type() != 'application/http':
+                continue
+            head, _, body = part.get_payload(decode=True).replace(b'\r\n', b'\n').partition(b'\n\n')
+            status_line, *header_lines = head.decode('utf-8').split('\n')
+            headers = dict(line.split(':', 1) for line in header_lines if ':' in line)
+            headers = {key.strip(): value.strip() for key, value in headers.items()}
+            results.append(self._to_batch_result(int(status_line.split(' ')[1]), headers, body.strip()))
+        return results
+
+    @staticmethod
+    def _to_batch_result(status: int, headers: Dict[str, str], content: bytes) -> Dict[str, Any]:
+        body = None
+        if content:
+            try:
+                body = json.loads(content)
+            except ValueError:
+                body = content.decode('utf-8', errors='replace')
+        return {'status': status, 'headers': headers, 'body': body}
+
+    @staticmethod
+    def _raise_for_batch_result(result: Dict[str, Any], description: str) -> None:
+        """$batch の操作の応答がエラーの場合に例外を送出する"""
+        if result['status'] >= 400:
+            raise requests.exceptions.HTTPError(f"{description}に失敗しました（ステータス: {result['status']}）: {result['body']}")
+
+    def get_setup_state(self, list_name: str, template_name: str, schedule_name: str) -> Dict[str, Any]:
+        """
+        抽出の準備に必要なオブジェクトのIDと、銘柄リストの内容を取得する
+
+        キャッシュにないIDの検索（銘柄リスト・レポートテンプレート・スケジュール）を
+        1回の $batch リクエストで行います。銘柄リストの内容は件数が多くなるため $batch には含めず、
+        逐次取得するイテレーターとして返します。
+
+        Args:
+            list_name (str): 銘柄リストの名前
+            template_name (str): レポートテンプレートの名前
+            schedule_name (str): スケジュールの名前
+
+        Returns:
+            Dict[str, Any]: 以下のキーを持つ辞書
+                - list_id (Optional[str]): 銘柄リストのID（存在しない場合はNone）
+                - template_id (Optional[str]): レポートテンプレートのID（存在しない場合はNone）
+                - schedule_id (Optional[str]): スケジュールのID（存在しない場合はNone）
+                - instruments (Optional[Iterator[str]]): 銘柄リストの銘柄を逐次取得するイテレーター
+                  （リストが存在しない場合はNone。読み進めた時点でリクエストします）
+
+        Raises:
+            requests.exceptions.RequestException: API呼び出し失敗時
+            ValueError: 検索結果の応答を解釈できない場合
+        """
+        names = {'InstrumentLists': list_name, 'ReportTemplates': template_name, 'Schedules': schedule_name}
+        ids = {kind: self._id_cache.get(kind, name) for kind, name in names.items()}
+        operations, lookups = [], []
+        for kind, name in names.items():
+            id_field, label = self._OBJECT_KINDS[kind]
+            if ids[kind]:
+                logger.info(f"{label} '{name}' のIDをキャッシュから取得しました: {ids[kind]}")
+                continue
+            operations.append({'method': 'GET', 'path': f"Extractions/{kind}", 'params': self._name_filter_params(name, id_field)})
+            lookups.append(kind)
+
+        results = self.execute_batch(operations)
+        for kind, result in zip(lookups, results):
+            ids[kind] = self._resolve_name_lookup(kind, names[kind], result)
+
+        list_id = ids['InstrumentLists']
+        return {
+            'list_id': list_id,
+            'template_id': ids['ReportTemplates'],
+            'schedule_id': ids['Schedules'],
+            'instruments': self.iter_instruments_in_list(list_id) if list_id else None,
+        }
+
+    def _resolve_name_lookup(self, kind: str, name: str, result: Dict[str, Any]) -> Optional[str]:
+        """$batch で検索した結果からIDを取得する（$filter 非対応・複数ページの場合は個別に検索し直す）"""
+        id_field, label = self._OBJECT_KINDS[kind]
+        if result['status'] in (400, 501):
+            return self._find_id_by_name(kind, id_field, name, label)
+        self._raise_for_batch_result(result, f"{label} '{name}' の検索")
+
+        body = result['body']
+        if result['status'] != 200 or not isinstance(body, dict) or not isinstance(body.get('value'), list):
+            raise ValueError(f"{label} '{name}' の検索結果を解釈できません（ステータス: {result['status']}）: {body!r}")
+        if body.get('@odata.nextLink'):
+            return self._find_id_by_name(kind, id_field, name, label)
+
+        item = next((item for item in body['value'] if isinstance(item, dict) and item.get('Name') == name), None)
+        if item is None:
+            logger.warning(f"{label} '{name}' は存在しません")
+            return None
+        if not item.get(id_field):
+            raise ValueError(f"{label} '{name}' の検索結果に {id_field} がありません（ステータス: {result['status']}）")
+        self._id_cache.set(kind, name, item[id_field])
+        logger.info(f"{label} '{name}' のIDを発見: {item[id_field]}")
+        return item[id_field]
+
+    def get_auth_token(self, invalid_token: Optional[str] = None) -> str:
         """
         認証トークンを取得する
 
-        APIにログインし、認証トークンを取得して、以降のリクエストで使用するために
-        ヘッダーに設定します。
+        キャッシュファイルに有効なトークンがあればそれを使用し、なければAPIにログインして
+        トークンを取得します。取得したトークンは有効期限とともにキャッシュファイルに保存し、
+        以降のリクエストで使用するためにヘッダーに設定します。
+        キャッシュの確認とログインはロック中に行うため、同時に起動した複数のプロセスが
+        それぞれログインすることはありません。
+
+        Args:
+            invalid_token (str, optional): 失効したトークン。キャッシュのトークンがこれと同じ場合は
+                再取得します（他のプロセス・スレッドが既に再取得していた場合はそのトークンを使用します）
 
         Returns:
             str: 取得した認証トークン
@@ -177,17 +628,29 @@ class DataScopeClient:
         Raises:
             requests.exceptions.RequestException: 認証失敗時
         """
-        login_data = {
-            "Credentials": {
-                "Password": self.config['api']['password'],
-                "Username": self.config['api']['username']
-            }
-        }
-        logger.info("認証トークンを取得します")
-        response = self._request('POST', 'Authentication/RequestToken', json=login_data)
-        self.token = response.json()['value']
+        cache_config = self.config.get('cache', {})
+        token_ttl = cache_config.get('token_ttl_seconds', 86400)
+        refresh_margin = cache_config.get('token_refresh_margin_seconds', 1800)
+
+        with self._token_cache.locked():
+            token = self._token_cache.get(min_remaining_seconds=refresh_margin)
+            if token and token != invalid_token:
+                logger.info("キャッシュ済みの認証トークンを使用します")
+            else:
+                login_data = {
+                    "Credentials": {
+                        "Password": self.config['api']['password'],
+                        "Username": self.config['api']['username']
+                    }
+                }
+                logger.info("認証トークンを取得します")
+                response = self._request('POST', 'Authentication/RequestToken', json=login_data, idempotent=True)
+                token = response.json()['value']
+                self._token_cache.set(token, time.time() + token_ttl)
+                logger.info("認証トークンを取得しました")
+
+        self.token = token
         self.headers['Authorization'] = f"Bearer {self.token}"
-        logger.info("認証トークンを取得しました")
         return self.token
 
     def create_instrument_list(self, name: str) -> str:
@@ -210,6 +673,7 @@ class DataScopeClient:
         logger.info(f"銘柄リスト '{name}' を作成します")
         response = self._request('POST', 'Extractions/InstrumentLists', json=instrument_list_data)
         list_id = response.json()['ListId']
+        self._id_cache.set('InstrumentLists', name, list_id)
         logger.info(f"銘柄リスト '{name}' (ID: {list_id}) を作成しました")
         return list_id
 
@@ -226,37 +690,122 @@ class DataScopeClient:
         Raises:
             requests.exceptions.RequestException: API呼び出し失敗時
         """
-        logger.info(f"銘柄リスト '{name}' のIDを検索します")
-        response = self._request('GET', 'Extractions/InstrumentLists')
-        for item in response.json()['value']:
-            if item['Name'] == name:
-                logger.info(f"銘柄リスト '{name}' のIDを発見: {item['ListId']}")
-                return item['ListId']
-        logger.warning(f"銘柄リスト '{name}' は存在しません")
-        return None
+        return self._find_id_by_name('InstrumentLists', 'ListId', name, '銘柄リスト')
 
-    def append_instruments(self, list_id: str, instruments: List[str]) -> None:
+    def append_instruments(
+        self,
+        list_id: str,
+        instruments: List[str],
+        batch_size: int = None,
+        max_workers: int = None
+    ) -> int:
         """
         銘柄リストに銘柄を追加する
 
+        銘柄数が多い場合は batch_size 件ずつに分割し、max_workers 件まで並列に送信します。
+
         Args:
             list_id (str): 銘柄リストのID
             instruments (List[str]): 追加する銘柄のリスト（RICコード）
+            batch_size (int, optional): 1回のリクエストで送信する銘柄数。
+                未指定の場合は instrument_list.batch_size の値
+            max_workers (int, optional): 同時に送信するリクエスト数。
+                未指定の場合は instrument_list.max_workers の値
+
+        Returns:
+            int: 追加された銘柄数（各リクエストの AppendedInstrumentCount の合計）
 
         Raises:
             requests.exceptions.RequestException: 銘柄追加失敗時
         """
-        instrument_list_data = {
-            "Identifiers": [{"Identifier": inst, "IdentifierType": "Ric"} for inst in instruments],
-            "KeepDuplicates": False
-        }
         logger.info(f"銘柄リスト {list_id} に {len(instruments)} 件の銘柄を追加します")
-        self._request(
-            'POST',
-            f"Extractions/InstrumentLists('{list_id}')/InstrumentListAppendIdentifiers",
-            json=instrument_list_data
-        )
-        logger.info("銘柄の追加が完了しました")
+
+        def append_chunk(chunk: List[str]) -> int:
+            instrument_list_data = {
+                "Identifiers": [{"Identifier": inst, "IdentifierType": "Ric"} for inst in chunk],
+                "KeepDuplicates": False
+            }
+            response = self._request(
+                'POST',
+                f"Extractions/InstrumentLists('{list_id}')/InstrumentListAppendIdentifiers",
+                json=instrument_list_data
+            )
+            return response.json().get('AppendResult', {}).get('AppendedInstrumentCount', 0)
+
+        appended_count = sum(self._run_in_chunks(append_chunk, instruments, batch_size, max_workers))
+        logger.info(f"銘柄の追加が完了しました（追加件数: {appended_count}）")
+        return appended_count
+
+    def remove_instruments(
+        self,
+        list_id: str,
+        instruments: List[str],
+        batch_size: int = None,
+        max_workers: int = None
+    ) -> None:
+        """
+        銘柄リストから銘柄を削除する
+
+        銘柄数が多い場合は batch_size 件ずつに分割し、max_workers 件まで並列に送信します。
+
+        Args:
+            list_id (str): 銘柄リストのID
+            instruments (List[str]): 削除する銘柄のリスト（RICコード）
+            batch_size (int, optional): 1回のリクエストで送信する銘柄数。
+                未指定の場合は instrument_list.batch_size の値
+            max_workers (int, optional): 同時に送信するリクエスト数。
+                未指定の場合は instrument_list.max_workers の値
+
+        Raises:
+            requests.exceptions.RequestException: 銘柄削除失敗時
+        """
+        logger.info(f"銘柄リスト {list_id} から {len(instruments)} 件の銘柄を削除します")
+
+        def remove_chunk(chunk: List[str]) -> None:
+            instrument_list_data = {
+                "Identifiers": [{"Identifier": inst, "IdentifierType": "Ric"} for inst in chunk]
+            }
+            self._request(
+                'POST',
+                f"Extractions/InstrumentLists('{list_id}')/InstrumentListRemoveIdentifiers",
+                json=instrument_list_data
+            )
+
+        self._run_in_chunks(remove_chunk, instruments, batch_size, max_workers)
+        logger.info("銘柄の削除が完了しました")
+
+    def _run_in_chunks(
+        self,
+        func: callable,
+        items: List[str],
+        batch_size: int = None,
+        max_workers: int = None
+    ) -> List:
+        """
+        リストを一定件数ごとに分割し、各チャンクに対して関数を並列に実行する
+
+        Args:
+            func (callable): チャンク（List[str]）を引数に取る関数
+            items (List[str]): 分割対象のリスト
+            batch_size (int, optional): 1チャンクあたりの件数。未指定の場合は instrument_list.batch_size の値
+            max_workers (int, optional): 同時実行数。未指定の場合は instrument_list.max_workers の値
+
+        Returns:
+            List: 各チャンクの実行結果（チャンクの順序を保持）
+
+        Raises:
+            Exception: いずれかのチャンクで発生した例外
+        """
+        list_config = self.config.get('instrument_list', {})
+        batch_size = batch_size or list_config.get('batch_size', 5000)
+        max_workers = max_workers or list_config.get('max_workers', 1)
+        chunks = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+        if len(chunks) <= 1 or max_workers <= 1:
+            return [func(chunk) for chunk in chunks]
+
+        logger.debug(f"{len(items)} 件を {len(chunks)} チャンクに分割し、{max_workers} 並列で送信します")
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            return list(executor.map(func, chunks))
 
     def create_report_template(self, name: str, content_fields: List[Dict[str, str]]) -> str:
         """
@@ -281,6 +830,7 @@ class DataScopeClient:
         logger.info(f"レポートテンプレート '{name}' を作成します")
         response = self._request('POST', 'Extractions/ReportTemplates', json=report_data)
         template_id = response.json()['ReportTemplateId']
+        self._id_cache.set('ReportTemplates', name, template_id)
         logger.info(f"レポートテンプレート '{name}' (ID: {template_id}) を作成しました")
         return template_id
 
@@ -297,32 +847,29 @@ class DataScopeClient:
         Raises:
             requests.exceptions.RequestException: API呼び出し失敗時
         """
-        logger.info(f"レポートテンプレート '{name}' のIDを検索します")
-        response = self._request('GET', 'Extractions/ReportTemplates')
-        for item in response.json()['value']:
-            if item['Name'] == name:
-                logger.info(f"レポートテンプレート '{name}' のIDを発見: {item['ReportTemplateId']}")
-                return item['ReportTemplateId']
-        logger.warning(f"レポートテンプレート '{name}' は存在しません")
-        return None
+        return self._find_id_by_name('ReportTemplates', 'ReportTemplateId', name, 'レポートテンプレート')
 
     def create_schedule(
         self,
+        name: str,
         list_id: str,
         report_template_id: str,
         extraction_type: str,
         start_date: str = None,
-        end_date: str = None
+        end_date: str = None,
+        immediate: bool = False
     ) -> str:
         """
         データ抽出スケジュールを作成する
 
         Args:
+            name (str): 作成するスケジュールの名前
             list_id (str): 銘柄リストのID
             report_template_id (str): レポートテンプレートのID
             extraction_type (str): 抽出タイプ（'EOD' または 'Historical'）
             start_date (str, optional): 開始日（YYYY-MM-DD形式）
             end_date (str, optional): 終了日（YYYY-MM-DD形式）
+            immediate (bool, optional): Trueの場合は作成後すぐに抽出を開始する（Historicalのみ）
 
         Returns:
             str: 作成されたスケジュールのID
@@ -331,10 +878,11 @@ class DataScopeClient:
             ValueError: 無効な抽出タイプまたは日付指定の場合
             requests.exceptions.RequestException: スケジュール作成失敗時
         """
-        logger.info(f"データ抽出スケジュールを作成します（タイプ: {extraction_type}）")
+        logger.info(f"データ抽出スケジュール '{name}' を作成します（タイプ: {extraction_type}）")
         
         if extraction_type == 'EOD':
             schedule_data = {
+                "Name": name,
                 "ListId": list_id,
                 "ReportTemplateId": report_template_id,
                 "Recurrence": {
@@ -356,12 +904,13 @@ class DataScopeClient:
                 raise ValueError(error_msg)
             
             schedule_data = {
+                "Name": name,
                 "ListId": list_id,
                 "ReportTemplateId": report_template_id,
                 "Recurrence": {
                     "@odata.type": "#DataScope.Select.Api.Extractions.Schedules.SingleRecurrence",
                     "ExtractionDateTime": f"{end_date}T00:00:00.000Z",
-                    "IsImmediate": False
+                    "IsImmediate": immediate
                 },
                 "Trigger": {
                     "@odata.type": "#DataScope.Select.Api.Extractions.Schedules.DateRangeTrigger",
@@ -378,9 +927,25 @@ class DataScopeClient:
 
         response = self._request('POST', 'Extractions/Schedules', json=schedule_data)
         schedule_id = response.json()['ScheduleId']
-        logger.info(f"データ抽出スケジュールを作成しました（ID: {schedule_id}）")
+        self._id_cache.set('Schedules', name, schedule_id)
+        logger.info(f"データ抽出スケジュール '{name}' を作成しました（ID: {schedule_id}）")
         return schedule_id
 
+    def delete_schedule(self, schedule_id: str) -> None:
+        """
+        データ抽出スケジュールを削除する
+
+        Args:
+            schedule_id (str): スケジュールのID
+
+        Raises:
+            requests.exceptions.RequestException: 削除失敗時
+        """
+        logger.info(f"スケジュール {schedule_id} を削除します")
+        self._request('DELETE', f"Extractions/Schedules('{schedule_id}')")
+        self._id_cache.invalidate_path(f"Extractions/Schedules('{schedule_id}')")
+        logger.info(f"スケジュール {schedule_id} を削除しました")
+
     def get_schedule_id(self, name: str) -> Optional[str]:
         """
         指定された名前のスケジュールのIDを取得する
@@ -394,33 +959,47 @@ class DataScopeClient:
         Raises:
             requests.exceptions.RequestException: API呼び出し失敗時
         """
-        logger.info(f"スケジュール '{name}' のIDを検索します")
-        response = self._request('GET', 'Extractions/Schedules')
-        for item in response.json()['value']:
-            if item['Name'] == name:
-                logger.info(f"スケジュール '{name}' のIDを発見: {item['ScheduleId']}")
-                return item['ScheduleId']
-        logger.warning(f"スケジュール '{name}' は存在しません")
-        return None
+        return self._find_id_by_name('Schedules', 'ScheduleId', name, 'スケジュール')
 
     def get_instruments_in_list(self, list_id: str) -> List[str]:
         """
         指定された銘柄リストに含まれる銘柄を取得する
 
+        銘柄数が多い場合は、リストを作らずに1件ずつ処理できる iter_instruments_in_list を使用してください。
+
         Args:
             list_id (str): 銘柄リストのID
 
         Returns:
             List[str]: 銘柄コード（RIC）のリスト
 
+        Raises:
+            requests.exceptions.RequestException: API呼び出し失敗時
+        """
+        return list(self.iter_instruments_in_list(list_id))
+
+    def iter_instruments_in_list(self, list_id: str) -> Iterator[str]:
+        """
+        指定された銘柄リストに含まれる銘柄を1件ずつ取得する
+
+        応答を逐次解析し、@odata.nextLink をたどって次のページを取得するため、
+        銘柄数に関わらず全体をメモリに載せません。
+
+        Args:
+            list_id (str): 銘柄リストのID
+
+        Yields:
+            str: 銘柄コード（RIC）
+
         Raises:
             requests.exceptions.RequestException: API呼び出し失敗時
         """
         logger.info(f"銘柄リスト {list_id} の内容を取得します")
-        response = self._request('GET', f"Extractions/InstrumentLists('{list_id}')/Identifiers")
-        instruments = [item['Identifier'] for item in response.json()['value']]
-        logger.info(f"銘柄リストから {len(instruments)} 件の銘柄を取得しました")
-        return instruments
+        count = 0
+        for item in self._iter_collection(f"Extractions/InstrumentLists('{list_id}')/Identifiers"):
+            count += 1
+            yield item['Identifier']
+        logger.info(f"銘柄リストから {count} 件の銘柄を取得しました")
 
     def update_schedule_trigger(self, schedule_id: str) -> None:
         """
@@ -442,7 +1021,8 @@ class DataScopeClient:
             }
         }
         logger.info(f"スケジュール {schedule_id} のトリガー設定を更新します")
-        self._request('PATCH', f"Extractions/Schedules('{schedule_id}')", json=schedule_data)
+        # 同じ値で上書きするため再送信しても安全
+        self._request('PATCH', f"Extractions/Schedules('{schedule_id}')", json=schedule_data, idempotent=True)
         logger.info("トリガー設定の更新が完了しました")
 
     def get_extraction_status(self, schedule_id: str) -> Dict:
@@ -470,20 +1050,594 @@ class DataScopeClient:
         logger.info(f"抽出状態: {status.get('Status', 'Unknown')}")
         return status
 
+    def wait_for_extraction(self, schedule_id: str, timeout: float = None) -> Dict:
+        """
+        データ抽出が終了するまで待機する
+
+        抽出状態をポーリングし、完了（Completed）または失敗（Failed）になった時点の状態を返します。
+        ポーリング間隔は polling の設定に従って短い間隔から徐々に延ばします。
+
+        Args:
+            schedule_id (str): スケジュールのID
+            timeout (float, optional): 全体の待機上限（秒）。未指定の場合は polling.timeout の値
+
+        Returns:
+            Dict: 終了時点の抽出状態の詳細情報
+
+        Raises:
+            TimeoutError: 待機上限までに抽出が終了しなかった場合
+            requests.exceptions.RequestException: API呼び出し失敗時
+        """
+        def check() -> Tuple[bool, Dict, Optional[float]]:
+            status = self.get_extraction_status(schedule_id)
+            state = status.get('State', status.get('Status'))
+            return state in ('Completed', 'Failed'), status, None
+
+        return self._poll(check, f"スケジュール {schedule_id} の抽出", timeout)
+
+    def _await_async_response(self, response: requests.Response, timeout: float = None) -> requests.Response:
+        """
+        非同期応答（202 Accepted）の結果を待機する
+
+        Prefer: respond-async を指定したリクエストに対してサーバーが202を返した場合、
+        Location ヘッダーのモニターURLを、202以外の応答が返るまでポーリングします。
+        202以外の応答はそのまま返します。
+
+        Args:
+            response (requests.Response): 元のリクエストの応答
+            timeout (float, optional): 全体の待機上限（秒）。未指定の場合は polling.timeout の値
+
+        Returns:
+            requests.Response: 処理完了後の応答
+
+        Raises:
+            ValueError: 202応答に Location ヘッダーがない場合
+            TimeoutError: 待機上限までに処理が完了しなかった場合
+            requests.exceptions.RequestException: API呼び出し失敗時
+        """
+        if response.status_code != 202:
+            return response
+
+        monitor_url = response.headers.get('Location')
+        if not monitor_url:
+            raise ValueError("非同期応答にモニターURL（Locationヘッダー）が含まれていません")
+        logger.info(f"非同期処理の完了を待機します: {monitor_url}")
+        retry_after = self._parse_retry_after(response.headers.get('Retry-After'))
+
+        def check() -> Tuple[bool, Optional[requests.Response], Optional[float]]:
+            monitor_response = self._request('GET', monitor_url)
+            if monitor_response.status_code == 202:
+                return False, None, self._parse_retry_after(monitor_response.headers.get('Retry-After'))
+            return True, monitor_response, None
+
+        return self._poll(check, "非同期処理", timeout, first_delay=retry_after)
+
+    def _poll(
+        self,
+        check: callable,
+        description: str,
+        timeout: float = None,
+        first_delay: float = None
+    ) -> Any:
+        """
+        処理が終了するまでポーリングする
+
+        待機時間は polling.initial_interval から polling.backoff_factor 倍ずつ延ばし、
+        polling.recommended_interval で頭打ちにします。各待機時間には ±polling.jitter の揺らぎを加え、
+        サーバーが Retry-After を返した場合はその値を優先します。
+        いずれの場合も1回の待機は polling.max_interval を超えません。
+
+        Args:
+            check (callable): 状態確認関数。(終了したか, 結果, Retry-Afterの秒数) を返す
+            description (str): ログ出力用の処理名
+            timeout (float, optional): 全体の待機上限（秒）。未指定の場合は polling.timeout の値
+            first_delay (float, optional): 初回の確認前に待機する秒数
+
+        Returns:
+            Any: 終了時に check が返した結果
+
+        Raises:
+            TimeoutError: 待機上限までに処理が終了しなかった場合
+        """
+        interval = self.polling_config.get('initial_interval', 2)
+        recommended_interval = self.polling_config.get('recommended_interval', 30)
+        max_interval = self.polling_config.get('max_interval', 60)
+        backoff_factor = self.polling_config.get('backoff_factor', 1.5)
+        jitter = self.polling_config.get('jitter', 0.2)
+        timeout = timeout if timeout is not None else self.polling_config.get('timeout', 7200)
+        deadline = time.monotonic() + timeout
+
+        if first_delay:
+            time.sleep(min(first_delay, max_interval, timeout))
+
+        while True:
+            done, result, retry_after = check()
+            if done:
+                return result
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"{description}が待機上限（{timeout}秒）までに終了しませんでした")
+
+            if retry_after is not None:
+                delay = retry_after
+            else:
+                delay = interval * random.uniform(1 - jitter, 1 + jitter)
+                interval = min(interval * backoff_factor, recommended_interval)
+            delay = min(delay, max_interval, remaining)
+            logger.info(f"{description}はまだ完了していません。{delay:.1f}秒後に再確認します")
+            time.sleep(delay)
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """
+        Retry-After ヘッダーの値を待機秒数に変換する
+
+        Args:
+            value (Optional[str]): Retry-After ヘッダーの値（秒数またはHTTP日付）
+
+        Returns:
+            Optional[float]: 待機秒数。ヘッダーがない・解釈できない場合はNone
+        """
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def extract_raw(
+        self,
+        instruments: List[str],
+        content_fields: List[Dict[str, str]],
+        request_type: str = 'EndOfDayPricing',
+        condition: Dict = None,
+        timeout: float = None
+    ) -> Dict:
+        """
+        オンデマンド抽出（ExtractRaw）を実行する
+
+        銘柄リスト・レポートテンプレート・スケジュールを作成せず、銘柄とフィールドを指定した
+        1回のリクエストでデータを抽出します。サーバーが非同期応答（202）を返した場合は
+        モニターURLをポーリングして完了を待機します。
+        抽出結果は返されたジョブIDを指定して open_raw_extraction_result または
+        download_raw_extraction_result で取得します。
+
+        Args:
+            instruments (List[str]): 抽出する銘柄のリスト（RICコード）
+            content_fields (List[Dict[str, str]]):
+                取得するフィールドのリスト。各フィールドは {"name": "フィールド名"} の形式
+            request_type (str, optional): 抽出リクエストの種類（'EndOfDayPricing', 'PriceHistory' など）。
+                デフォルト 'EndOfDayPricing'
+            condition (Dict, optional): 抽出条件（PriceHistory の期間指定など）
+            timeout (float, optional): 抽出完了までの待機上限（秒）。未指定の場合は polling.timeout の値
+
+        Returns:
+            Dict: 抽出結果（JobId: 結果取得用のジョブID、Notes: 抽出処理の注記）
+
+        Raises:
+            TimeoutError: 待機上限までに抽出が完了しなかった場合
+            requests.exceptions.RequestException: API呼び出し失敗時
+        """
+        logger.info(f"{len(instruments)} 件の銘柄のオンデマンド抽出を実行します（種類: {request_type}）")
+        request_data = self._build_extraction_request(instruments, content_fields, request_type, condition)
+        response = self._request('POST', 'Extractions/ExtractRaw', json=request_data)
+        result = self._await_async_response(response, timeout).json()
+        logger.info(f"オンデマンド抽出が完了しました（ジョブID: {result['JobId']}）")
+        return result
+
+    def extract_with_notes(
+        self,
+        instruments: List[str],
+        content_fields: List[Dict[str, str]],
+        request_type: str = 'EndOfDayPricing',
+        condition: Dict = None,
+        timeout: float = None
+    ) -> Dict:
+        """
+        オンデマンド抽出（ExtractWithNotes）を実行する
+
+        extract_raw と同様に1回のリクエストで抽出しますが、抽出結果を行ごとのJSON（Contents）として
+        応答に含めて返します。少数銘柄の即時取得向けです。
+
+        Args:
+            instruments (List[str]): 抽出する銘柄のリスト（RICコード）
+            content_fields (List[Dict[str, str]]):
+                取得するフィールドのリスト。各フィールドは {"name": "フィールド名"} の形式
+            request_type (str, optional): 抽出リクエストの種類。デフォルト 'EndOfDayPricing'
+            condition (Dict, optional): 抽出条件
+            timeout (float, optional): 抽出完了までの待機上限（秒）。未指定の場合は polling.timeout の値
+
+        Returns:
+            Dict: 抽出結果（Contents: 抽出データの行リスト、Notes: 抽出処理の注記）
+
+        Raises:
+            TimeoutError: 待機上限までに抽出が完了しなかった場合
+            requests.exceptions.RequestException: API呼び出し失敗時
+        """
+        logger.info(f"{len(instruments)} 件の銘柄のオンデマンド抽出を実行します（種類: {request_type}）")
+        request_data = self._build_extraction_request(instruments, content_fields, request_type, condition)
+        response = self._request('POST', 'Extractions/ExtractWithNotes', json=request_data)
+        result = self._await_async_response(response, timeout).json()
+        logger.info(f"オンデマンド抽出が完了しました（{len(result.get('Contents', []))} 行）")
+        return result
+
+    @staticmethod
+    def _build_extraction_request(
+        instruments: List[str],
+        content_fields: List[Dict[str, str]],
+        request_type: str,
+        condition: Dict = None
+    ) -> Dict:
+        """
+        オンデマンド抽出のリクエストボディを作成する
+
+        Args:
+            instruments (List[str]): 抽出する銘柄のリスト（RICコード）
+            content_fields (List[Dict[str, str]]): 取得するフィールドのリスト
+            request_type (str): 抽出リクエストの種類
+            condition (Dict, optional): 抽出条件
+
+        Returns:
+            Dict: リクエストボディ
+        """
+        return {
+            "ExtractionRequest": {
+                "@odata.type": f"#DataScope.Select.Api.Extractions.ExtractionRequests.{request_type}ExtractionRequest",
+                "ContentFieldNames": [field['name'] for field in content_fields],
+                "IdentifierList": {
+                    "@odata.type": "#DataScope.Select.Api.Extractions.ExtractionRequests.InstrumentIdentifierList",
+                    "InstrumentIdentifiers": [{"Identifier": inst, "IdentifierType": "Ric"} for inst in instruments]
+                },
+                "Condition": condition
+            }
+        }
+
+    @contextmanager
+    def open_raw_extraction_result(self, job_id: str, timeout: int = 3600) -> Iterator[BinaryIO]:
+        """
+        オンデマンド抽出（ExtractRaw）の結果をストリームとして開く
+
+        Args:
+            job_id (str): extract_raw が返したジョブID
+            timeout (int, optional): タイムアウト時間（秒）。デフォルト1時間
+
+        Yields:
+            BinaryIO: 抽出結果を読み込むバイナリストリーム
+
+        Raises:
+            requests.exceptions.RequestException: ダウンロード失敗時
+        """
+        url = f"{self.base_url}/Extractions/RawExtractionResults('{job_id}')/$value"
+        logger.info(f"ジョブ {job_id} の抽出結果をストリームとして開きます")
+        with self._open_stream(url, timeout) as stream:
+            yield stream
+
+    def download_raw_extraction_result(
+        self,
+        job_id: str,
+        output_path: str,
+        chunk_size: int = 8192,
+        timeout: int = 3600,
+        progress_callback: callable = None
+    ) -> None:
+        """
+        オンデマンド抽出（ExtractRaw）の結果をダウンロードする
+
+        download_extracted_file と同様に、一時ファイル経由で保存し、中断時は次回再開します。
+
+        Args:
+            job_id (str): extract_raw が返したジョブID
+            output_path (str): 保存先のパス
+            chunk_size (int, optional): チャンクサイズ（バイト）。デフォルト8KB
+            timeout (int, optional): タイムアウト時間（秒）。デフォルト1時間
+            progress_callback (callable, optional): 進捗報告用コールバック関数
+
+        Raises:
+            requests.exceptions.RequestException: ダウンロード失敗時
+            IOError: ファイル保存失敗時
+            ValueError: ダウンロード結果の検証失敗時
+        """
+        url = f"{self.base_url}/Extractions/RawExtractionResults('{job_id}')/$value"
+        self._download_to_file(url, job_id, output_path, chunk_size, timeout, progress_callback)
+
+    def get_instrument_trigger_details(self, schedule_id: str) -> List[Dict]:
+        """
+        スケジュールに含まれる銘柄ごとのデータ提供時刻を取得する
+
+        DataAvailabilityTrigger のスケジュールについて、各銘柄のデータが
+        平均して何時（UTC）に提供されるか（AverageArrivalUtc）を取得します。
+
+        Args:
+            schedule_id (str): スケジュールのID
+
+        Returns:
+            List[Dict]: 銘柄ごとのトリガー情報（Identifier, AverageArrivalUtc など）
+
+        Raises:
+            requests.exceptions.RequestException: API呼び出し失敗時
+        """
+        logger.info(f"スケジュール {schedule_id} の銘柄ごとのデータ提供時刻を取得します")
+        response = self._request(
+            'GET',
+            f"Extractions/ScheduleGetInstrumentTriggerDetails(ScheduleId='{schedule_id}')"
+        )
+        details = response.json().get('value', [])
+        logger.info(f"{len(details)} 件の銘柄のデータ提供時刻を取得しました")
+        return details
+
+    @staticmethod
+    def group_instruments_by_arrival(
+        trigger_details: List[Dict],
+        group_minutes: int = 15,
+        now: datetime = None
+    ) -> List[Tuple[datetime, List[str]]]:
+        """
+        銘柄をデータ提供時刻ごとのグループにまとめる
+
+        AverageArrivalUtc を group_minutes 単位に切り上げた時刻でグループ化し、
+        時刻の早い順に並べます。時刻のみ（HH:MM:SS）の場合は本日（UTC）の時刻として扱います。
+        提供時刻が不明な銘柄は最も遅いグループに含めます。
+
+        Args:
+            trigger_details (List[Dict]): get_instrument_trigger_details の結果
+            group_minutes (int, optional): グループ化する時間の単位（分）。デフォルト15分
+            now (datetime, optional): 基準時刻（UTC）。未指定の場合は現在時刻
+
+        Returns:
+            List[Tuple[datetime, List[str]]]: (グループのデータ提供時刻（UTC）, 銘柄のリスト) のリスト
+        """
+        now = now or datetime.now(timezone.utc)
+        unit = timedelta(minutes=group_minutes)
+        groups: Dict[datetime, List[str]] = {}
+        unknown = []
+        for detail in trigger_details:
+            arrival = DataScopeClient._parse_arrival_time(detail.get('AverageArrivalUtc'), now)
+            if arrival is None:
+                unknown.append(detail['Identifier'])
+                continue
+            # グループの時刻に切り上げる（提供前に抽出しないため）
+            midnight = arrival.replace(hour=0, minute=0, second=0, microsecond=0)
+            slots = -((midnight - arrival) // unit)
+            groups.setdefault(midnight + slots * unit, []).append(detail['Identifier'])
+
+        planned = sorted(groups.items())
+        if unknown:
+            if planned:
+                planned[-1][1].extend(unknown)
+            else:
+                planned.append((now, unknown))
+        return planned
+
+    @staticmethod
+    def _parse_arrival_time(value: Optional[str], now: datetime) -> Optional[datetime]:
+        """
+        AverageArrivalUtc の値をUTCの日時に変換する
+
+        Args:
+            value (Optional[str]): ISO形式の日時、または時刻（HH:MM:SS）
+            now (datetime): 時刻のみの場合に日付を補う基準時刻（UTC）
+
+        Returns:
+            Optional[datetime]: UTCの日時。値がない・解釈できない場合はNone
+        """
+        if not value:
+            return None
+        try:
+            if 'T' in value:
+                arrival = datetime.fromisoformat(value.replace('Z', '+00:00'))
+                return arrival if arrival.tzinfo else arrival.replace(tzinfo=timezone.utc)
+            hour, minute, second = value.split(':')
+            return now.replace(hour=int(hour), minute=int(minute), second=int(float(second)), microsecond=0)
+        except ValueError:
+            logger.warning(f"データ提供時刻を解釈できません: {value}")
+            return None
+
+    def extract_by_data_availability(
+        self,
+        schedule_id: str,
+        content_fields: List[Dict[str, str]],
+        output_path: str,
+        request_type: str = 'EndOfDayPricing',
+        save_result: callable = None
+    ) -> List[Dict]:
+        """
+        銘柄ごとのデータ提供時刻に合わせてグループ単位で抽出する
+
+        スケジュールの銘柄をデータ提供時刻でグループ化し、各グループの提供時刻
+        （+ data_availability.margin_seconds）になった時点でそのグループのみをオンデマンド抽出します。
+        最も遅い銘柄を待たずに、早く提供される市場のデータから順に取得できます。
+        抽出結果は output_path の拡張子の前にグループの時刻（_HHMM）を付けたパスに保存します。
+        提供時刻を過ぎているグループは直ちに抽出します。
+
+        Args:
+            schedule_id (str): DataAvailabilityTrigger のスケジュールのID
+            content_fields (List[Dict[str, str]]):
+                取得するフィールドのリスト。各フィールドは {"name": "フィールド名"} の形式
+            output_path (str): 保存先のパス（グループごとに時刻を付けて保存）
+            request_type (str, optional): 抽出リクエストの種類。デフォルト 'EndOfDayPricing'
+            save_result (callable, optional): 抽出結果の保存関数。引数: (ジョブID, 保存先のパス)。
+                未指定の場合は download_raw_extraction_result で保存
+
+        Returns:
+            List[Dict]: グループごとの結果（arrival_utc, instruments, job_id, output_path）。
+                抽出に失敗したグループは error を含みます
+
+        Raises:
+            requests.exceptions.RequestException: データ提供時刻の取得失敗時
+        """
+        availability_config = self.config.get('data_availability', {})
+        margin = timedelta(seconds=availability_config.get('margin_seconds', 300))
+        save_result = save_result or self.download_raw_extraction_result
+        groups = self.group_instruments_by_arrival(
+            self.get_instrument_trigger_details(schedule_id),
+            availability_config.get('group_minutes', 15)
+        )
+        logger.info(f"{len(groups)} グループに分けて、データ提供時刻に合わせて抽出します")
+
+        root, ext = os.path.splitext(output_path)
+
+        def extract_group(arrival: datetime, instruments: List[str]) -> Dict:
+            result = {
+                'arrival_utc': arrival.isoformat(),
+                'instruments': instruments,
+                'output_path': f"{root}_{arrival:%H%M}{ext}"
+            }
+            try:
+                job = self.extract_raw(instruments, content_fields, request_type)
+                result['job_id'] = job['JobId']
+                save_result(job['JobId'], result['output_path'])
+                logger.info(f"{arrival:%H:%M} グループ（{len(instruments)} 銘柄）の抽出結果を保存しました")
+            except Exception as e:
+                logger.error(f"{arrival:%H:%M} グループの抽出に失敗しました: {str(e)}")
+                result['error'] = str(e)
+            return result
+
+        # 抽出中も次のグループの時刻を待てるよう、抽出は別スレッドで実行する
+        with ThreadPoolExecutor(max_workers=availability_config.get('max_workers', 2)) as executor:
+            futures = []
+            for arrival, instruments in groups:
+                wake_at = arrival + margin
+                logger.info(f"{arrival:%H:%M} グループ（{len(instruments)} 銘柄）を {wake_at:%H:%M:%S} (UTC) に抽出します")
+                self._sleep_until(wake_at)
+                futures.append(executor.submit(extract_group, arrival, instruments))
+            return [future.result() for future in futures]
+
+    @staticmethod
+    def _sleep_until(wake_at: datetime) -> None:
+        """
+        指定した時刻（UTC）まで待機する
+
+        システム時刻の変更に追従できるよう、最大60秒ごとに残り時間を計算し直します。
+
+        Args:
+            wake_at (datetime): 待機を終了する時刻（タイムゾーン付き）
+        """
+        while True:
+            remaining = (wake_at - datetime.now(timezone.utc)).total_seconds()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, 60))
+
+    def get_extracted_files(self, report_extraction_id: str, file_type: str = None) -> List[Dict]:
+        """
+        抽出結果に含まれるファイルの一覧を取得する
+
+        Args:
+            report_extraction_id (str): 抽出のID（抽出状態の ReportExtractionId）
+            file_type (str, optional): 取得するファイルの種類（'Full', 'Note' など）。未指定の場合はすべて
+
+        Returns:
+            List[Dict]: ファイル情報（ExtractedFileId, ExtractedFileName, FileType など）のリスト
+
+        Raises:
+            requests.exceptions.RequestException: API呼び出し失敗時
+        """
+        logger.info(f"抽出 {report_extraction_id} のファイル一覧を取得します")
+        files = [
+            item for item in self._iter_collection(f"Extractions/ReportExtractions('{report_extraction_id}')/Files")
+            if file_type is None or item.get('FileType') == file_type
+        ]
+        logger.info(f"{len(files)} 件のファイルを取得しました")
+        return files
+
+    def get_extraction_notes(self, file_id: str) -> List[str]:
+        """
+        抽出の注記ファイル（Note）を取得して行ごとに分割する
+
+        注記に ERROR / WARNING を含む行がある場合はログに出力します。
+
+        Args:
+            file_id (str): 注記ファイルのID
+
+        Returns:
+            List[str]: 注記の各行（空行を除く）
+
+        Raises:
+            requests.exceptions.RequestException: API呼び出し失敗時
+        """
+        response = self._request('GET', f"Extractions/ExtractedFiles('{file_id}')/$value")
+        notes = [line.strip() for line in response.text.splitlines() if line.strip()]
+        for line in notes:
+            if 'ERROR' in line.upper():
+                logger.error(f"抽出の注記: {line}")
+            elif 'WARNING' in line.upper():
+                logger.warning(f"抽出の注記: {line}")
+        return notes
+
+    def download_extraction_files(
+        self,
+        report_extraction_id: str,
+        output_dir: str,
+        max_workers: int = None,
+        timeout: int = 3600
+    ) -> Dict[str, List[str]]:
+        """
+        抽出結果のすべてのデータファイル（Full）を並列にダウンロードし、注記ファイルを取得する
+
+        1つの抽出が複数ファイルに分割される場合でも、ファイルを同時にダウンロードするため、
+        全体の所要時間は最大のファイルのダウンロード時間程度になります。
+        各ファイルは download_extracted_file でダウンロードするため、分割ダウンロードや再開も行います。
+
+        Args:
+            report_extraction_id (str): 抽出のID（抽出状態の ReportExtractionId）
+            output_dir (str): 保存先ディレクトリ（ファイル名はサーバー上のファイル名）
+            max_workers (int, optional): 同時にダウンロードするファイル数。
+                未指定の場合は download.parallel_files の値
+            timeout (int, optional): 1ファイルあたりのタイムアウト時間（秒）。デフォルト1時間
+
+        Returns:
+            Dict[str, List[str]]: files: 保存したファイルのパス、notes: 注記ファイルの各行
+
+        Raises:
+            requests.exceptions.RequestException: ダウンロード失敗時
+            IOError: ファイル保存失敗時
+        """
+        files = self.get_extracted_files(report_extraction_id)
+        full_files = [item for item in files if item.get('FileType') == 'Full']
+        note_files = [item for item in files if item.get('FileType') == 'Note']
+        max_workers = max_workers or self.download_config.get('parallel_files', 1)
+        logger.info(f"{len(full_files)} 件のデータファイルを最大 {max_workers} 並列でダウンロードします")
+
+        def download(item: Dict) -> str:
+            output_path = os.path.join(output_dir, item['ExtractedFileName'])
+            self.download_extracted_file(item['ExtractedFileId'], output_path, timeout=timeout)
+            return output_path
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(full_files)))) as executor:
+            # 注記ファイルはデータファイルのダウンロード中に取得する
+            paths = executor.map(download, full_files)
+            notes = [line for item in note_files for line in self.get_extraction_notes(item['ExtractedFileId'])]
+            paths = list(paths)
+
+        logger.info(f"抽出 {report_extraction_id} のファイルをダウンロードしました（{len(paths)} 件）")
+        return {'files': paths, 'notes': notes}
+
     def download_extracted_file(
         self,
         file_id: str,
         output_path: str,
         chunk_size: int = 8192,
         timeout: int = 3600,
-        progress_callback: callable = None
+        progress_callback: callable = None,
+        max_connections: int = None
     ) -> None:
         """
         抽出されたファイルを安全にダウンロードする
 
         チャンク処理を行い、大きなファイルでもメモリを効率的に使用します。
+        サーバーがRangeリクエストに対応している場合は、ファイルをバイト範囲に分割し
+        複数の接続で並列にダウンロードします（対応していない場合は単一ストリーム）。
         進捗状況のコールバック関数を指定することで、ダウンロードの進捗を監視できます。
 
+        ダウンロードが中断された場合は一時ファイル（.tmp）と再開情報（.tmp.json）を残し、
+        次回の呼び出しで同じファイル（ファイルID・サイズ・ETagが一致）であれば
+        取得済みの位置から再開します。完了時はサイズを検証してから保存先に配置します。
+
         Args:
             file_id (str): ダウンロードするファイルのID
             output_path (str): 保存先のパス
@@ -492,14 +1646,103 @@ class DataScopeClient:
             progress_callback (callable, optional): 
                 進捗報告用コールバック関数。
                 引数: (現在のサイズ, 合計サイズ)
+            max_connections (int, optional):
+                同時接続数。未指定の場合は download.parallel_connections の値（1で単一ストリーム）
+
+        Raises:
+            requests.exceptions.RequestException: ダウンロード失敗時
+            requests.exceptions.Timeout: タイムアウト発生時
+            IOError: ファイル保存失敗時
+            ValueError: 不正なレスポンス、またはダウンロード結果の検証失敗時
+        """
+        url = f"{self.base_url}/Extractions/ExtractedFiles('{file_id}')/$value"
+        self._download_to_file(url, file_id, output_path, chunk_size, timeout, progress_callback, max_connections)
+
+    @contextmanager
+    def open_extracted_file(self, file_id: str, timeout: int = 3600) -> Iterator[BinaryIO]:
+        """
+        抽出されたファイルをストリームとして開く
+
+        ファイルをディスクに保存せず、受信したデータを逐次読み込むためのストリームを返します。
+        ダウンロードと変換（列指向ファイルへの変換など）を1回の読み込みで行う場合に使用します。
+        HTTPの Content-Encoding は展開されますが、ファイル自体のgzip圧縮は展開されません。
+
+        Args:
+            file_id (str): ダウンロードするファイルのID
+            timeout (int, optional): タイムアウト時間（秒）。デフォルト1時間
+
+        Yields:
+            BinaryIO: ファイル内容を読み込むバイナリストリーム
+
+        Raises:
+            requests.exceptions.RequestException: ダウンロード失敗時
+        """
+        url = f"{self.base_url}/Extractions/ExtractedFiles('{file_id}')/$value"
+        logger.info(f"ファイル {file_id} をストリームとして開きます")
+        with self._open_stream(url, timeout) as stream:
+            yield stream
+
+    @contextmanager
+    def _open_stream(self, url: str, timeout: int) -> Iterator[BinaryIO]:
+        """
+        指定したURLの内容をストリームとして開く
+
+        Args:
+            url (str): ダウンロードURL
+            timeout (int): タイムアウト時間（秒）
+
+        Yields:
+            BinaryIO: 内容を読み込むバイナリストリーム（Content-Encoding は展開済み）
+
+        Raises:
+            requests.exceptions.RequestException: ダウンロード失敗時
+        """
+        with self._send('GET', url, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            # io のラッパー（BufferedReader / GzipFile）で終端まで読めるよう自動クローズを無効化
+            response.raw.auto_close = False
+            yield _CountingReader(response.raw, lambda size: self._emit('on_bytes_received', 'GET', endpoint_of(url), size))
+
+    def _count_received(self, method: str, url: str, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """ストリーミングで受信したチャンクのサイズを計測用のフックに通知しながら返す"""
+        endpoint = endpoint_of(url)
+        for chunk in chunks:
+            self._emit('on_bytes_received', method, endpoint, len(chunk))
+            yield chunk
+
+    def _download_to_file(
+        self,
+        url: str,
+        download_id: str,
+        output_path: str,
+        chunk_size: int,
+        timeout: int,
+        progress_callback: callable = None,
+        max_connections: int = None
+    ) -> None:
+        """
+        指定したURLのファイルを一時ファイル経由で保存する
+
+        download_extracted_file などの共通処理です。分割ダウンロード・中断からの再開・
+        サイズの検証を行います（詳細は download_extracted_file を参照）。
+
+        Args:
+            url (str): ダウンロードURL
+            download_id (str): 再開情報に記録するID（ファイルIDやジョブID）
+            output_path (str): 保存先のパス
+            chunk_size (int): チャンクサイズ（バイト）
+            timeout (int): タイムアウト時間（秒）
+            progress_callback (callable, optional): 進捗報告用コールバック関数
+            max_connections (int, optional): 同時接続数
 
         Raises:
             requests.exceptions.RequestException: ダウンロード失敗時
             requests.exceptions.Timeout: タイムアウト発生時
             IOError: ファイル保存失敗時
-            ValueError: 不正なレスポンス
+            ValueError: 不正なレスポンス、またはダウンロード結果の検証失敗時
         """
-        logger.info(f"ファイル {file_id} のダウンロードを開始します")
+        logger.info(f"ファイル {download_id} のダウンロードを開始します")
         
         # 保存先ディレクトリの存在確認と作成
         output_dir = os.path.dirname(output_path)
@@ -508,51 +1751,453 @@ class DataScopeClient:
             logger.debug(f"保存先ディレクトリを作成しました: {output_dir}")
 
         temp_file_path = f"{output_path}.tmp"
+        state_path = f"{temp_file_path}.json"
+        connections = max_connections or self.download_config.get('parallel_connections', 1)
+        part_size = self.download_config.get('part_size', 32 * 1024 * 1024)
         try:
-            # ストリーミングレスポンスを取得
-            url = f"{self.base_url}/Extractions/ExtractedFiles('{file_id}')/$value"
-            with self.session.get(
-                url,
-                headers=self.headers,
-                stream=True,
-                timeout=timeout
-            ) as response:
-                response.raise_for_status()
-                
-                # ファイルサイズの取得
-                total_size = int(response.headers.get('content-length', 0))
-                logger.info(f"ダウンロードサイズ: {self._format_size(total_size)}")
-                
-                # チャンク処理でファイルを保存
-                with open(temp_file_path, 'wb') as f:
-                    downloaded_size = 0
-                    last_log_time = time.time()
-                    
-                    for chunk in response.iter_content(chunk_size=chunk_size):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded_size += len(chunk)
-                            
-                            # 進捗コールバックの呼び出し（指定されている場合）
-                            if progress_callback:
-                                progress_callback(downloaded_size, total_size)
-                            
-                            # 1秒に1回程度進捗をログ出力
-                            current_time = time.time()
-                            if current_time - last_log_time >= 1:
-                                progress = (downloaded_size / total_size * 100) if total_size > 0 else 0
-                                logger.debug(
-                                    f"ダウンロード進捗: {progress:.1f}% "
-                                    f"({self._format_size(downloaded_size)} / {self._format_size(total_size)})"
-                                )
-                                last_log_time = current_time
+            file_info = self._probe_download(url, timeout)
+            total_size = file_info.get('size', 0)
+            mode = 'ranges' if file_info.get('ranges') and connections > 1 and total_size > part_size else 'stream'
+
+            state = self._load_resume_state(state_path, temp_file_path, download_id, file_info, mode)
+            if state is None:
+                state = {
+                    'file_id': download_id,
+                    'size': total_size,
+                    'etag': file_info.get('etag'),
+                    'mode': mode,
+                    'completed_parts': []
+                }
+                self._save_resume_state(state_path, state)
+
+            if mode == 'ranges':
+                try:
+                    self._download_ranges(
+                        url, temp_file_path, state_path, state, connections, part_size,
+                        chunk_size, timeout, progress_callback
+                    )
+                except _RangeNotSupportedError as e:
+                    # Rangeリクエストに応じない場合は取得済みの区間を使用できないため、単一ストリームで取得し直す
+                    logger.warning(f"{str(e)}。単一ストリームでダウンロードし直します")
+                    self._remove_resume_files(state_path)
+                    self._download_stream(url, temp_file_path, chunk_size, timeout, progress_callback)
+            elif not self._is_fully_received(temp_file_path, total_size):
+                self._download_stream(
+                    url, temp_file_path, chunk_size, timeout, progress_callback,
+                    resumable=bool(file_info.get('ranges'))
+                )
+            else:
+                # 前回の実行で全体を受信済み（Range: bytes={サイズ}- は416になるため要求しない）
+                logger.info(f"一時ファイルに全体を受信済みのため、検証のみ行います: {temp_file_path}")
+
+            self._verify_download(temp_file_path, file_info)
             
             # ダウンロードが完了したら一時ファイルを本来のファイル名に変更
             os.replace(temp_file_path, output_path)
+            self._remove_resume_files(state_path)
             logger.info(f"ファイルを保存しました: {output_path}")
             
         except requests.exceptions.Timeout:
-            logger.error(f"ダウンロードがタイムアウトしました（制限時間: {timeout}秒）")
-            if os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
-            raise
\ No newline at end of file
+            logger.error(
+                f"ダウンロードがタイムアウトしました（制限時間: {timeout}秒）。"
+                f"次回の実行で {temp_file_path} から再開します"
+            )
+            raise
+
+        except requests.exceptions.ChunkedEncodingError as e:
+            logger.error(f"ダウンロードが中断されました: {str(e)}。次回の実行で {temp_file_path} から再開します")
+            raise
+
+        except ValueError:
+            # 検証に失敗した一時ファイルは再開に使用できないため削除する
+            self._remove_resume_files(state_path, temp_file_path)
+            raise
+
+    def _probe_download(self, url: str, timeout: int) -> Dict:
+        """
+        ダウンロード対象のサイズ・ETag・Rangeリクエスト対応を確認する
+
+        HEADリクエストで content-length、ETag、Accept-Ranges を取得します。
+        Content-Encoding が付与されている場合、バイト範囲が圧縮後のデータを指すため
+        Range非対応として扱います。
+
+        Args:
+            url (str): ダウンロードURL
+            timeout (int): タイムアウト時間（秒）
+
+        Returns:
+            Dict: 以下のキーを持つ辞書。確認に失敗した場合は空の辞書
+                - size (int): ファイルサイズ（バイト。不明な場合は0）
+                - etag (Optional[str]): ETag
+                - ranges (bool): 分割・再開ダウンロードが可能な場合はTrue
+        """
+        try:
+            response = self._send('HEAD', url, timeout=timeout, allow_redirects=True)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"ダウンロード対象の確認に失敗したため、単一ストリームでダウンロードします: {str(e)}")
+            return {}
+
+        accept_ranges = response.headers.get('Accept-Ranges', '').lower()
+        content_encoding = response.headers.get('Content-Encoding', 'identity').lower()
+        if content_encoding != 'identity':
+            # 圧縮転送の場合、content-length は保存後のサイズと一致しない
+            return {'size': 0, 'etag': response.headers.get('ETag'), 'ranges': False}
+
+        total_size = int(response.headers.get('content-length', 0))
+        ranges = accept_ranges == 'bytes' and total_size > 0
+        if not ranges:
+            logger.info("サーバーがRangeリクエストに対応していないため、単一ストリームでダウンロードします")
+        return {'size': total_size, 'etag': response.headers.get('ETag'), 'ranges': ranges}
+
+    def _load_resume_state(
+        self,
+        state_path: str,
+        temp_file_path: str,
+        file_id: str,
+        file_info: Dict,
+        mode: str
+    ) -> Optional[Dict]:
+        """
+        前回中断したダウンロードの再開情報を読み込む
+
+        再開情報のファイルID・サイズ・ETag・ダウンロード方式が今回の対象と一致し、
+        サーバーがRangeリクエストに対応している場合のみ再開情報を返します。
+        一致しない場合は残っている一時ファイルと再開情報を削除します。
+
+        Args:
+            state_path (str): 再開情報ファイルのパス
+            temp_file_path (str): 一時ファイルのパス
+            file_id (str): ダウンロードするファイルのID
+            file_info (Dict): _probe_download で取得したファイル情報
+            mode (str): 今回のダウンロード方式（'ranges' または 'stream'）
+
+        Returns:
+            Optional[Dict]: 再開可能な場合は再開情報。再開できない場合はNone
+        """
+        if not os.path.exists(temp_file_path):
+            self._remove_resume_files(state_path)
+            return None
+
+        state = None
+        if os.path.exists(state_path):
+            try:
+                with open(state_path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"再開情報の読み込みに失敗しました: {str(e)}")
+
+        if (
+            state
+            and file_info.get('ranges')
+            and state.get('file_id') == file_id
+            and state.get('size') == file_info.get('size')
+            and state.get('etag') == file_info.get('etag')
+            and state.get('mode') == mode
+        ):
+            logger.info(f"中断したダウンロードを再開します: {temp_file_path}")
+            return state
+
+        logger.info("再開できない一時ファイルを削除し、最初からダウンロードします")
+        self._remove_resume_files(state_path, temp_file_path)
+        return None
+
+    @staticmethod
+    def _save_resume_state(state_path: str, state: Dict) -> None:
+        """
+        再開情報をファイルに保存する
+
+        書き込み途中で中断しても壊れた再開情報が残らないよう、
+        別名で書き込んでから置き換えます。
+
+        Args:
+            state_path (str): 再開情報ファイルのパス
+            state (Dict): 再開情報
+        """
+        with open(f"{state_path}.new", 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(f"{state_path}.new", state_path)
+
+    @staticmethod
+    def _remove_resume_files(*paths: str) -> None:
+        """
+        一時ファイル・再開情報ファイルを削除する
+
+        Args:
+            *paths (str): 削除するファイルのパス
+        """
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    @staticmethod
+    def _is_fully_received(temp_file_path: str, total_size: int) -> bool:
+        """
+        再開する一時ファイルにファイル全体を受信済みかどうか
+
+        Args:
+            temp_file_path (str): 一時ファイルのパス
+            total_size (int): ファイルサイズ（バイト。不明な場合は0）
+
+        Returns:
+            bool: サイズが判明しており、一時ファイルがそのサイズに達している場合はTrue
+        """
+        return bool(total_size) and os.path.exists(temp_file_path) and os.path.getsize(temp_file_path) == total_size
+
+    def _verify_download(self, temp_file_path: str, file_info: Dict) -> None:
+        """
+        ダウンロードした一時ファイルのサイズを検証する
+
+        Args:
+            temp_file_path (str): 一時ファイルのパス
+            file_info (Dict): _probe_download で取得したファイル情報
+
+        Raises:
+            ValueError: ファイルサイズが一致しない場合
+        """
+        expected_size = file_info.get('size', 0)
+        actual_size = os.path.getsize(temp_file_path)
+        if expected_size and actual_size != expected_size:
+            raise ValueError(
+                f"ダウンロードしたファイルのサイズが一致しません"
+                f"（期待値: {expected_size} バイト, 実際: {actual_size} バイト）"
+            )
+
+    def _download_stream(
+        self,
+        url: str,
+        temp_file_path: str,
+        chunk_size: int,
+        timeout: int,
+        progress_callback: callable = None,
+        resumable: bool = False
+    ) -> None:
+        """
+        単一ストリームでファイルを一時ファイルにダウンロードする
+
+        resumable が True で一時ファイルが残っている場合は、
+        Range: bytes=N- を指定して続きから取得し、一時ファイルに追記します。
+        サーバーが部分レスポンス（206）を返さなかった場合は最初から取得し直します。
+
+        Args:
+            url (str): ダウンロードURL
+            temp_file_path (str): 一時ファイルのパス
+            chunk_size (int): チャンクサイズ（バイト）
+            timeout (int): タイムアウト時間（秒）
+            progress_callback (callable, optional): 進捗報告用コールバック関数
+            resumable (bool, optional): Rangeリクエストによる再開を行うかどうか
+
+        Raises:
+            requests.exceptions.RequestException: ダウンロード失敗時
+        """
+        offset = os.path.getsize(temp_file_path) if resumable and os.path.exists(temp_file_path) else 0
+        extra_headers = {'Range': f"bytes={offset}-"} if offset else None
+
+        # ストリーミングレスポンスを取得
+        with self._send(
+            'GET',
+            url,
+            extra_headers=extra_headers,
+            stream=True,
+            timeout=timeout
+        ) as response:
+            response.raise_for_status()
+            if offset and response.status_code != 206:
+                logger.warning("サーバーが再開要求に応じなかったため、最初からダウンロードします")
+                offset = 0
+            
+            # ファイルサイズの取得
+            total_size = int(response.headers.get('content-length', 0)) + offset
+            if offset:
+                logger.info(
+                    f"ダウンロードサイズ: {self._format_size(total_size)}"
+                    f"（{self._format_size(offset)} から再開します）"
+                )
+            else:
+                logger.info(f"ダウンロードサイズ: {self._format_size(total_size)}")
+            report_progress = self._progress_reporter(total_size, progress_callback, offset)
+            
+            # チャンク処理でファイルを保存
+            with open(temp_file_path, 'ab' if offset else 'wb') as f:
+                for chunk in self._count_received('GET', url, response.iter_content(chunk_size=chunk_size)):
+                    if chunk:
+                        f.write(chunk)
+                        report_progress(len(chunk))
+
+    def _download_ranges(
+        self,
+        url: str,
+        temp_file_path: str,
+        state_path: str,
+        state: Dict,
+        connections: int,
+        part_size: int,
+        chunk_size: int,
+        timeout: int,
+        progress_callback: callable = None
+    ) -> None:
+        """
+        バイト範囲ごとに並列でファイルを一時ファイルにダウンロードする
+
+        一時ファイルを最終サイズで確保し、各区間を担当するスレッドが
+        os.pwrite で自分のオフセットに直接書き込みます。
+        完了した区間は再開情報に記録し、再開時は未完了の区間のみを取得します。
+
+        Args:
+            url (str): ダウンロードURL
+            temp_file_path (str): 一時ファイルのパス
+            state_path (str): 再開情報ファイルのパス
+            state (Dict): 再開情報（size, completed_parts を含む）
+            connections (int): 同時接続数
+            part_size (int): 1区間あたりのサイズ（バイト）
+            chunk_size (int): チャンクサイズ（バイト）
+            timeout (int): タイムアウト時間（秒）
+            progress_callback (callable, optional): 進捗報告用コールバック関数
+
+        Raises:
+            requests.exceptions.RequestException: いずれかの区間のダウンロード失敗時
+            requests.exceptions.ChunkedEncodingError: 区間の受信が途中で終了した場合（完了済みの区間は再開時に使用する）
+            _RangeNotSupportedError: サーバーが部分レスポンス（206）を返さなかった場合
+        """
+        total_size = state['size']
+        completed = set(state.get('completed_parts', []))
+        ranges = [
+            (start, min(start + part_size, total_size) - 1)
+            for start in range(0, total_size, part_size)
+            if start not in completed
+        ]
+        completed_size = total_size - sum(end - start + 1 for start, end in ranges)
+        workers = max(1, min(connections, len(ranges)))
+        logger.info(
+            f"ダウンロードサイズ: {self._format_size(total_size)}"
+            f"（{len(ranges)} 区間を {workers} 接続で並列取得します）"
+        )
+        report_progress = self._progress_reporter(total_size, progress_callback, completed_size)
+
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+        if not completed:
+            flags |= os.O_TRUNC
+        fd = os.open(temp_file_path, flags, 0o644)
+        try:
+            os.ftruncate(fd, total_size)
+            write_lock = threading.Lock()
+            state_lock = threading.Lock()
+
+            def write_at(data: bytes, offset: int) -> None:
+                if hasattr(os, 'pwrite'):
+                    os.pwrite(fd, data, offset)
+                else:
+                    with write_lock:
+                        os.lseek(fd, offset, os.SEEK_SET)
+                        os.write(fd, data)
+
+            def fetch_range(byte_range):
+                start, end = byte_range
+                extra_headers = {'Range': f"bytes={start}-{end}"}
+                with self._send('GET', url, extra_headers=extra_headers, stream=True, timeout=timeout) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        raise _RangeNotSupportedError(f"部分レスポンスが返されませんでした（ステータス: {response.status_code}）")
+                    offset = start
+                    for chunk in self._count_received('GET', url, response.raw.stream(chunk_size, decode_content=False)):
+                        if chunk:
+                            write_at(chunk, offset)
+                            offset += len(chunk)
+                            report_progress(len(chunk))
+                if offset != end + 1:
+                    # 接続が途中で切れた場合も完了済みの区間は有効なため、再開可能な例外とする
+                    raise requests.exceptions.ChunkedEncodingError(
+                        f"区間 {start}-{end} の受信が途中で終了しました（受信: {offset - start} バイト）"
+                    )
+
+                # 書き込み済みの内容を永続化してから完了を記録する
+                os.fsync(fd)
+                with state_lock:
+                    completed.add(start)
+                    state['completed_parts'] = sorted(completed)
+                    self._save_resume_state(state_path, state)
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # いずれかの区間が失敗した場合は例外を再送出する
+                for _ in executor.map(fetch_range, ranges):
+                    pass
+        finally:
+            os.close(fd)
+
+    def _progress_reporter(
+        self,
+        total_size: int,
+        progress_callback: callable = None,
+        initial_size: int = 0
+    ) -> callable:
+        """
+        ダウンロード進捗を集計する関数を生成する
+
+        受信バイト数を加算し、コールバックの呼び出しと1秒に1回程度のログ出力を行います。
+        分割ダウンロードでは複数スレッドから呼び出されるため、ロックで保護しています。
+
+        Args:
+            total_size (int): ファイルサイズ（バイト）
+            progress_callback (callable, optional): 進捗報告用コールバック関数
+            initial_size (int, optional): 再開時の取得済みバイト数
+
+        Returns:
+            callable: 受信したバイト数を引数に取る関数
+        """
+        lock = threading.Lock()
+        state = {'downloaded': initial_size, 'last_log_time': time.time()}
+
+        def report(size: int) -> None:
+            with lock:
+                state['downloaded'] += size
+                downloaded_size = state['downloaded']
+                
+                # 進捗コールバックの呼び出し（指定されている場合）
+                if progress_callback:
+                    progress_callback(downloaded_size, total_size)
+                
+                # 1秒に1回程度進捗をログ出力
+                current_time = time.time()
+                if current_time - state['last_log_time'] >= 1:
+                    progress = (downloaded_size / total_size * 100) if total_size > 0 else 0
+                    logger.debug(
+                        f"ダウンロード進捗: {progress:.1f}% "
+                        f"({self._format_size(downloaded_size)} / {self._format_size(total_size)})"
+                    )
+                    state['last_log_time'] = current_time
+
+        return report
+
+    @staticmethod
+    def _format_size(size: int) -> str:
+        """
+        バイト数を読みやすい単位の文字列に変換する
+
+        Args:
+            size (int): バイト数
+
+        Returns:
+            str: 単位付きのサイズ文字列（例: "1.5 MB"）
+        """
+        for unit in ['B', 'KB', 'MB', 'GB']:
+            if size < 1024:
+                return f"{size:.1f} {unit}"
+            size /= 1024
+        return f"{size:.1f} TB"
+
+
+class _CountingReader(io.RawIOBase):
+    """読み込んだバイト数を通知するストリームのラッパー（ストリームとして返す抽出ファイルの計測用）"""
+
+    def __init__(self, raw: BinaryIO, on_read: callable):
+        self._raw = raw
+        self._on_read = on_read
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = self._raw.readinto(buffer)
+        if size:
+            self._on_read(size)
+        return size
@@ -1,26 +1,127 @@
 import os
+import copy
+import threading
+from typing import Any, Callable, Dict, Tuple
 import yaml
 
+# プロジェクトルート（src/app/core/config.py の3階層上）。相対パスはカレントディレクトリではなくここを基準に解決する
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+CONFIG_DIR = os.path.join(PROJECT_ROOT, 'input', 'config')
+
+# 設定ファイル内のパスを表す項目（セクション, キー）。読み込み時にプロジェクトルートを基準に解決する
+CONNECTION_PATH_KEYS: Tuple[Tuple[str, str], ...] = (
+    ('rate_limit', 'shared_state_dir'),
+    ('backfill', 'work_dir'),
+    ('cache', 'dir'),
+    ('metrics', 'prometheus_path'),
+    ('metrics', 'summary_path'),
+)
+DATA_PATH_KEYS: Tuple[Tuple[str, str], ...] = (
+    (None, 'output_path'),
+    ('price_store', 'dir'),
+)
+
+
+def resolve_path(path: str) -> str:
+    """
+    プロジェクトルートを基準にパスを解決する
+
+    Args:
+        path (str): パス（絶対パスの場合はそのまま返す）
+
+    Returns:
+        str: 絶対パス
+    """
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+
+
+class _ConfigFile:
+    """
+    YAMLの設定ファイルと解析結果のキャッシュ
+
+    解析結果は初回の読み込み時に作成し、ファイルの更新日時・サイズが変わった場合のみ読み込み直します。
+    解析（検証）に失敗した場合はキャッシュを更新せずに例外を送出します。
+    """
+
+    def __init__(self, path: str, parser: Callable[[Dict[str, Any]], Dict[str, Any]] = None):
+        self.path = path
+        self._parser = parser
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._value = None
+
+    def get(self) -> Dict[str, Any]:
+        stat = os.stat(self.path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if stamp != self._stamp:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    raw = yaml.safe_load(f) or {}
+                self._value = self._parser(raw) if self._parser else raw
+                self._stamp = stamp
+            return self._value
+
+
+def _resolve_paths(config: Dict[str, Any], keys: Tuple[Tuple[str, str], ...]) -> None:
+    """設定内のパスをプロジェクトルートを基準に解決する（未設定・null の項目はそのまま）"""
+    for section, key in keys:
+        target = config if section is None else config.get(section)
+        if isinstance(target, dict) and target.get(key):
+            target[key] = resolve_path(target[key])
+
+
+def _require(config: Dict[str, Any], names: Tuple[str, ...], filename: str) -> None:
+    """必須の設定値（'api.base_url' の形式）が存在することを検証する"""
+    for name in names:
+        value = config
+        for key in name.split('.'):
+            value = value.get(key) if isinstance(value, dict) else None
+        if value is None or value == '':
+            raise ValueError(f"{filename} の設定が不正です: {name} がありません")
+
+
+def _parse_connection_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    _require(
+        config,
+        ('api.base_url', 'api.username', 'api.password', 'headers', 'polling', 'retry.max_attempts',
+         'retry.backoff_factor', 'retry.status_forcelist', 'retry.max_retries_per_minute'),
+        'connection_config.yml'
+    )
+    _resolve_paths(config, CONNECTION_PATH_KEYS)
+    return config
+
+
+def _parse_data_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    _require(config, ('instruments', 'report_fields', 'output_path'), 'data_config.yml')
+    _resolve_paths(config, DATA_PATH_KEYS)
+    return config
+
+
+_connection_config = _ConfigFile(os.path.join(CONFIG_DIR, 'connection_config.yml'), _parse_connection_config)
+_data_config = _ConfigFile(os.path.join(CONFIG_DIR, 'data_config.yml'), _parse_data_config)
+_logging_config = _ConfigFile(os.path.join(CONFIG_DIR, 'logging_config.yml'))
+
+
 def get_connection_config():
     """
     接続設定を取得する。
+
+    ファイルの解析・検証は初回と、ファイルが更新された場合のみ行います。
+    設定内のパス（cache.dir など）はプロジェクトルートを基準に解決済みです。
+    キャッシュした解析結果の複製を返すため、呼び出し側で変更しても構いません。
     """
-    with open('input/config/connection_config.yml', 'r') as f:
-        config = yaml.safe_load(f)
-    return config
+    return copy.deepcopy(_connection_config.get())
 
 def get_data_config():
     """
     データ設定を取得する。
+
+    output_path と price_store.dir はプロジェクトルートを基準に解決済みです。
     """
-    with open('input/config/data_config.yml', 'r') as f:
-        config = yaml.safe_load(f)
-    return config
+    return copy.deepcopy(_data_config.get())
 
 def get_logging_config():
     """
     ログ設定を取得する。
     """
-    with open('input/config/logging_config.yml', 'r') as f:
-        config = yaml.safe_load(f)
-    return config
\ No newline at end of file
+    return copy.deepcopy(_logging_config.get())
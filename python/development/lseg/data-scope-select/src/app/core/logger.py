@@ -1,14 +1,12 @@
 import logging
 import logging.config
-import yaml
+from app.core.config import get_logging_config
 
 def setup_logging():
     """
     ログの設定を行う。
     """
-    with open('input/config/logging_config.yml', 'r') as f:
-        config = yaml.safe_load(f.read())
-        logging.config.dictConfig(config)
+    logging.config.dictConfig(get_logging_config())
 
 def get_logger(name):
     """
@@ -1,47 +1,125 @@
-import time
+import os
 import sys
 import requests
+from app.api.backfill import HistoricalBackfill
 from app.api.client import DataScopeClient
 from app.core.config import get_data_config
 from app.core.logger import setup_logging, get_logger
-from app.core.logger import logger
-from app.utils.file_handler import save_extracted_file
+from app.utils.file_handler import DEFAULT_DATE_FORMAT, convert_extract_to_columnar
+from app.utils.price_store import PriceStore
 
 setup_logging()
 logger = get_logger(__name__)
 
+def save_extraction_output(data_config, output_path, open_stream, download):
+    """
+    抽出結果を data_config の output_format に従って保存する
+
+    Args:
+        data_config (dict): データ設定
+        output_path (str): 保存先のパス
+        open_stream (callable): 抽出結果のストリームを開く関数
+        download (callable): 保存先のパスを引数に取り、抽出結果をそのまま保存する関数
+    """
+    output_format = data_config.get('output_format', 'raw')
+    if output_format in ('parquet', 'arrow'):
+        # ダウンロードしながら列指向ファイルに変換する（生ファイルは保存しない）
+        with open_stream() as stream:
+            convert_extract_to_columnar(
+                stream, output_path, data_config['report_fields'], output_format=output_format
+            )
+        logger.info(f"抽出ファイルを {output_format} 形式に変換して保存しました: {output_path}")
+    else:
+        download(output_path)
+        logger.info(f"抽出ファイルをダウンロードして保存しました: {output_path}")
+    ingest_into_price_store(data_config, [output_path])
+
+def ingest_into_price_store(data_config, paths):
+    """
+    保存した抽出ファイルを価格ストアに取り込む（data_config に price_store がある場合のみ）
+
+    Args:
+        data_config (dict): データ設定
+        paths (list): 取り込む抽出ファイルのパス
+    """
+    store_config = data_config.get('price_store')
+    if not store_config:
+        return
+    date_field = store_config.get('date_field', 'Trade Date')
+    date_format = next(
+        (field['format'] for field in data_config['report_fields'] if field['name'] == date_field and 'format' in field),
+        DEFAULT_DATE_FORMAT
+    )
+    store = PriceStore(
+        store_config.get('dir', 'output/price_store'),
+        ric_field=store_config.get('ric_field', 'RIC'),
+        date_field=date_field,
+        date_format=date_format
+    )
+    for path in paths:
+        store.ingest_file(path)
+
 def main():
     client = DataScopeClient()
     data_config = get_data_config()
 
     try:
         # 認証してトークンを取得
-        token = client.get_auth_token()
-        logger.info(f"認証に成功しました。トークン: {token}")
+        client.get_auth_token()
+        logger.info("認証に成功しました")
 
-        # 銘柄リストが存在するか確認し、なければ作成
+        if data_config.get('extraction_mode') == 'on_demand':
+            # スケジュール等のサーバー側オブジェクトを作成せず、1回のリクエストで抽出する
+            job = client.extract_raw(data_config['instruments'], data_config['report_fields'])
+            save_extraction_output(
+                data_config,
+                data_config['output_path'],
+                lambda: client.open_raw_extraction_result(job['JobId']),
+                lambda output_path: client.download_raw_extraction_result(job['JobId'], output_path)
+            )
+            return
+
+        # 銘柄リスト・レポートテンプレート・スケジュールのIDをまとめて取得（$batch）
         list_name = "my_instrument_list"
-        list_id = client.get_instrument_list_id(list_name)
+        template_name = "my_eod_template"
+        schedule_name = "my_eod_schedule"
+        setup_state = client.get_setup_state(list_name, template_name, schedule_name)
+
+        # 銘柄リストが存在しなければ作成
+        list_id = setup_state['list_id']
         if not list_id:
             list_id = client.create_instrument_list(list_name)
             logger.info(f"銘柄リストを作成しました: {list_name} (ID: {list_id})")
-            instruments = data_config['instruments']
-            client.append_instruments(list_id, instruments)
-            logger.info(f"{len(instruments)}個の銘柄をリストに追加しました")
+            instruments = list(dict.fromkeys(data_config['instruments']))
+            appended_count = client.append_instruments(list_id, instruments)
+            logger.info(f"{appended_count}個の銘柄をリストに追加しました")
         else:
             logger.info(f"既存の銘柄リストを使用します: {list_name} (ID: {list_id})")
-            # 新しい銘柄があるか確認し、あれば追加
-            existing_instruments = client.get_instruments_in_list(list_id)
-            new_instruments = [inst for inst in data_config['instruments'] if inst not in existing_instruments]
+            # 設定との差分を確認し、新しい銘柄を追加・設定から外れた銘柄を削除
+            # リストの銘柄は逐次取得し、全件を保持せずに設定の銘柄との照合のみ行う
+            desired_instruments = dict.fromkeys(data_config['instruments'])
+            remove_dropped = data_config.get('remove_dropped_instruments', False)
+            listed_instruments = set()
+            dropped_instruments = []
+            for inst in setup_state['instruments']:
+                if inst in desired_instruments:
+                    listed_instruments.add(inst)
+                elif remove_dropped:
+                    dropped_instruments.append(inst)
+
+            new_instruments = [inst for inst in desired_instruments if inst not in listed_instruments]
             if new_instruments:
-                client.append_instruments(list_id, new_instruments)
-                logger.info(f"{len(new_instruments)}個の新しい銘柄をリストに追加しました")
+                appended_count = client.append_instruments(list_id, new_instruments)
+                logger.info(f"{appended_count}個の新しい銘柄をリストに追加しました")
             else:
                 logger.info("追加する新しい銘柄はありません")
 
-        # レポートテンプレートが存在するか確認し、なければ作成
-        template_name = "my_eod_template"
-        template_id = client.get_report_template_id(template_name)
+            if dropped_instruments:
+                client.remove_instruments(list_id, dropped_instruments)
+                logger.info(f"{len(dropped_instruments)}個の銘柄をリストから削除しました")
+
+        # レポートテンプレートが存在しなければ作成
+        template_id = setup_state['template_id']
         if not template_id:
             content_fields = data_config['report_fields']
             template_id = client.create_report_template(template_name, content_fields)
@@ -49,9 +127,19 @@ def main():
         else:
             logger.info(f"既存のレポートテンプレートを使用します: {template_name} (ID: {template_id})")
 
-        # スケジュールが存在するか確認し、なければ作成
-        schedule_name = "my_eod_schedule"
-        schedule_id = client.get_schedule_id(schedule_name)
+        if data_config.get('extraction_mode') == 'historical':
+            # 期間を区間に分割して並列に抽出し、日付順に1つのファイルに連結する（中断時は再実行で再開）
+            backfill = HistoricalBackfill(client, list_id, template_id, "my_historical_backfill")
+            results = backfill.run(data_config['start_date'], data_config['end_date'], data_config['output_path'])
+            failed = [result for result in results if result.get('status') != 'completed']
+            if failed:
+                logger.error(f"{len(failed)} 区間の抽出が完了していません")
+                sys.exit(1)
+            ingest_into_price_store(data_config, [data_config['output_path']])
+            return
+
+        # スケジュールが存在しなければ作成
+        schedule_id = setup_state['schedule_id']
         if not schedule_id:
             schedule_id = client.create_schedule(schedule_name, list_id, template_id, extraction_type='EOD')
             logger.info(f"スケジュールを作成しました: {schedule_name} (ID: {schedule_id})")
@@ -61,23 +149,47 @@ def main():
             client.update_schedule_trigger(schedule_id)
             logger.info(f"スケジュールトリガーを現在の日付に更新しました")
 
+        if data_config.get('extraction_mode') == 'data_availability':
+            # 銘柄ごとのデータ提供時刻に合わせて、グループ単位でオンデマンド抽出する
+            results = client.extract_by_data_availability(
+                schedule_id,
+                data_config['report_fields'],
+                data_config['output_path'],
+                save_result=lambda job_id, output_path: save_extraction_output(
+                    data_config,
+                    output_path,
+                    lambda: client.open_raw_extraction_result(job_id),
+                    lambda path: client.download_raw_extraction_result(job_id, path)
+                )
+            )
+            failed = [result for result in results if 'error' in result]
+            if failed:
+                logger.error(f"{len(failed)} グループの抽出に失敗しました")
+                sys.exit(1)
+            return
+
         # 抽出を実行し、結果をダウンロード
-        status = client.get_extraction_status(schedule_id)
-        while status['State'] != 'Completed':
-            if status['State'] == 'Failed':
-                logger.error(f"抽出に失敗しました。ステータス: {status}")
-                break
+        status = client.wait_for_extraction(schedule_id)
+        state = status.get('State', status.get('Status'))
+        if state == 'Failed':
+            logger.error(f"抽出に失敗しました。ステータス: {status}")
 
-            logger.info(f"抽出がまだ完了していません。ステータス: {status['State']}. 30秒待機します...")
-            time.sleep(30)  # 30秒待機してから再度確認
-            status = client.get_extraction_status(schedule_id)
+        if state == 'Completed' and data_config.get('download_all_files', False):
+            # 抽出結果のすべてのデータファイルを並列にダウンロードし、注記を取得する
+            output_dir = os.path.dirname(data_config['output_path']) or '.'
+            downloaded = client.download_extraction_files(status['ReportExtractionId'], output_dir)
+            logger.info(f"{len(downloaded['files'])} 件の抽出ファイルをダウンロードしました: {output_dir}")
+            ingest_into_price_store(data_config, downloaded['files'])
 
-        if status['State'] == 'Completed':
+        elif state == 'Completed':
             # 抽出ファイルをダウンロードして保存
             file_id = status['Result']['FileId']
-            output_path = data_config['output_path']
-            client.download_extracted_file(file_id, output_path)
-            logger.info(f"抽出ファイルをダウンロードして保存しました: {output_path}")
+            save_extraction_output(
+                data_config,
+                data_config['output_path'],
+                lambda: client.open_extracted_file(file_id),
+                lambda output_path: client.download_extracted_file(file_id, output_path)
+            )
 
     except requests.exceptions.RequestException as e:
         logger.error(f"APIへのリクエスト中にエラーが発生しました: {str(e)}")
@@ -88,8 +200,8 @@ def main():
         sys.exit(1)
 
     finally:
-        # クリーンアップ処理を実行
-        pass
+        # クリーンアップ処理を実行（リクエストの計測結果を出力）
+        client.export_metrics()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional
+from app.core.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = get_logger(__name__)
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    ロックファイルによるプロセス間の排他ロックを取得する
+
+    同じロックファイルを指定した他のプロセスがロックを解放するまで待機します。
+
+    Args:
+        path (str): ロックファイルのパス（存在しない場合は作成）
+    """
+    lock_dir = os.path.dirname(path)
+    if lock_dir:
+        os.makedirs(lock_dir, exist_ok=True)
+    with open(path, 'a+b') as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class IdCache:
+    """
+    名前からIDへの対応を保持する永続キャッシュ
+
+    DSS上のオブジェクト（銘柄リスト・レポートテンプレート・スケジュール）の名前とIDの対応を
+    JSONファイルに保存し、プロセスをまたいで再利用します。
+    登録から ttl_seconds を経過したエントリは無効として扱います。
+    """
+
+    def __init__(self, path: str, ttl_seconds: int):
+        """
+        Args:
+            path (str): キャッシュファイルのパス
+            ttl_seconds (int): エントリの有効期間（秒）。0以下の場合はキャッシュを使用しない
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        """キャッシュファイルを読み込む（存在しない・壊れている場合は空のキャッシュ）"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"IDキャッシュの読み込みに失敗したため破棄します: {str(e)}")
+            return {}
+
+    def _save(self, updated: Dict[str, Dict] = None, removed: Iterable[str] = ()) -> None:
+        """
+        変更したエントリをキャッシュファイルに書き込む（別名で書き込んでから置き換える）
+
+        他のプロセスが登録したエントリを上書きしないよう、ロックファイルで排他制御したうえで
+        ファイル上のエントリを読み込み直し、このプロセスでの変更（updated, removed）のみを反映します。
+        同じキーのエントリはより新しく登録した方を残します。
+
+        Args:
+            updated (Dict[str, Dict], optional): 登録・更新したエントリ
+            removed (Iterable[str], optional): 削除したエントリのキー
+        """
+        cache_dir = os.path.dirname(self.path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        with file_lock(f"{self.path}.lock"):
+            entries = self._load()
+            for key, entry in (updated or {}).items():
+                current = entries.get(key)
+                if not current or current.get('cached_at', 0) <= entry['cached_at']:
+                    entries[key] = entry
+            for key in removed:
+                entries.pop(key, None)
+            with open(f"{self.path}.new", 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(f"{self.path}.new", self.path)
+        self._entries = entries
+
+    def get(self, kind: str, name: str) -> Optional[str]:
+        """
+        有効期間内のIDを取得する
+
+        Args:
+            kind (str): オブジェクトの種類（例: 'InstrumentLists'）
+            name (str): オブジェクトの名前
+
+        Returns:
+            Optional[str]: キャッシュされたID。存在しない・期限切れの場合はNone
+        """
+        if self.ttl_seconds <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(f"{kind}:{name}")
+        if entry and time.time() - entry['cached_at'] < self.ttl_seconds:
+            return entry['id']
+        return None
+
+    def set(self, kind: str, name: str, object_id: str) -> None:
+        """
+        IDを登録する
+
+        Args:
+            kind (str): オブジェクトの種類（例: 'InstrumentLists'）
+            name (str): オブジェクトの名前
+            object_id (str): オブジェクトのID
+        """
+        if self.ttl_seconds <= 0:
+            return
+        key = f"{kind}:{name}"
+        entry = {'id': object_id, 'cached_at': time.time()}
+        with self._lock:
+            self._entries[key] = entry
+            self._save(updated={key: entry})
+
+    def invalidate_path(self, path: str) -> None:
+        """
+        リクエストパスに含まれるIDのエントリを削除する
+
+        キャッシュしたIDのオブジェクトがサーバー上で削除されていた場合（404）に呼び出し、
+        次回の検索でサーバーから取得し直すようにします。
+
+        Args:
+            path (str): 404が返されたリクエストのパス
+        """
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if f"('{entry['id']}')" in path]
+            if not stale:
+                return
+            for key in stale:
+                del self._entries[key]
+                logger.info(f"存在しないIDのキャッシュを削除しました: {key}")
+            self._save(removed=stale)
+
+
+class TokenCache:
+    """
+    認証トークンの永続キャッシュ
+
+    取得したトークンと有効期限を所有者のみ読み書き可能なファイルに保存し、
+    複数のプロセスで共有します。読み書きはロックファイルで排他制御します。
+    """
+
+    def __init__(self, path: str, key: str):
+        """
+        Args:
+            path (str): キャッシュファイルのパス
+            key (str): トークンを区別するキー（接続先URLとユーザー名など）
+        """
+        self.path = path
+        self.key = key
+        self.lock_path = f"{path}.lock"
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """
+        キャッシュを排他ロックする
+
+        ロック中に有効なトークンの確認と再取得を行うことで、
+        複数のプロセスが同時にログインすることを防ぎます。
+        """
+        with file_lock(self.lock_path):
+            yield
+
+    def get(self, min_remaining_seconds: float = 0) -> Optional[str]:
+        """
+        有効なトークンを取得する
+
+        Args:
+            min_remaining_seconds (float, optional): 必要な残り有効期間（秒）
+
+        Returns:
+            Optional[str]: トークン。存在しない・期限切れ・別のキーの場合はNone
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"トークンキャッシュの読み込みに失敗しました: {str(e)}")
+            return None
+        if entry.get('key') != self.key or entry.get('expires_at', 0) - time.time() <= min_remaining_seconds:
+            return None
+        return entry.get('token')
+
+    def set(self, token: str, expires_at: float) -> None:
+        """
+        トークンを保存する
+
+        Args:
+            token (str): 認証トークン
+            expires_at (float): 有効期限（UNIX時刻）
+        """
+        cache_dir = os.path.dirname(self.path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{self.path}.new"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'key': self.key, 'token': token, 'expires_at': expires_at}, f)
+        os.chmod(temp_path, 0o600)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,215 @@
+import os
+import io
+import csv
+import gzip
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, List
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 列型の指定（report_fields の type）と、日付文字列のデフォルト書式
+SUPPORTED_FIELD_TYPES = ['string', 'int', 'float', 'date', 'timestamp']
+DEFAULT_DATE_FORMAT = '%Y/%m/%d'
+DEFAULT_TIMESTAMP_FORMAT = '%Y/%m/%d %H:%M:%S'
+
+
+def build_columnar_schema(report_fields: List[Dict[str, str]]):
+    """
+    report_fields から列指向ファイルのスキーマを作成する
+
+    各フィールドは {"name": "フィールド名"} の形式で、任意で
+    "type"（string, int, float, date, timestamp）を指定できます。
+    type を省略した場合は文字列として扱います。
+
+    Args:
+        report_fields (List[Dict[str, str]]): data_config の report_fields
+
+    Returns:
+        pyarrow.Schema: 列順・型が固定されたスキーマ
+
+    Raises:
+        ImportError: pyarrow がインストールされていない場合
+        ValueError: 未対応の型が指定された場合
+    """
+    pa = import_pyarrow()
+    arrow_types = {
+        'string': pa.string(),
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'date': pa.date32(),
+        'timestamp': pa.timestamp('s'),
+    }
+    fields = []
+    for field in report_fields:
+        field_type = field.get('type', 'string')
+        if field_type not in arrow_types:
+            raise ValueError(
+                f"未対応の型です: {field['name']} ({field_type})。"
+                f"{', '.join(SUPPORTED_FIELD_TYPES)} のいずれかを指定してください"
+            )
+        fields.append(pa.field(field['name'], arrow_types[field_type]))
+    return pa.schema(fields)
+
+
+def convert_extract_to_columnar(
+    stream: BinaryIO,
+    output_path: str,
+    report_fields: List[Dict[str, str]],
+    output_format: str = 'parquet',
+    batch_size: int = 65536
+) -> int:
+    """
+    抽出ファイルのストリームを列指向ファイル（Parquet / Arrow）に変換して保存する
+
+    gzip 圧縮は先頭バイトで判定して逐次展開し、CSVを batch_size 行ずつ読み込んで
+    row group（Arrowの場合はレコードバッチ）単位で書き出します。
+    ファイル全体をメモリに載せないため、ファイルサイズに関わらずメモリ使用量は一定です。
+    スキーマは report_fields から作成し、CSVに存在しない列は null、
+    report_fields にない列は出力しません。
+
+    Args:
+        stream (BinaryIO): 抽出ファイルのバイナリストリーム（gzip圧縮・非圧縮のどちらも可）
+        output_path (str): 保存先のパス
+        report_fields (List[Dict[str, str]]): data_config の report_fields
+        output_format (str, optional): 出力形式（'parquet' または 'arrow'）。デフォルト 'parquet'
+        batch_size (int, optional): 1つの row group に含める行数。デフォルト65536行
+
+    Returns:
+        int: 書き出した行数
+
+    Raises:
+        ImportError: pyarrow がインストールされていない場合
+        ValueError: 無効な出力形式、または値の型変換に失敗した場合
+        IOError: ファイル保存失敗時
+    """
+    if output_format not in ('parquet', 'arrow'):
+        raise ValueError(f"無効な出力形式です: {output_format}（'parquet'または'arrow'を指定してください）")
+
+    schema = build_columnar_schema(report_fields)
+    logger.info(f"抽出ファイルを {output_format} 形式に変換します: {output_path}")
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+        logger.debug(f"保存先ディレクトリを作成しました: {output_dir}")
+
+    reader = csv.reader(io.TextIOWrapper(open_decompressed(stream), encoding='utf-8-sig', newline=''))
+    header = next(reader, [])
+    positions = {name: index for index, name in enumerate(header)}
+    missing = [field.name for field in schema if field.name not in positions]
+    if missing:
+        logger.warning(f"抽出ファイルに存在しない列は null として出力します: {', '.join(missing)}")
+
+    temp_file_path = f"{output_path}.tmp"
+    total_rows = 0
+    try:
+        with _open_columnar_writer(output_format, temp_file_path, schema) as write_batch:
+            rows = []
+            for row in reader:
+                if not row:
+                    continue
+                rows.append(row)
+                if len(rows) >= batch_size:
+                    write_batch(_rows_to_record_batch(rows, schema, positions, report_fields))
+                    total_rows += len(rows)
+                    logger.debug(f"変換済み: {total_rows} 行")
+                    rows = []
+            if rows:
+                write_batch(_rows_to_record_batch(rows, schema, positions, report_fields))
+                total_rows += len(rows)
+
+        # 変換が完了したら一時ファイルを本来のファイル名に変更
+        os.replace(temp_file_path, output_path)
+    except Exception:
+        if os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+        raise
+
+    logger.info(f"{total_rows} 行を変換して保存しました: {output_path}")
+    return total_rows
+
+
+def import_pyarrow():
+    """
+    pyarrow を読み込む（列指向ファイルへの変換時のみ必要）
+
+    Returns:
+        module: pyarrow（compute, ipc, parquet を読み込み済み）
+
+    Raises:
+        ImportError: pyarrow がインストールされていない場合
+    """
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("列指向ファイルへの変換には pyarrow が必要です（pip install pyarrow）") from e
+    return pyarrow
+
+
+def open_decompressed(stream: BinaryIO) -> BinaryIO:
+    """
+    gzip 圧縮されたストリームを逐次展開して読み込む
+
+    先頭2バイトがgzipのマジックナンバーであれば展開するストリームを、それ以外はそのまま読み込むストリームを返します。
+
+    Args:
+        stream (BinaryIO): バイナリストリーム（gzip圧縮・非圧縮のどちらも可）
+
+    Returns:
+        BinaryIO: 展開後のデータを読み込むストリーム
+    """
+    buffered = stream if isinstance(stream, io.BufferedReader) else io.BufferedReader(stream)
+    if buffered.peek(2)[:2] == b'\x1f\x8b':
+        logger.debug("gzip圧縮されたファイルを展開しながら読み込みます")
+        return gzip.GzipFile(fileobj=buffered)
+    return buffered
+
+
+@contextmanager
+def _open_columnar_writer(output_format: str, path: str, schema):
+    """出力形式に応じたライターを開き、レコードバッチの書き込み関数を返す"""
+    pa = import_pyarrow()
+    if output_format == 'parquet':
+        writer = pa.parquet.ParquetWriter(path, schema)
+    else:
+        writer = pa.ipc.new_file(path, schema)
+    try:
+        yield writer.write_batch
+    finally:
+        writer.close()
+
+
+def _rows_to_record_batch(rows: List[List[str]], schema, positions: Dict[str, int], report_fields: List[Dict[str, str]]):
+    """CSVの行リストを、スキーマに従って型変換したレコードバッチに変換する"""
+    pa = import_pyarrow()
+    formats = {field['name']: field.get('format') for field in report_fields}
+    arrays = []
+    for field in schema:
+        index = positions.get(field.name)
+        if index is None:
+            arrays.append(pa.nulls(len(rows), field.type))
+            continue
+        values = pa.array(
+            [row[index] if index < len(row) and row[index] != '' else None for row in rows],
+            pa.string()
+        )
+        arrays.append(_cast_column(values, field, formats.get(field.name)))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _cast_column(values, field, value_format: str = None):
+    """文字列の列を指定された型に変換する。日付・日時は format（strptime形式）で解析する"""
+    pa = import_pyarrow()
+    try:
+        if pa.types.is_date32(field.type):
+            parsed = pa.compute.strptime(values, format=value_format or DEFAULT_DATE_FORMAT, unit='s')
+            return parsed.cast(field.type)
+        if pa.types.is_timestamp(field.type):
+            return pa.compute.strptime(values, format=value_format or DEFAULT_TIMESTAMP_FORMAT, unit='s')
+        return values.cast(field.type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        raise ValueError(f"列 '{field.name}' の値を {field.type} に変換できません: {str(e)}") from e
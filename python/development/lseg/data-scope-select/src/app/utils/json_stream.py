@@ -0,0 +1,126 @@
+import json
+import codecs
+from typing import Any, Dict, Iterable, Iterator
+
+_WHITESPACE = ' \t\r\n'
+
+
+def iter_odata_values(
+    chunks: Iterable[bytes],
+    metadata: Dict[str, Any] = None,
+    array_key: str = 'value'
+) -> Iterator[Any]:
+    """
+    OData のコレクション応答（JSON）を逐次解析し、配列の要素を1件ずつ返す
+
+    応答全体を読み込まずに、受信したチャンクから {"value": [...]} の要素を順に取り出します。
+    メモリ使用量は応答全体ではなく1要素分（と受信チャンク1つ分）になります。
+    配列以外のトップレベルのキー（@odata.context, @odata.nextLink など）は metadata に格納します。
+    @odata.nextLink は通常配列の後にあるため、すべての要素を読み終えてから参照してください。
+
+    Args:
+        chunks (Iterable[bytes]): 応答本文のチャンク（response.iter_content() など）
+        metadata (Dict[str, Any], optional): 配列以外のトップレベルのキーと値を格納する辞書
+        array_key (str, optional): 要素を返す配列のキー。デフォルト 'value'
+
+    Yields:
+        Any: 配列の各要素（JSONとして解析済み）
+
+    Raises:
+        ValueError: JSONとして不正な応答、または途中で終端に達した場合
+    """
+    reader = _JsonStreamReader(chunks)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        key = reader.decode_value()
+        reader.expect(':')
+        if key == array_key:
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.next_char()
+            else:
+                while True:
+                    yield reader.decode_value()
+                    separator = reader.next_char()
+                    if separator == ']':
+                        break
+                    if separator != ',':
+                        raise ValueError(f"配列の要素の区切りが不正です: {separator!r}")
+        else:
+            value = reader.decode_value()
+            if metadata is not None:
+                metadata[key] = value
+
+        separator = reader.next_char()
+        if separator == '}':
+            return
+        if separator != ',':
+            raise ValueError(f"オブジェクトのキーの区切りが不正です: {separator!r}")
+
+
+class _JsonStreamReader:
+    """チャンク単位で受信するJSONを、値ごとに読み進めるためのバッファ"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """次のチャンクをバッファに追加する（読み終えた部分は破棄）。終端に達した場合はFalse"""
+        if self._eof:
+            return False
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self._buffer += self._text_decoder.decode(chunk)
+                return True
+        self._eof = True
+        self._buffer += self._text_decoder.decode(b'', final=True)
+        return False
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._fill():
+                return
+
+    def peek(self) -> str:
+        """空白を読み飛ばし、次の文字を返す（読み進めない）"""
+        self._skip_whitespace()
+        if self._pos >= len(self._buffer):
+            raise ValueError("JSONの途中で応答が終了しました")
+        return self._buffer[self._pos]
+
+    def next_char(self) -> str:
+        """空白を読み飛ばし、次の文字を読み進めて返す"""
+        char = self.peek()
+        self._pos += 1
+        return char
+
+    def expect(self, expected: str) -> None:
+        char = self.next_char()
+        if char != expected:
+            raise ValueError(f"JSONの形式が不正です（'{expected}' が必要ですが {char!r} でした）")
+
+    def decode_value(self) -> Any:
+        """次の値を1つ解析する（バッファ内で完結しない場合はチャンクを追加して再解析）"""
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+                # 数値などはバッファの末尾で途切れていても解析できてしまうため、終端以外では続きを確認する
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self._eof:
+                    raise ValueError(f"JSONの解析に失敗しました: {str(e)}") from e
+            self._fill()
@@ -0,0 +1,284 @@
+import os
+import re
+import bisect
+import json
+import time
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List
+from urllib.parse import urlsplit
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# レイテンシのヒストグラムのバケット（秒）
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120]
+
+
+def endpoint_of(url: str) -> str:
+    """
+    URLを集計用のエンドポイント名に変換する
+
+    クエリ文字列と /RestApi/v1 までのパスを除き、('...') で指定されたIDを ('*') に置き換えます。
+
+    Args:
+        url (str): リクエストURL
+
+    Returns:
+        str: エンドポイント名（例: "Extractions/Schedules('*')/LastExtraction"）
+    """
+    path = urlsplit(url).path
+    path = re.sub(r"^.*?/RestApi/v1/", '', path)
+    return re.sub(r"\('[^']*'\)", "('*')", path).lstrip('/')
+
+
+class InstrumentationHooks:
+    """
+    DataScopeClient の計測用フック
+
+    DataScopeClient.add_instrumentation_hook で登録すると、リクエストの送信・リトライ・データの受信・
+    レートリミッターによる待機のたびに対応するメソッドが呼び出されます。
+    必要なメソッドのみをオーバーライドしてください（既定では何もしません）。
+    フック内で発生した例外はログに記録され、リクエストの処理には影響しません。
+    """
+
+    def on_request(self, method: str, endpoint: str, status: int, seconds: float) -> None:
+        """
+        HTTPリクエストの応答を受信した（リトライ・再認証による再送信を含む各送信ごと）
+
+        Args:
+            method (str): HTTPメソッド
+            endpoint (str): エンドポイント名（endpoint_of を参照）
+            status (int): ステータスコード（通信エラーの場合は0）
+            seconds (float): 送信から応答ヘッダーの受信までの秒数
+        """
+
+    def on_retry(self, method: str, endpoint: str, status: int, attempt: int) -> None:
+        """
+        5xx / 429 の応答によりリトライする
+
+        Args:
+            method (str): HTTPメソッド
+            endpoint (str): エンドポイント名
+            status (int): リトライの原因となったステータスコード
+            attempt (int): リトライの回数（1から）
+        """
+
+    def on_bytes_received(self, method: str, endpoint: str, size: int) -> None:
+        """
+        応答本文を受信した（ストリーミングの場合はチャンクごと）
+
+        Args:
+            method (str): HTTPメソッド
+            endpoint (str): エンドポイント名
+            size (int): 受信したバイト数
+        """
+
+    def on_rate_limit_wait(self, limiter: str, seconds: float) -> None:
+        """
+        レートリミッターにより送信を待機した
+
+        Args:
+            limiter (str): レートリミッターの種類（'requests' または 'retries'）
+            seconds (float): 待機した秒数
+        """
+
+
+class _LatencyHistogram:
+    """
+    レイテンシのヒストグラム
+
+    計測値は保持せず、LATENCY_BUCKETS ごとの件数・合計・最大値のみを加算するため、
+    リクエスト数に関わらずメモリ使用量は一定です。
+    """
+
+    def __init__(self):
+        # counts[i] は LATENCY_BUCKETS[i - 1] < 値 <= LATENCY_BUCKETS[i] の件数（末尾は +Inf）
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def cumulative(self) -> List[int]:
+        """各バケット以下の件数（Prometheus のヒストグラムの bucket。末尾は +Inf）"""
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+    def quantile(self, ratio: float) -> float:
+        """
+        分位数をバケット内の線形補間で推定する（Prometheus の histogram_quantile と同じ方法）
+
+        +Inf のバケットに含まれる場合と、推定値が最大値を超える場合は最大値を返します。
+        """
+        rank = ratio * self.count
+        below = 0
+        for index, count in enumerate(self.counts):
+            if count and below + count >= rank:
+                if index == len(LATENCY_BUCKETS):
+                    return self.max
+                lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+                upper = LATENCY_BUCKETS[index]
+                return min(self.max, lower + (upper - lower) * (rank - below) / count)
+            below += count
+        return self.max
+
+
+class ClientMetrics(InstrumentationHooks):
+    """
+    リクエストの計測値を集計するフック
+
+    エンドポイントごとのレイテンシのヒストグラム、ステータスコード、リトライ回数、受信バイト数と、
+    レートリミッターによる待機時間を集計し、Prometheus のテキスト形式と JSON のサマリーとして出力します。
+    複数のスレッドから同時に呼び出して構いません。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+        self._latencies: Dict[tuple, _LatencyHistogram] = defaultdict(_LatencyHistogram)
+        self._statuses: Dict[tuple, int] = defaultdict(int)
+        self._retries: Dict[tuple, int] = defaultdict(int)
+        self._bytes: Dict[tuple, int] = defaultdict(int)
+        self._waits: Dict[str, float] = defaultdict(float)
+
+    def on_request(self, method: str, endpoint: str, status: int, seconds: float) -> None:
+        with self._lock:
+            self._latencies[(method, endpoint)].observe(seconds)
+            self._statuses[(method, endpoint, status)] += 1
+
+    def on_retry(self, method: str, endpoint: str, status: int, attempt: int) -> None:
+        with self._lock:
+            self._retries[(method, endpoint, status)] += 1
+
+    def on_bytes_received(self, method: str, endpoint: str, size: int) -> None:
+        with self._lock:
+            self._bytes[(method, endpoint)] += size
+
+    def on_rate_limit_wait(self, limiter: str, seconds: float) -> None:
+        with self._lock:
+            self._waits[limiter] += seconds
+
+    def summary(self) -> Dict:
+        """
+        集計結果を辞書で取得する
+
+        Returns:
+            Dict: 全体の合計と、"メソッド エンドポイント" ごとの件数・ステータスコード・
+                レイテンシ（合計・平均・中央値・95パーセンタイル・最大。中央値・95パーセンタイルは
+                ヒストグラムのバケットからの推定値）・リトライ回数・受信バイト数
+        """
+        with self._lock:
+            endpoints = {}
+            for (method, endpoint), histogram in sorted(self._latencies.items()):
+                endpoints[f"{method} {endpoint}"] = {
+                    'count': histogram.count,
+                    'status': {
+                        str(status): count for (m, e, status), count in sorted(self._statuses.items())
+                        if (m, e) == (method, endpoint)
+                    },
+                    'retries': sum(count for (m, e, _), count in self._retries.items() if (m, e) == (method, endpoint)),
+                    'latency_seconds': {
+                        'total': histogram.sum,
+                        'mean': histogram.sum / histogram.count,
+                        'p50': histogram.quantile(0.5),
+                        'p95': histogram.quantile(0.95),
+                        'max': histogram.max,
+                    },
+                    'bytes_received': self._bytes.get((method, endpoint), 0),
+                }
+            return {
+                'generated_at': datetime.now(timezone.utc).isoformat(),
+                'elapsed_seconds': time.time() - self._started_at,
+                'requests': sum(histogram.count for histogram in self._latencies.values()),
+                'retries': sum(self._retries.values()),
+                'bytes_received': sum(self._bytes.values()),
+                'rate_limit_wait_seconds': dict(self._waits),
+                'endpoints': endpoints,
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        集計結果を Prometheus のテキスト形式で取得する
+
+        Returns:
+            str: dss_request_duration_seconds（ヒストグラム）、dss_requests_total、dss_retries_total、
+                dss_bytes_received_total、dss_rate_limit_wait_seconds_total の各メトリクス
+        """
+        lines = []
+        with self._lock:
+            lines += [
+                '# HELP dss_request_duration_seconds Time from sending a DSS request to receiving the response headers.',
+                '# TYPE dss_request_duration_seconds histogram',
+            ]
+            for (method, endpoint), histogram in sorted(self._latencies.items()):
+                labels = self._labels(method=method, endpoint=endpoint)
+                for bucket, count in zip(LATENCY_BUCKETS + ['+Inf'], histogram.cumulative()):
+                    lines.append(f"dss_request_duration_seconds_bucket{{{labels},le=\"{bucket}\"}} {count}")
+                lines.append(f"dss_request_duration_seconds_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"dss_request_duration_seconds_count{{{labels}}} {histogram.count}")
+
+            lines += ['# HELP dss_requests_total DSS responses by status code (0 means a connection error).',
+                      '# TYPE dss_requests_total counter']
+            for (method, endpoint, status), count in sorted(self._statuses.items()):
+                lines.append(f"dss_requests_total{{{self._labels(method=method, endpoint=endpoint, status=status)}}} {count}")
+
+            lines += ['# HELP dss_retries_total DSS requests retried after a 5xx or 429 response.',
+                      '# TYPE dss_retries_total counter']
+            for (method, endpoint, status), count in sorted(self._retries.items()):
+                lines.append(f"dss_retries_total{{{self._labels(method=method, endpoint=endpoint, status=status)}}} {count}")
+
+            lines += ['# HELP dss_bytes_received_total Response body bytes received from DSS.',
+                      '# TYPE dss_bytes_received_total counter']
+            for (method, endpoint), size in sorted(self._bytes.items()):
+                lines.append(f"dss_bytes_received_total{{{self._labels(method=method, endpoint=endpoint)}}} {size}")
+
+            lines += ['# HELP dss_rate_limit_wait_seconds_total Time spent waiting on the client-side rate limiters.',
+                      '# TYPE dss_rate_limit_wait_seconds_total counter']
+            for limiter, seconds in sorted(self._waits.items()):
+                lines.append(f"dss_rate_limit_wait_seconds_total{{{self._labels(limiter=limiter)}}} {seconds}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Prometheus のテキスト形式でファイルに出力する（node_exporter の textfile collector 向け）
+
+        Args:
+            path (str): 出力先のパス（別名で書き込んでから置き換える）
+        """
+        self._write(path, self.to_prometheus())
+
+    def write_summary(self, path: str) -> None:
+        """
+        JSON のサマリーをファイルに出力する
+
+        Args:
+            path (str): 出力先のパス
+        """
+        self._write(path, json.dumps(self.summary(), ensure_ascii=False, indent=2))
+
+    @staticmethod
+    def _write(path: str, content: str) -> None:
+        output_dir = os.path.dirname(path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(f"{path}.tmp", path)
+        logger.info(f"計測結果を出力しました: {path}")
+
+    @staticmethod
+    def _labels(**labels) -> str:
+        def escape(value) -> str:
+            return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        return ','.join(f'{key}="{escape(value)}"' for key, value in labels.items())
@@ -0,0 +1,309 @@
+import os
+import io
+import csv
+import json
+import bisect
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from app.core.logger import get_logger
+from app.utils.cache import file_lock
+from app.utils.file_handler import DEFAULT_DATE_FORMAT, DEFAULT_TIMESTAMP_FORMAT, import_pyarrow, open_decompressed
+
+logger = get_logger(__name__)
+
+DateLike = Union[str, date]
+
+
+class PriceStore:
+    """
+    取引日で分割して保存するEOD価格の蓄積ストア
+
+    抽出ファイルを取り込むたびに、行を取引日ごとのパーティション（{dir}/{YYYY}/{YYYY-MM-DD}.csv）に
+    追記します。同じ（RIC, 取引日）の行は後から取り込んだ行で置き換えます。
+    RICごとに「含まれるパーティションの範囲」のインデックス（index.json）を保持し、
+    期間・RICを指定した検索では該当するパーティションのみを読み込みます。
+
+    インデックスは、連続するパーティションに含まれるRICを [開始日, 終了日] の1つの範囲として保存します。
+    範囲は「開始日から終了日までのすべてのパーティションに含まれる」ことを表すため、
+    毎日取得している銘柄であれば期間の長さに関わらず1エントリで済みます。
+    """
+
+    def __init__(
+        self,
+        root_dir: str,
+        ric_field: str = 'RIC',
+        date_field: str = 'Trade Date',
+        date_format: str = DEFAULT_DATE_FORMAT
+    ):
+        """
+        Args:
+            root_dir (str): ストアのディレクトリ
+            ric_field (str, optional): RICの列名。デフォルト 'RIC'
+            date_field (str, optional): 取引日の列名。デフォルト 'Trade Date'
+            date_format (str, optional): 取引日の書式（strptime形式）。デフォルト '%Y/%m/%d'
+        """
+        self.root_dir = root_dir
+        self.ric_field = ric_field
+        self.date_field = date_field
+        self.date_format = date_format
+        self.index_path = os.path.join(root_dir, 'index.json')
+        self.lock_path = os.path.join(root_dir, '.lock')
+
+    def ingest_file(self, path: str) -> int:
+        """
+        抽出ファイルをストアに取り込む
+
+        CSV（gzip圧縮を含む）のほか、拡張子が .parquet / .arrow のファイルは
+        列指向ファイルとして読み込みます（pyarrowが必要）。
+
+        Args:
+            path (str): 抽出ファイルのパス
+
+        Returns:
+            int: 取り込んだ行数
+
+        Raises:
+            ValueError: RIC・取引日の列が存在しない、または取引日を解析できない場合
+            IOError: ファイルの読み書き失敗時
+        """
+        logger.info(f"抽出ファイルをストアに取り込みます: {path}")
+        if path.endswith(('.parquet', '.arrow')):
+            return self.ingest_rows(self._read_columnar_rows(path))
+        with open(path, 'rb') as f:
+            reader = csv.DictReader(io.TextIOWrapper(open_decompressed(f), encoding='utf-8-sig', newline=''))
+            return self.ingest_rows(reader)
+
+    def ingest_rows(self, rows: Iterable[Dict[str, str]]) -> int:
+        """
+        行をストアに取り込む
+
+        行を取引日ごとに分け、パーティションごとに既存の行とマージして書き込みます。
+        書き込みはロックファイルで排他制御するため、複数のプロセスから同時に取り込めます。
+
+        Args:
+            rows (Iterable[Dict[str, str]]): 列名をキーとする行
+
+        Returns:
+            int: 取り込んだ行数（RIC・取引日が空の行を除く）
+
+        Raises:
+            ValueError: RIC・取引日の列が存在しない、または取引日を解析できない場合
+            IOError: ファイルの読み書き失敗時
+        """
+        by_partition: Dict[str, Dict[str, Dict[str, str]]] = {}
+        columns: List[str] = []
+        skipped = 0
+        for row in rows:
+            if not columns:
+                columns = list(row.keys())
+                missing = [name for name in (self.ric_field, self.date_field) if name not in columns]
+                if missing:
+                    raise ValueError(f"抽出ファイルに必要な列がありません: {', '.join(missing)}")
+            ric, trade_date = row.get(self.ric_field), row.get(self.date_field)
+            if not ric or not trade_date:
+                skipped += 1
+                continue
+            by_partition.setdefault(self._partition_key(trade_date), {})[ric] = row
+
+        if skipped:
+            logger.warning(f"RICまたは取引日が空の {skipped} 行は取り込みません")
+        if not by_partition:
+            logger.info("取り込む行はありません")
+            return 0
+
+        with file_lock(self.lock_path):
+            index = self._load_index()
+            for partition in sorted(by_partition):
+                rics = self._merge_partition(partition, by_partition[partition], columns)
+                self._add_to_index(index, partition, rics)
+            self._save_index(index)
+
+        total = sum(len(partition_rows) for partition_rows in by_partition.values())
+        logger.info(f"{total} 行を {len(by_partition)} 個のパーティションに取り込みました")
+        return total
+
+    def partitions_for(
+        self,
+        rics: Optional[Iterable[str]] = None,
+        start_date: Optional[DateLike] = None,
+        end_date: Optional[DateLike] = None
+    ) -> List[str]:
+        """
+        検索条件に該当するパーティションを取得する
+
+        Args:
+            rics (Iterable[str], optional): RICの集合。未指定の場合はすべてのRIC
+            start_date (str | date, optional): 開始日（YYYY-MM-DD形式または date。この日を含む）
+            end_date (str | date, optional): 終了日（YYYY-MM-DD形式または date。この日を含む）
+
+        Returns:
+            List[str]: パーティション（YYYY-MM-DD）の昇順のリスト
+        """
+        index = self._load_index()
+        partitions = index['partitions']
+        start = self._to_key(start_date) if start_date else ''
+        end = self._to_key(end_date) if end_date else '9999-12-31'
+        if rics is None:
+            return partitions[bisect.bisect_left(partitions, start):bisect.bisect_right(partitions, end)]
+
+        selected = set()
+        for ric in rics:
+            for range_start, range_end in index['rics'].get(ric, []):
+                low, high = max(range_start, start), min(range_end, end)
+                if low <= high:
+                    selected.update(partitions[bisect.bisect_left(partitions, low):bisect.bisect_right(partitions, high)])
+        return sorted(selected)
+
+    def query(
+        self,
+        rics: Optional[Iterable[str]] = None,
+        start_date: Optional[DateLike] = None,
+        end_date: Optional[DateLike] = None
+    ) -> Iterator[Dict[str, str]]:
+        """
+        期間・RICを指定して行を取得する
+
+        インデックスから該当するパーティションを求め、そのパーティションのみを
+        取引日の昇順に読み込みます。
+
+        Args:
+            rics (Iterable[str], optional): RICの集合。未指定の場合はすべてのRIC
+            start_date (str | date, optional): 開始日（YYYY-MM-DD形式または date。この日を含む）
+            end_date (str | date, optional): 終了日（YYYY-MM-DD形式または date。この日を含む）
+
+        Yields:
+            Dict[str, str]: 列名をキーとする行（取引日・RICの昇順）
+        """
+        ric_set = set(rics) if rics is not None else None
+        partitions = self.partitions_for(ric_set, start_date, end_date)
+        logger.debug(f"{len(partitions)} 個のパーティションを読み込みます")
+        for partition in partitions:
+            for row in self._read_partition(partition):
+                if ric_set is None or row[self.ric_field] in ric_set:
+                    yield row
+
+    def _partition_key(self, trade_date: str) -> str:
+        """取引日の文字列をパーティションのキー（YYYY-MM-DD）に変換する"""
+        try:
+            return datetime.strptime(trade_date, self.date_format).strftime('%Y-%m-%d')
+        except ValueError as e:
+            raise ValueError(f"取引日を解析できません: {trade_date}（書式: {self.date_format}）") from e
+
+    @staticmethod
+    def _to_key(value: DateLike) -> str:
+        """検索条件の日付をパーティションのキー（YYYY-MM-DD）に変換する"""
+        if isinstance(value, date):
+            return value.strftime('%Y-%m-%d')
+        return date.fromisoformat(value).strftime('%Y-%m-%d')
+
+    def _partition_path(self, partition: str) -> str:
+        return os.path.join(self.root_dir, partition[:4], f"{partition}.csv")
+
+    def _read_partition(self, partition: str) -> List[Dict[str, str]]:
+        """パーティションの行を読み込む（存在しない場合は空のリスト）"""
+        path = self._partition_path(partition)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return list(csv.DictReader(f))
+
+    def _merge_partition(self, partition: str, rows: Dict[str, Dict[str, str]], columns: List[str]) -> List[str]:
+        """
+        パーティションの既存の行に新しい行をマージして書き込む
+
+        Returns:
+            List[str]: マージ後のパーティションに含まれるRIC
+        """
+        merged = {row[self.ric_field]: row for row in self._read_partition(partition)}
+        header = list(next(iter(merged.values())).keys()) if merged else []
+        header += [name for name in columns if name not in header]
+        merged.update(rows)
+
+        path = self._partition_path(partition)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=header, restval='', extrasaction='ignore')
+            writer.writeheader()
+            for ric in sorted(merged):
+                writer.writerow(merged[ric])
+        os.replace(f"{path}.tmp", path)
+        logger.debug(f"パーティション {partition} に {len(rows)} 行をマージしました（合計 {len(merged)} 行）")
+        return list(merged)
+
+    def _load_index(self) -> Dict:
+        """インデックスを読み込む（存在しない場合は空のインデックス）"""
+        if not os.path.exists(self.index_path):
+            return {'partitions': [], 'rics': {}}
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_index(self, index: Dict) -> None:
+        """インデックスを書き込む（別名で書き込んでから置き換える）"""
+        os.makedirs(self.root_dir, exist_ok=True)
+        with open(f"{self.index_path}.new", 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(f"{self.index_path}.new", self.index_path)
+
+    @staticmethod
+    def _add_to_index(index: Dict, partition: str, rics: Iterable[str]) -> None:
+        """
+        パーティションに含まれるRICをインデックスに登録する
+
+        新しいパーティションが既存の範囲の途中に追加された場合、そのパーティションに
+        含まれないRICの範囲を前後に分割します。含まれるRICは前後の範囲と連結します。
+        """
+        partitions = index['partitions']
+        position = bisect.bisect_left(partitions, partition)
+        is_new = position == len(partitions) or partitions[position] != partition
+        if is_new:
+            partitions.insert(position, partition)
+        previous = partitions[position - 1] if position > 0 else None
+        following = partitions[position + 1] if position + 1 < len(partitions) else None
+        ric_set = set(rics)
+
+        if is_new and previous and following:
+            for ric, ranges in index['rics'].items():
+                if ric in ric_set:
+                    continue
+                for i, (range_start, range_end) in enumerate(ranges):
+                    if range_start < partition < range_end:
+                        ranges[i:i + 1] = [[range_start, previous], [following, range_end]]
+                        break
+
+        for ric in ric_set:
+            ranges = index['rics'].setdefault(ric, [])
+            if any(range_start <= partition <= range_end for range_start, range_end in ranges):
+                continue
+            before = next((r for r in ranges if r[1] == previous), None) if previous else None
+            after = next((r for r in ranges if r[0] == following), None) if following else None
+            if before and after:
+                before[1] = after[1]
+                ranges.remove(after)
+            elif before:
+                before[1] = partition
+            elif after:
+                after[0] = partition
+            else:
+                ranges.append([partition, partition])
+                ranges.sort()
+
+    def _read_columnar_rows(self, path: str) -> Iterator[Dict[str, str]]:
+        """Parquet / Arrow ファイルの行を、CSVと同じ文字列の行として読み込む"""
+        pa = import_pyarrow()
+        if path.endswith('.parquet'):
+            batches = pa.parquet.ParquetFile(path).iter_batches()
+        else:
+            reader = pa.ipc.open_file(path)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        for batch in batches:
+            for row in batch.to_pylist():
+                yield {name: self._format_value(value) for name, value in row.items()}
+
+    def _format_value(self, value) -> str:
+        if value is None:
+            return ''
+        if isinstance(value, datetime):
+            return value.strftime(DEFAULT_TIMESTAMP_FORMAT)
+        if isinstance(value, date):
+            return value.strftime(self.date_format)
+        return str(value)
@@ -0,0 +1,110 @@
+import os
+import json
+import time
+import threading
+from typing import Optional
+from app.core.logger import get_logger
+from app.utils.cache import file_lock
+
+logger = get_logger(__name__)
+
+
+class TokenBucket:
+    """
+    トークンバケット方式のレートリミッター
+
+    capacity 個のトークンを上限として毎秒 rate 個のトークンを補充し、
+    リクエストごとにトークンを消費します。トークンが不足している場合は、
+    補充されるまで待機します。各呼び出しの処理量は O(1) で、スレッドセーフです。
+    state_path を指定した場合は残量をファイルに保存し、ロックファイルで排他制御することで
+    複数のプロセス間で同じバジェットを共有します。
+    """
+
+    def __init__(self, rate: float, capacity: float, state_path: Optional[str] = None):
+        """
+        Args:
+            rate (float): 1秒あたりに補充するトークン数
+            capacity (float): バケットの容量（連続して消費できる最大トークン数）
+            state_path (str, optional): 共有する状態ファイルのパス。未指定の場合はプロセス内のみで管理
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._tokens = capacity
+        self._updated_at = time.time()
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        トークンを消費する（不足している場合は補充されるまで待機する）
+
+        Args:
+            tokens (float, optional): 消費するトークン数
+
+        Returns:
+            float: 待機した秒数
+        """
+        waited = 0.0
+        while True:
+            wait = self._consume(tokens)
+            if wait <= 0:
+                return waited
+            logger.debug(f"レートリミットにより {wait:.2f} 秒待機します")
+            time.sleep(wait)
+            waited += wait
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """
+        トークンが足りる場合のみ消費する（待機しない）
+
+        Args:
+            tokens (float, optional): 消費するトークン数
+
+        Returns:
+            bool: 消費できた場合はTrue
+        """
+        return self._consume(tokens) <= 0
+
+    def _consume(self, tokens: float) -> float:
+        """
+        トークンを補充してから消費を試みる
+
+        Returns:
+            float: 消費できた場合は0。不足している場合はトークンが貯まるまでの秒数
+        """
+        with self._lock:
+            if not self.state_path:
+                return self._refill_and_take(tokens)
+            with file_lock(f"{self.state_path}.lock"):
+                self._load_state()
+                wait = self._refill_and_take(tokens)
+                self._save_state()
+                return wait
+
+    def _refill_and_take(self, tokens: float) -> float:
+        """経過時間分のトークンを補充し、足りていれば消費する"""
+        now = time.time()
+        self._tokens = min(self.capacity, self._tokens + max(0.0, now - self._updated_at) * self.rate)
+        self._updated_at = now
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    def _load_state(self) -> None:
+        """共有状態ファイルから残量を読み込む（存在しない・壊れている場合は現在の値を使用）"""
+        if not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self._tokens = state['tokens']
+            self._updated_at = state['updated_at']
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"レートリミッターの状態ファイルの読み込みに失敗しました: {str(e)}")
+
+    def _save_state(self) -> None:
+        """共有状態ファイルに残量を書き込む"""
+        with open(f"{self.state_path}.new", 'w', encoding='utf-8') as f:
+            json.dump({'tokens': self._tokens, 'updated_at': self._updated_at}, f)
+        os.replace(f"{self.state_path}.new", self.state_path)
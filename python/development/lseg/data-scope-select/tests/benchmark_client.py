@@ -0,0 +1,208 @@
+"""
+DataScopeClient のベンチマーク
+
+DSSのスタブサーバー（dss_stub_server.py）を起動し、実環境に接続せずに以下を計測します。
+- ダウンロードのスループット（MB/s、同時接続数ごと）
+- 抽出全体（銘柄リスト・テンプレート・スケジュールの準備 → 抽出待ち → ダウンロード）の所要時間
+- 抽出1回あたりのリクエスト数（エンドポイント別の内訳）
+
+しきい値（--min-download-mbps, --max-requests）を指定した場合は、下回った・超えた時点で
+終了コード1を返すため、変更前後の比較やCIでの劣化検知に使用できます。
+
+使用例:
+    python tests/benchmark_client.py --file-size-mb 256 --latency-ms 20 --connections 1 4 8
+    python tests/benchmark_client.py --error-rate 0.05 --max-requests 20 --json output/benchmark.json
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import statistics
+import tempfile
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.api.client import DataScopeClient  # noqa: E402
+from app.core.config import get_connection_config  # noqa: E402
+from dss_stub_server import DssStubServer, StubSettings  # noqa: E402
+
+REPORT_FIELDS = [{'name': 'RIC'}, {'name': 'Trade Date'}, {'name': 'Universal Close Price'}]
+
+
+def create_client(base_url: str, work_dir: str, requests_per_second: float = None) -> DataScopeClient:
+    """
+    スタブサーバーに接続するクライアントを作成する
+
+    connection_config.yml の設定を使用し、接続先・キャッシュの保存先・プロキシ設定のみ上書きします。
+
+    Args:
+        base_url (str): スタブサーバーのベースURL
+        work_dir (str): キャッシュを保存する作業ディレクトリ
+        requests_per_second (float, optional): rate_limit.requests_per_second の上書き値
+
+    Returns:
+        DataScopeClient: 作成したクライアント
+    """
+    config = get_connection_config()
+    config['api'] = {**config['api'], 'base_url': base_url, 'username': 'bench', 'password': 'bench'}
+    config['use_proxy'] = False
+    config['cache'] = {**config.get('cache', {}), 'dir': os.path.join(work_dir, 'cache')}
+    config['rate_limit'] = {**config.get('rate_limit', {}), 'shared_state_dir': None}
+    if requests_per_second:
+        config['rate_limit']['requests_per_second'] = requests_per_second
+
+    with patch('app.api.client.get_connection_config', return_value=config):
+        return DataScopeClient()
+
+
+def bench_download(server: DssStubServer, work_dir: str, connections: int, repeat: int) -> dict:
+    """
+    抽出ファイルのダウンロードのスループットを計測する
+
+    Args:
+        server (DssStubServer): スタブサーバー
+        work_dir (str): 作業ディレクトリ
+        connections (int): 同時接続数
+        repeat (int): 計測回数
+
+    Returns:
+        dict: 計測結果（MB/sの中央値・最大値、1回あたりのリクエスト数）
+    """
+    client = create_client(server.base_url, work_dir)
+    client.get_auth_token()
+    size = len(server.file_content)
+    rates = []
+    server.reset_counts()
+    for index in range(repeat):
+        output_path = os.path.join(work_dir, f"download_{connections}_{index}.csv.gz")
+        started = time.perf_counter()
+        client.download_extracted_file('F1', output_path, max_connections=connections)
+        rates.append(size / (time.perf_counter() - started) / 1024 / 1024)
+        os.remove(output_path)
+    return {
+        'connections': connections,
+        'file_size_bytes': size,
+        'mbps_median': statistics.median(rates),
+        'mbps_max': max(rates),
+        'requests_per_download': server.total_requests() / repeat,
+    }
+
+
+def bench_extraction(server: DssStubServer, work_dir: str, instrument_count: int) -> dict:
+    """
+    抽出全体の所要時間とリクエスト数を計測する
+
+    main.py と同じ流れ（認証 → 銘柄リスト・テンプレート・スケジュールの準備 → 抽出待ち →
+    ダウンロード）を実行します。スタブサーバーは毎回新しい状態のため、各オブジェクトは新規作成になります。
+    $batch 内の操作はHTTPリクエスト数に含めず、batched_operations に別途集計します。
+
+    Args:
+        server (DssStubServer): スタブサーバー
+        work_dir (str): 作業ディレクトリ
+        instrument_count (int): 銘柄リストに登録する銘柄数
+
+    Returns:
+        dict: 計測結果（所要時間、リクエスト数とエンドポイント別の内訳）
+    """
+    client = create_client(server.base_url, work_dir)
+    instruments = [f"R{index:07d}.T" for index in range(instrument_count)]
+    server.reset_counts()
+    started = time.perf_counter()
+
+    client.get_auth_token()
+    setup_state = client.get_setup_state('bench_list', 'bench_template', 'bench_schedule')
+    list_id = setup_state['list_id'] or client.create_instrument_list('bench_list')
+    client.append_instruments(list_id, instruments)
+    template_id = setup_state['template_id'] or client.create_report_template('bench_template', REPORT_FIELDS)
+    schedule_id = setup_state['schedule_id'] or client.create_schedule('bench_schedule', list_id, template_id, 'EOD')
+    status = client.wait_for_extraction(schedule_id)
+    client.download_extracted_file(status['Result']['FileId'], os.path.join(work_dir, 'extraction.csv.gz'))
+
+    return {
+        'instruments': instrument_count,
+        'elapsed_seconds': time.perf_counter() - started,
+        'requests': server.total_requests(),
+        'requests_by_endpoint': dict(sorted(server.request_counts.items())),
+        'batched_operations': dict(sorted(server.batched_counts.items())),
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='DataScopeClient のベンチマーク（DSSスタブサーバーを使用）')
+    parser.add_argument('--file-size-mb', type=float, default=64, help='抽出ファイル（非圧縮）のサイズ（MB）')
+    parser.add_argument('--latency-ms', type=float, default=0, help='各リクエストの応答遅延（ミリ秒）')
+    parser.add_argument('--no-gzip', action='store_true', help='抽出ファイルをgzip圧縮しない')
+    parser.add_argument('--no-range', action='store_true', help='Rangeリクエスト非対応のサーバーとして動作させる')
+    parser.add_argument('--no-batch', action='store_true', help='$batch 非対応のサーバーとして動作させる')
+    parser.add_argument('--page-size', type=int, default=0, help='銘柄リストの内容を返す1ページの件数（0で分割しない）')
+    parser.add_argument('--error-rate', type=float, default=0, help='5xx / 429 エラーを返す確率（0〜1）')
+    parser.add_argument('--extraction-seconds', type=float, default=1, help='抽出が完了するまでの時間（秒）')
+    parser.add_argument('--connections', type=int, nargs='+', default=[1, 4], help='計測する同時接続数')
+    parser.add_argument('--repeat', type=int, default=3, help='ダウンロードの計測回数')
+    parser.add_argument('--instruments', type=int, default=1000, help='抽出全体の計測で登録する銘柄数')
+    parser.add_argument('--json', help='計測結果を保存するJSONファイルのパス')
+    parser.add_argument('--min-download-mbps', type=float, help='ダウンロードのスループットの下限（MB/s）')
+    parser.add_argument('--max-requests', type=int, help='抽出1回あたりのリクエスト数の上限')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    settings = StubSettings(
+        latency=args.latency_ms / 1000,
+        file_size=int(args.file_size_mb * 1024 * 1024),
+        gzip_file=not args.no_gzip,
+        support_range=not args.no_range,
+        support_batch=not args.no_batch,
+        page_size=args.page_size,
+        error_rate=args.error_rate,
+        extraction_seconds=args.extraction_seconds,
+    )
+    server = DssStubServer(settings).start()
+    results = {'settings': vars(settings), 'download': [], 'extraction': None}
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            for connections in args.connections:
+                result = bench_download(server, work_dir, connections, args.repeat)
+                results['download'].append(result)
+                print(
+                    f"ダウンロード 接続数={connections}: {result['mbps_median']:.1f} MB/s（中央値）"
+                    f" / {result['mbps_max']:.1f} MB/s（最大）, {result['requests_per_download']:.1f} リクエスト/回"
+                )
+            results['extraction'] = bench_extraction(server, work_dir, args.instruments)
+    finally:
+        server.stop()
+
+    extraction = results['extraction']
+    print(f"抽出全体: {extraction['elapsed_seconds']:.2f} 秒, {extraction['requests']} リクエスト")
+    for endpoint, count in extraction['requests_by_endpoint'].items():
+        print(f"  {count:4d}  {endpoint}")
+    for endpoint, count in extraction['batched_operations'].items():
+        print(f"  {count:4d}  {endpoint}（$batch 内）")
+
+    if args.json:
+        output_dir = os.path.dirname(args.json)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    failures = []
+    best_mbps = max(result['mbps_median'] for result in results['download'])
+    if args.min_download_mbps is not None and best_mbps < args.min_download_mbps:
+        failures.append(f"ダウンロードのスループットが下限を下回りました: {best_mbps:.1f} < {args.min_download_mbps} MB/s")
+    if args.max_requests is not None and extraction['requests'] > args.max_requests:
+        failures.append(f"抽出1回あたりのリクエスト数が上限を超えました: {extraction['requests']} > {args.max_requests}")
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,341 @@
+"""
+DSS（DataScope Select）REST APIのスタブサーバー
+
+DataScopeClient が使用するエンドポイントをローカルで再現し、実環境に接続せずに
+動作確認やベンチマークを行うためのサーバーです。
+応答の遅延、抽出ファイルのサイズ・gzip圧縮・Rangeリクエスト・$batch への対応、
+5xx / 429 エラーの発生率を設定できます。
+
+使用例:
+    server = DssStubServer(StubSettings(latency=0.05, file_size=64 * 1024 * 1024))
+    server.start()
+    ...  # server.base_url に接続
+    server.stop()
+"""
+import email
+import gzip
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+API_PREFIX = '/RestApi/v1'
+
+
+@dataclass
+class StubSettings:
+    """スタブサーバーの動作設定"""
+
+    latency: float = 0.0  # 各リクエストの応答までの遅延（秒）
+    file_size: int = 8 * 1024 * 1024  # 抽出ファイル（非圧縮CSV）のサイズ（バイト）
+    gzip_file: bool = True  # 抽出ファイルをgzip圧縮して返すかどうか
+    support_range: bool = True  # Rangeリクエストに対応するかどうか
+    error_rate: float = 0.0  # 5xx / 429 エラーを返す確率（0〜1）
+    support_batch: bool = True  # OData の $batch リクエストに対応するかどうか
+    page_size: int = 0  # 銘柄リストの内容を返す1ページの件数（0の場合は分割しない）
+    extraction_seconds: float = 1.0  # 抽出開始から完了までの時間（秒）
+    seed: int = 0  # エラー発生の乱数シード
+
+
+class DssStubServer:
+    """DSS REST APIのスタブサーバー"""
+
+    def __init__(self, settings: StubSettings = None, port: int = 0):
+        """
+        Args:
+            settings (StubSettings, optional): 動作設定
+            port (int, optional): 待ち受けポート。0の場合は空いているポートを使用
+        """
+        self.settings = settings or StubSettings()
+        self.request_counts = Counter()
+        self.batched_counts = Counter()  # $batch 内の操作数（request_counts には含まない）
+        self._lock = threading.Lock()
+        self._random = random.Random(self.settings.seed)
+        self._objects = {'InstrumentLists': {}, 'ReportTemplates': {}, 'Schedules': {}}
+        self._identifiers = {}
+        self._extraction_started = {}
+        self._next_id = 0
+        self.file_content = self._build_file_content()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """クライアントに設定するベースURL"""
+        return f"http://127.0.0.1:{self._server.server_port}{API_PREFIX}"
+
+    def start(self) -> 'DssStubServer':
+        """サーバーをバックグラウンドスレッドで起動する"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """サーバーを停止する"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def total_requests(self) -> int:
+        """受信したリクエストの合計数"""
+        return sum(self.request_counts.values())
+
+    def reset_counts(self) -> None:
+        """リクエスト数の集計をリセットする"""
+        with self._lock:
+            self.request_counts.clear()
+            self.batched_counts.clear()
+
+    def _build_file_content(self) -> bytes:
+        """抽出ファイルの内容（EOD価格のCSV）を生成する"""
+        header = b"RIC,Trade Date,Universal Close Price\n"
+        rows = []
+        size = len(header)
+        index = 0
+        while size < self.settings.file_size:
+            row = f"R{index:07d}.T,2024/12/09,{1000 + index % 997 * 0.5:.2f}\n".encode()
+            rows.append(row)
+            size += len(row)
+            index += 1
+        content = header + b''.join(rows)
+        return gzip.compress(content, compresslevel=1) if self.settings.gzip_file else content
+
+    def _new_id(self, prefix: str) -> str:
+        with self._lock:
+            self._next_id += 1
+            return f"0x{prefix}{self._next_id:08x}"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_HEAD(self):
+                self._dispatch('HEAD')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+            def do_PATCH(self):
+                self._dispatch('PATCH')
+
+            def do_DELETE(self):
+                self._dispatch('DELETE')
+
+            def _dispatch(self, method):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length) if length else b''
+                status, payload, headers = self._handle(method, self.path, self.headers, body)
+                if isinstance(payload, (dict, list)):
+                    payload = json.dumps(payload).encode()
+                    headers = {'Content-Type': 'application/json; odata.metadata=minimal', **headers}
+                payload = payload if payload is not None else b''
+                self.send_response(status)
+                if 'Content-Length' not in headers:
+                    self.send_header('Content-Length', str(len(payload)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                if method == 'HEAD':
+                    return
+                view = memoryview(payload)
+                for offset in range(0, len(view), 1024 * 1024):
+                    self.wfile.write(view[offset:offset + 1024 * 1024])
+
+            def _handle(self, method, target, headers, raw_body, batched=False):
+                """
+                リクエストを処理し、(ステータス, 本文, ヘッダー) を返す（本文が dict / list の場合はJSON）
+
+                $batch 内の操作（batched=True）はHTTPリクエスト数に含めず、遅延・エラーも発生させない
+                """
+                parts = urlsplit(target)
+                path = parts.path[len(API_PREFIX):] if parts.path.startswith(API_PREFIX) else parts.path
+                path = path if path.startswith('/') else f"/{path}"
+                query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+
+                endpoint = re.sub(r"\('[^']*'\)", "('*')", path)
+                with server._lock:
+                    (server.batched_counts if batched else server.request_counts)[f"{method} {endpoint}"] += 1
+
+                if server.settings.latency and not batched:
+                    time.sleep(server.settings.latency)
+                if not batched and server.settings.error_rate and server._random.random() < server.settings.error_rate:
+                    status = server._random.choice([429, 503])
+                    return status, {'error': 'injected'}, {'Retry-After': '1'} if status == 429 else {}
+                if path != '/Authentication/RequestToken' and not headers.get('Authorization'):
+                    return 401, {'error': 'unauthorized'}, {}
+
+                if path == '/$batch' and method == 'POST':
+                    if not server.settings.support_batch:
+                        return 501, {'error': '$batch is not supported'}, {}
+                    return self.batch(headers, raw_body)
+                body = json.loads(raw_body) if raw_body else {}
+                for route_method, pattern, handler in ROUTES:
+                    match = re.fullmatch(pattern, path)
+                    if match and route_method == ('GET' if method == 'HEAD' else method):
+                        return handler(self, method, match, query, body, headers)
+                return 404, {'error': f"not found: {method} {path}"}, {}
+
+            def batch(self, headers, raw_body):
+                """multipart/mixed の $batch リクエストの各操作を順に処理する"""
+                message = email.message_from_bytes(
+                    f"Content-Type: {headers.get('Content-Type')}\r\n\r\n".encode() + raw_body
+                )
+                boundary = f"batchresponse_{uuid.uuid4().hex}"
+                lines = []
+                for part in message.walk():
+                    if part.get_content_type() != 'application/http':
+                        continue
+                    request = part.get_payload(decode=True)
+                    head, _, body = request.partition(b'\r\n\r\n')
+                    request_line, *header_lines = head.decode().split('\r\n')
+                    method, target, _ = request_line.split(' ')
+                    part_headers = dict(line.split(': ', 1) for line in header_lines if line)
+                    part_headers.setdefault('Authorization', headers.get('Authorization'))
+                    status, payload, response_headers = self._handle(method, target, part_headers, body.strip(), batched=True)
+                    if isinstance(payload, (dict, list)):
+                        payload = json.dumps(payload).encode()
+                        response_headers = {'Content-Type': 'application/json', **response_headers}
+                    lines += [
+                        f"--{boundary}",
+                        'Content-Type: application/http',
+                        'Content-Transfer-Encoding: binary',
+                        '',
+                        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+                        *[f"{key}: {value}" for key, value in response_headers.items()],
+                        '',
+                        (payload or b'').decode(),
+                    ]
+                lines.append(f"--{boundary}--")
+                return 200, '\r\n'.join(lines).encode(), {'Content-Type': f"multipart/mixed; boundary={boundary}"}
+
+            def request_token(self, method, match, query, body, headers):
+                return 200, {'value': f"stub-token-{time.time():.0f}"}, {}
+
+            def list_objects(self, method, match, query, body, headers):
+                kind = match.group(1)
+                items = list(server._objects[kind].values())
+                name_filter = re.fullmatch(r"Name eq '(.*)'", query.get('$filter', ''))
+                if name_filter:
+                    items = [item for item in items if item['Name'] == name_filter.group(1).replace("''", "'")]
+                return 200, {'value': items}, {}
+
+            def create_object(self, method, match, query, body, headers):
+                kind = match.group(1)
+                id_field = {'InstrumentLists': 'ListId', 'ReportTemplates': 'ReportTemplateId', 'Schedules': 'ScheduleId'}[kind]
+                object_id = server._new_id(kind[:2].lower())
+                item = {id_field: object_id, 'Name': body.get('Name', object_id)}
+                server._objects[kind][object_id] = item
+                if kind == 'InstrumentLists':
+                    server._identifiers[object_id] = []
+                if kind == 'Schedules':
+                    server._extraction_started[object_id] = time.time()
+                return 201, item, {}
+
+            def list_identifiers(self, method, match, query, body, headers):
+                identifiers = server._identifiers.get(match.group(1))
+                if identifiers is None:
+                    return 404, {'error': 'list not found'}, {}
+                start = int(query.get('$skiptoken', 0))
+                end = start + server.settings.page_size if server.settings.page_size else len(identifiers)
+                page = {'value': [{'Identifier': ric, 'IdentifierType': 'Ric'} for ric in identifiers[start:end]]}
+                if end < len(identifiers):
+                    page['@odata.nextLink'] = (
+                        f"{server.base_url}/Extractions/InstrumentLists('{match.group(1)}')/Identifiers?$skiptoken={end}"
+                    )
+                return 200, page, {}
+
+            def change_identifiers(self, method, match, query, body, headers):
+                identifiers = server._identifiers.get(match.group(1))
+                if identifiers is None:
+                    return 404, {'error': 'list not found'}, {}
+                rics = [item['Identifier'] for item in body.get('Identifiers', [])]
+                if match.group(2) == 'Append':
+                    existing = set(identifiers)
+                    appended = [ric for ric in dict.fromkeys(rics) if ric not in existing]
+                    identifiers.extend(appended)
+                    return 200, {'AppendResult': {'AppendedInstrumentCount': len(appended)}}, {}
+                removed = set(rics)
+                identifiers[:] = [ric for ric in identifiers if ric not in removed]
+                return 200, {}, {}
+
+            def update_schedule(self, method, match, query, body, headers):
+                if match.group(1) not in server._objects['Schedules']:
+                    return 404, {'error': 'schedule not found'}, {}
+                server._extraction_started[match.group(1)] = time.time()
+                return 204, None, {}
+
+            def delete_schedule(self, method, match, query, body, headers):
+                if server._objects['Schedules'].pop(match.group(1), None) is None:
+                    return 404, {'error': 'schedule not found'}, {}
+                server._extraction_started.pop(match.group(1), None)
+                return 204, None, {}
+
+            def last_extraction(self, method, match, query, body, headers):
+                started = server._extraction_started.get(match.group(1))
+                if started is None:
+                    return 404, {'error': 'schedule not found'}, {}
+                if time.time() - started < server.settings.extraction_seconds:
+                    return 200, {'State': 'Running', 'Status': 'Running'}, {}
+                return 200, {
+                    'State': 'Completed',
+                    'Status': 'Completed',
+                    'ReportExtractionId': 'R1',
+                    'Result': {'FileId': 'F1'}
+                }, {}
+
+            def extraction_files(self, method, match, query, body, headers):
+                return 200, {'value': [
+                    {'ExtractedFileId': 'F1', 'ExtractedFileName': 'extract.csv.gz', 'FileType': 'Full'},
+                    {'ExtractedFileId': 'N1', 'ExtractedFileName': 'extract.notes.txt', 'FileType': 'Note'}
+                ]}, {}
+
+            def file_value(self, method, match, query, body, headers):
+                content = b"Processing completed successfully.\n" if match.group(1).startswith('N') else server.file_content
+                start, end, status = 0, len(content) - 1, 200
+                range_header = headers.get('Range')
+                if range_header and server.settings.support_range:
+                    range_match = re.fullmatch(r'bytes=(\d+)-(\d*)', range_header)
+                    start = int(range_match.group(1))
+                    end = min(int(range_match.group(2)), end) if range_match.group(2) else end
+                    status = 206
+
+                response_headers = {
+                    'Content-Type': 'application/octet-stream',
+                    'Content-Length': str(end - start + 1),
+                    'ETag': f'"{len(content)}"',
+                }
+                if server.settings.support_range:
+                    response_headers['Accept-Ranges'] = 'bytes'
+                if status == 206:
+                    response_headers['Content-Range'] = f"bytes {start}-{end}/{len(content)}"
+                return status, memoryview(content)[start:end + 1], response_headers
+
+        ROUTES = [
+            ('POST', r'/Authentication/RequestToken', Handler.request_token),
+            ('GET', r'/Extractions/(InstrumentLists|ReportTemplates|Schedules)', Handler.list_objects),
+            ('POST', r'/Extractions/(InstrumentLists|ReportTemplates|Schedules)', Handler.create_object),
+            ('GET', r"/Extractions/InstrumentLists\('([^']*)'\)/Identifiers", Handler.list_identifiers),
+            ('POST', r"/Extractions/InstrumentLists\('([^']*)'\)/InstrumentList(Append|Remove)Identifiers",
+             Handler.change_identifiers),
+            ('PATCH', r"/Extractions/Schedules\('([^']*)'\)", Handler.update_schedule),
+            ('DELETE', r"/Extractions/Schedules\('([^']*)'\)", Handler.delete_schedule),
+            ('GET', r"/Extractions/Schedules\('([^']*)'\)/LastExtraction", Handler.last_extraction),
+            ('GET', r"/Extractions/ReportExtractions\('([^']*)'\)/Files", Handler.extraction_files),
+            ('GET', r"/Extractions/ExtractedFiles\('([^']*)'\)/\$value", Handler.file_value),
+        ]
+        return Handler
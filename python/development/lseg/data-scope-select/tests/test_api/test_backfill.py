@@ -0,0 +1,65 @@
+import unittest
+from unittest.mock import MagicMock
+import os
+import shutil
+import tempfile
+from app.api.backfill import HistoricalBackfill, plan_windows
+
+
+class TestPlanWindows(unittest.TestCase):
+    """plan_windows のテスト"""
+
+    def test_split(self):
+        """期間を重複なく分割し、最後の区間は終了日で打ち切ることのテスト"""
+        self.assertEqual(plan_windows('2024-01-01', '2024-01-10', 4), [
+            ('2024-01-01', '2024-01-04'),
+            ('2024-01-05', '2024-01-08'),
+            ('2024-01-09', '2024-01-10'),
+        ])
+
+    def test_month_boundary(self):
+        """月・年をまたぐ期間の分割のテスト"""
+        self.assertEqual(plan_windows('2023-12-30', '2024-01-02', 3), [
+            ('2023-12-30', '2024-01-01'),
+            ('2024-01-02', '2024-01-02'),
+        ])
+
+    def test_single_day(self):
+        """開始日と終了日が同じ場合は1区間になることのテスト"""
+        self.assertEqual(plan_windows('2024-01-01', '2024-01-01', 30), [('2024-01-01', '2024-01-01')])
+
+    def test_invalid(self):
+        """開始日が終了日より後、または区間の日数が1未満の場合のテスト"""
+        with self.assertRaises(ValueError):
+            plan_windows('2024-01-02', '2024-01-01', 1)
+        with self.assertRaises(ValueError):
+            plan_windows('2024-01-01', '2024-01-02', 0)
+        with self.assertRaises(ValueError):
+            plan_windows('2024/01/01', '2024-01-02', 1)
+
+
+class TestHistoricalBackfill(unittest.TestCase):
+    """HistoricalBackfill のテスト"""
+
+    def setUp(self):
+        """テストの前準備"""
+        self.work_dir = tempfile.mkdtemp()
+        self.client = MagicMock()
+        self.client.config = {}
+        self.client.create_schedule.return_value = 'S1'
+        self.backfill = HistoricalBackfill(self.client, 'L1', 'T1', 'test', work_dir=self.work_dir, window_days=10)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.work_dir)
+
+    def test_failed_window_deletes_schedule(self):
+        """抽出に失敗した区間のスケジュールをサーバーから削除し、状態ファイルから外すことのテスト"""
+        self.client.wait_for_extraction.return_value = {'State': 'Failed'}
+
+        results = self.backfill.run('2024-01-01', '2024-01-10', os.path.join(self.work_dir, 'out.csv'))
+
+        self.client.delete_schedule.assert_called_once_with('S1')
+        self.assertEqual(results[0]['status'], 'failed')
+        self.assertIsNone(results[0]['schedule_id'])
+        self.assertIsNone(self.backfill._load_state()['windows']['2024-01-01_2024-01-10']['schedule_id'])
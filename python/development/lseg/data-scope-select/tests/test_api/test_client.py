@@ -0,0 +1,255 @@
+import unittest
+from unittest.mock import patch
+import shutil
+import tempfile
+from datetime import datetime, timezone
+import requests
+from app.api.client import DataScopeClient
+from benchmark_client import create_client
+
+
+class FakeClock:
+    """time.monotonic / time.sleep を置き換える時計（sleep した分だけ進む）"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestPoll(unittest.TestCase):
+    """DataScopeClient._poll のテスト"""
+
+    def setUp(self):
+        """テストの前準備"""
+        self.work_dir = tempfile.mkdtemp()
+        self.client = create_client('http://127.0.0.1:9', self.work_dir)
+        self.client.polling_config = {
+            'initial_interval': 2,
+            'backoff_factor': 2,
+            'recommended_interval': 5,
+            'max_interval': 60,
+            'jitter': 0,
+            'timeout': 1000,
+        }
+        self.clock = FakeClock()
+        patcher = patch.multiple('app.api.client.time', monotonic=self.clock.monotonic, sleep=self.clock.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.work_dir)
+
+    @staticmethod
+    def _check(results):
+        """results の (終了したか, 結果, Retry-After) を順に返す状態確認関数"""
+        iterator = iter(results)
+        return lambda: next(iterator)
+
+    def test_backoff(self):
+        """待機時間を backoff_factor 倍ずつ延ばし、recommended_interval で頭打ちにすることのテスト"""
+        check = self._check([(False, None, None)] * 4 + [(True, 'done', None)])
+
+        self.assertEqual(self.client._poll(check, 'テスト'), 'done')
+        self.assertEqual(self.clock.sleeps, [2, 4, 5, 5])
+
+    def test_retry_after(self):
+        """Retry-After を優先し（max_interval で頭打ち）、バックオフを進めないことのテスト"""
+        check = self._check([
+            (False, None, 7),
+            (False, None, 100),
+            (False, None, None),
+            (True, 'done', None),
+        ])
+
+        self.assertEqual(self.client._poll(check, 'テスト', first_delay=3), 'done')
+        self.assertEqual(self.clock.sleeps, [3, 7, 60, 2])
+
+    def test_deadline(self):
+        """待機上限を超えて待機せず、上限に達したら TimeoutError を送出することのテスト"""
+        check = self._check([(False, None, None)] * 3)
+
+        with self.assertRaises(TimeoutError):
+            self.client._poll(check, 'テスト', timeout=5)
+        self.assertEqual(self.clock.sleeps, [2, 3])
+
+
+class TestSendRetry(unittest.TestCase):
+    """DataScopeClient._send のステータスによるリトライのテスト"""
+
+    def setUp(self):
+        """テストの前準備"""
+        self.work_dir = tempfile.mkdtemp()
+        self.client = create_client('http://127.0.0.1:9', self.work_dir)
+        self.client.config['retry'] = {**self.client.config['retry'], 'max_attempts': 3, 'status_forcelist': [502, 503, 504]}
+        patcher = patch('app.api.client.time.sleep')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.work_dir)
+
+    def _send(self, statuses, method, **kwargs):
+        """statuses のステータスを順に返すセッションで送信し、(最後のステータス, 送信回数) を返す"""
+        responses = []
+        for status in statuses:
+            response = requests.Response()
+            response.status_code = status
+            response._content = b''
+            responses.append(response)
+        with patch.object(self.client.session, 'request', side_effect=responses) as mock_request:
+            response = self.client._send(method, 'http://127.0.0.1:9/Extractions/Schedules', **kwargs)
+        return response.status_code, mock_request.call_count
+
+    def test_retry_idempotent(self):
+        """GET は 5xx でリトライすることのテスト"""
+        self.assertEqual(self._send([503, 502, 200], 'GET'), (200, 3))
+
+    def test_no_retry_post_on_5xx(self):
+        """POST は 5xx を再送信せずに返すことのテスト（処理済みの場合に重複作成となるため）"""
+        self.assertEqual(self._send([503, 201], 'POST'), (503, 1))
+        self.assertEqual(self._send([502, 200], 'PATCH'), (502, 1))
+
+    def test_retry_post_on_429(self):
+        """429（未処理）は POST でもリトライすることのテスト"""
+        self.assertEqual(self._send([429, 201], 'POST'), (201, 2))
+
+    def test_retry_post_marked_idempotent(self):
+        """呼び出し側が再送信しても安全と指定した POST は 5xx でリトライすることのテスト"""
+        self.assertEqual(self._send([503, 200], 'POST', idempotent=True), (200, 2))
+
+class TestGroupInstrumentsByArrival(unittest.TestCase):
+    """DataScopeClient.group_instruments_by_arrival のテスト"""
+
+    NOW = datetime(2024, 12, 9, tzinfo=timezone.utc)
+
+    def test_group_by_ceiling(self):
+        """データ提供時刻を単位時間に切り上げてグループ化し、提供時刻が不明な銘柄は最も遅いグループに含めることのテスト"""
+        groups = DataScopeClient.group_instruments_by_arrival([
+            {'Identifier': 'C.T', 'AverageArrivalUtc': '2024-12-09T08:16:00Z'},
+            {'Identifier': 'A.T', 'AverageArrivalUtc': '08:01:00'},
+            {'Identifier': 'B.T', 'AverageArrivalUtc': '08:15:00'},
+            {'Identifier': 'D.T', 'AverageArrivalUtc': None},
+            {'Identifier': 'E.T', 'AverageArrivalUtc': 'invalid'},
+        ], group_minutes=15, now=self.NOW)
+
+        self.assertEqual(groups, [
+            (datetime(2024, 12, 9, 8, 15, tzinfo=timezone.utc), ['A.T', 'B.T']),
+            (datetime(2024, 12, 9, 8, 30, tzinfo=timezone.utc), ['C.T', 'D.T', 'E.T']),
+        ])
+
+    def test_unknown_arrival_only(self):
+        """すべての銘柄の提供時刻が不明な場合、基準時刻の1グループにまとめることのテスト"""
+        groups = DataScopeClient.group_instruments_by_arrival(
+            [{'Identifier': 'A.T'}, {'Identifier': 'B.T', 'AverageArrivalUtc': ''}], now=self.NOW
+        )
+
+        self.assertEqual(groups, [(self.NOW, ['A.T', 'B.T'])])
+
+class TestBatch(unittest.TestCase):
+    """$batch の本文の作成と応答の分割のテスト"""
+
+    def setUp(self):
+        """テストの前準備"""
+        self.work_dir = tempfile.mkdtemp()
+        self.client = create_client('http://127.0.0.1:9', self.work_dir)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.work_dir)
+
+    def test_build_batch_body(self):
+        """GETはそのまま、それ以外は変更セットで囲んで multipart/mixed の本文にすることのテスト"""
+        body = DataScopeClient._build_batch_body([
+            {'method': 'GET', 'path': 'Extractions/InstrumentLists', 'params': {'$filter': "Name eq 'a b'"}},
+            {'method': 'POST', 'path': 'Extractions/Schedules', 'json': {'Name': 'daily'}},
+        ], 'batch_1').decode('utf-8')
+        lines = body.split('\r\n')
+
+        self.assertEqual(lines[0], '--batch_1')
+        self.assertIn('Content-ID: 1', lines)
+        self.assertIn("GET Extractions/InstrumentLists?%24filter=Name%20eq%20%27a%20b%27 HTTP/1.1", lines)
+        changeset = next(line for line in lines if line.startswith('Content-Type: multipart/mixed; boundary='))
+        boundary = changeset.split('boundary=')[1]
+        post = lines.index('POST Extractions/Schedules HTTP/1.1')
+        self.assertLess(lines.index(f"--{boundary}"), post)
+        self.assertEqual(lines[post + 4], '{"Name": "daily"}')
+        self.assertEqual(lines[post + 5], f"--{boundary}--")
+        self.assertEqual(lines[-2:], ['--batch_1--', ''])
+
+    def test_parse_batch_response(self):
+        """変更セット内の応答も含め、操作の順に応答を分割することのテスト"""
+        content = '\r\n'.join([
+            '--batchresponse_1',
+            'Content-Type: application/http',
+            'Content-Transfer-Encoding: binary',
+            '',
+            'HTTP/1.1 200 OK',
+            'Content-Type: application/json',
+            '',
+            '{"value": [{"ListId": "L1"}]}',
+            '--batchresponse_1',
+            'Content-Type: multipart/mixed; boundary=changesetresponse_1',
+            '',
+            '--changesetresponse_1',
+            'Content-Type: application/http',
+            'Content-Transfer-Encoding: binary',
+            '',
+            'HTTP/1.1 201 Created',
+            'Content-Type: application/json',
+            '',
+            '{"ScheduleId": "S1"}',
+            '--changesetresponse_1--',
+            '--batchresponse_1',
+            'Content-Type: application/http',
+            'Content-Transfer-Encoding: binary',
+            '',
+            'HTTP/1.1 404 Not Found',
+            '',
+            '',
+            '--batchresponse_1--',
+            '',
+        ]).encode('utf-8')
+        response = requests.Response()
+        response.status_code = 200
+        response.headers['Content-Type'] = 'multipart/mixed; boundary=batchresponse_1'
+        response._content = content
+
+        results = self.client._parse_batch_response(response)
+
+        self.assertEqual([result['status'] for result in results], [200, 201, 404])
+        self.assertEqual(results[0]['body'], {'value': [{'ListId': 'L1'}]})
+        self.assertEqual(results[0]['headers']['Content-Type'], 'application/json')
+        self.assertEqual(results[1]['body'], {'ScheduleId': 'S1'})
+        self.assertIsNone(results[2]['body'])
+
+    def test_resolve_name_lookup(self):
+        """$batch の検索結果から名前が一致する要素のIDを取得することのテスト"""
+        result = {'status': 200, 'headers': {}, 'body': {'value': [
+            {'ListId': 'L0', 'Name': 'other'}, {'ListId': 'L1', 'Name': 'my_list'}
+        ]}}
+
+        self.assertEqual(self.client._resolve_name_lookup('InstrumentLists', 'my_list', result), 'L1')
+        self.assertIsNone(self.client._resolve_name_lookup('InstrumentLists', 'missing', result))
+
+    def test_resolve_name_lookup_unexpected_body(self):
+        """検索結果が JSON のコレクションでない場合、ステータスを含む ValueError を送出することのテスト"""
+        for status, body in ((204, None), (200, 'An error has occurred.'), (200, {'error': 'x'})):
+            with self.subTest(status=status, body=body):
+                with self.assertRaisesRegex(ValueError, f"ステータス: {status}"):
+                    self.client._resolve_name_lookup('Schedules', 'daily', {'status': status, 'headers': {}, 'body': body})
+
+    def test_resolve_name_lookup_error_status(self):
+        """検索がエラーの場合、HTTPError を送出することのテスト"""
+        result = {'status': 500, 'headers': {}, 'body': 'Internal Server Error'}
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.client._resolve_name_lookup('Schedules', 'daily', result)
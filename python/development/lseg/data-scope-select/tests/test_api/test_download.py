@@ -0,0 +1,182 @@
+import unittest
+from unittest.mock import patch
+import os
+import json
+import shutil
+import tempfile
+import requests
+from benchmark_client import create_client
+from dss_stub_server import DssStubServer, StubSettings
+
+PART_SIZE = 64 * 1024
+
+
+class TestDownloadToFile(unittest.TestCase):
+    """DataScopeClient の抽出ファイルのダウンロード（_download_to_file）のテスト"""
+
+    @classmethod
+    def setUpClass(cls):
+        """スタブサーバーの起動"""
+        cls.server = DssStubServer(StubSettings(file_size=512 * 1024, gzip_file=False)).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        """スタブサーバーの停止"""
+        cls.server.stop()
+
+    def setUp(self):
+        """テストの前準備"""
+        self.server.settings.support_range = True
+        self.work_dir = tempfile.mkdtemp()
+        self.client = create_client(self.server.base_url, self.work_dir)
+        self.client.get_auth_token()
+        self.client.download_config = {'parallel_connections': 4, 'part_size': PART_SIZE}
+        self.output_path = os.path.join(self.work_dir, 'extract.csv')
+        self.temp_file_path = f"{self.output_path}.tmp"
+        self.state_path = f"{self.temp_file_path}.json"
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.server.settings.support_range = True
+        shutil.rmtree(self.work_dir)
+
+    def _read_output(self) -> bytes:
+        with open(self.output_path, 'rb') as f:
+            return f.read()
+
+    def _file_requests(self) -> int:
+        """抽出ファイルの取得（GET）のリクエスト数"""
+        return self.server.request_counts["GET /Extractions/ExtractedFiles('*')/$value"]
+
+    def _write_resume_files(self, content: bytes, mode: str, completed_parts: list, file_id: str = 'F1') -> None:
+        """前回中断したダウンロードの一時ファイルと再開情報を作成する"""
+        size = len(self.server.file_content)
+        with open(self.temp_file_path, 'wb') as f:
+            f.write(content)
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'file_id': file_id,
+                'size': size,
+                'etag': f'"{size}"',
+                'mode': mode,
+                'completed_parts': completed_parts
+            }, f)
+
+    def test_range_download(self):
+        """区間ごとに並列で取得し、元のファイルと同じ内容で保存することのテスト"""
+        self.server.reset_counts()
+        self.client.download_extracted_file('F1', self.output_path)
+
+        self.assertEqual(self._read_output(), self.server.file_content)
+        parts = -(-len(self.server.file_content) // PART_SIZE)
+        self.assertEqual(self._file_requests(), parts)
+        self.assertFalse(os.path.exists(self.temp_file_path))
+        self.assertFalse(os.path.exists(self.state_path))
+
+    def test_range_download_resumes_remaining_parts(self):
+        """再開情報に記録された完了済みの区間は取得せず、残りの区間のみを取得することのテスト"""
+        content = self.server.file_content
+        completed = content[:2 * PART_SIZE] + b'\0' * (len(content) - 2 * PART_SIZE)
+        self._write_resume_files(completed, 'ranges', [0, PART_SIZE])
+
+        self.server.reset_counts()
+        self.client.download_extracted_file('F1', self.output_path)
+
+        self.assertEqual(self._read_output(), content)
+        parts = -(-len(content) // PART_SIZE)
+        self.assertEqual(self._file_requests(), parts - 2)
+        self.assertFalse(os.path.exists(self.state_path))
+
+    def test_truncated_part_keeps_completed_parts(self):
+        """区間の受信が途中で終了した場合、完了済みの区間を残し、次回は残りの区間のみを取得することのテスト"""
+        count_received = self.client._count_received
+        calls = []
+
+        def truncate_first_part(method, url, chunks):
+            calls.append(url)
+            received = count_received(method, url, chunks)
+            # 最初の区間のみ、1チャンク受信した時点で接続が切れたものとする
+            return iter([next(received)]) if len(calls) == 1 else received
+
+        with patch.object(self.client, '_count_received', side_effect=truncate_first_part):
+            with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+                self.client.download_extracted_file('F1', self.output_path)
+
+        self.assertTrue(os.path.exists(self.temp_file_path))
+        with open(self.state_path, encoding='utf-8') as f:
+            completed_parts = json.load(f)['completed_parts']
+        # 途中で終了した区間は完了として記録しない（未着手の区間は取り消される）
+        parts = -(-len(self.server.file_content) // PART_SIZE)
+        self.assertTrue(0 < len(completed_parts) < parts)
+
+        self.server.reset_counts()
+        self.client.download_extracted_file('F1', self.output_path)
+
+        self.assertEqual(self._read_output(), self.server.file_content)
+        self.assertEqual(self._file_requests(), parts - len(completed_parts))
+
+    def test_stream_download_resumes_from_temp_file(self):
+        """単一ストリームの場合、一時ファイルのサイズから Range を指定して続きを取得することのテスト"""
+        self.client.download_config = {'parallel_connections': 1}
+        content = self.server.file_content
+        self._write_resume_files(content[:100000], 'stream', [])
+
+        progress = []
+        self.client.download_extracted_file(
+            'F1', self.output_path, progress_callback=lambda downloaded, total: progress.append(downloaded)
+        )
+
+        self.assertEqual(self._read_output(), content)
+        # 取得済みの 100000 バイトに続けて受信している
+        self.assertGreater(progress[0], 100000)
+        self.assertEqual(progress[-1], len(content))
+
+    def test_stream_download_already_received(self):
+        """一時ファイルに全体を受信済みの場合、取得せずに検証して保存することのテスト"""
+        self.client.download_config = {'parallel_connections': 1}
+        self._write_resume_files(self.server.file_content, 'stream', [])
+
+        self.server.reset_counts()
+        self.client.download_extracted_file('F1', self.output_path)
+
+        self.assertEqual(self._read_output(), self.server.file_content)
+        self.assertEqual(self._file_requests(), 0)
+
+    def test_resume_state_of_other_file_is_discarded(self):
+        """再開情報が別のファイルのものである場合、一時ファイルを破棄して最初から取得することのテスト"""
+        self._write_resume_files(b'x' * len(self.server.file_content), 'ranges', [0, PART_SIZE], file_id='F2')
+
+        self.client.download_extracted_file('F1', self.output_path)
+
+        self.assertEqual(self._read_output(), self.server.file_content)
+
+    def test_size_mismatch_removes_temp_files(self):
+        """受信したサイズがHEADの応答と一致しない場合、ValueErrorを送出し一時ファイルを削除することのテスト"""
+        self.client.download_config = {'parallel_connections': 1}
+        size = len(self.server.file_content)
+        file_info = {'size': size + 1, 'etag': f'"{size}"', 'ranges': True}
+
+        with patch.object(self.client, '_probe_download', return_value=file_info):
+            with self.assertRaises(ValueError):
+                self.client.download_extracted_file('F1', self.output_path)
+
+        self.assertFalse(os.path.exists(self.output_path))
+        self.assertFalse(os.path.exists(self.temp_file_path))
+        self.assertFalse(os.path.exists(self.state_path))
+
+    def test_range_download_without_206_falls_back_to_stream(self):
+        """区間の要求に206が返されない場合、単一ストリームで取得し直して完了することのテスト"""
+        probe = self.client._probe_download
+
+        def probe_then_disable_range(url, timeout):
+            # HEADではRange対応と応答し、区間の要求には200を返すサーバー
+            file_info = probe(url, timeout)
+            self.server.settings.support_range = False
+            return file_info
+
+        with patch.object(self.client, '_probe_download', side_effect=probe_then_disable_range):
+            self.client.download_extracted_file('F1', self.output_path)
+
+        self.assertEqual(self._read_output(), self.server.file_content)
+        self.assertFalse(os.path.exists(self.temp_file_path))
+        self.assertFalse(os.path.exists(self.state_path))
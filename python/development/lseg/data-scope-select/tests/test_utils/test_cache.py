@@ -0,0 +1,104 @@
+import unittest
+from unittest.mock import patch
+import os
+import shutil
+import tempfile
+from app.utils.cache import IdCache, TokenCache
+
+
+class TestIdCache(unittest.TestCase):
+    """IdCacheのテスト"""
+
+    def setUp(self):
+        """テストの前準備"""
+        self.work_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.work_dir, 'cache', 'ids.json')
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.work_dir)
+
+    def test_save_merges_other_process_entries(self):
+        """別のプロセス（インスタンス）が登録したエントリを上書きしないことのテスト"""
+        first = IdCache(self.path, 3600)
+        second = IdCache(self.path, 3600)
+        first.set('InstrumentLists', 'list_a', 'ID_A')
+        second.set('ReportTemplates', 'template_b', 'ID_B')
+
+        reloaded = IdCache(self.path, 3600)
+        self.assertEqual(reloaded.get('InstrumentLists', 'list_a'), 'ID_A')
+        self.assertEqual(reloaded.get('ReportTemplates', 'template_b'), 'ID_B')
+        # 書き込み時に読み込み直したエントリはこのインスタンスからも参照できる
+        self.assertEqual(second.get('InstrumentLists', 'list_a'), 'ID_A')
+
+    def test_invalidate_path_keeps_other_entries(self):
+        """削除したエントリのみをファイルから削除することのテスト"""
+        first = IdCache(self.path, 3600)
+        second = IdCache(self.path, 3600)
+        first.set('Schedules', 'schedule_a', 'ID_A')
+        second.set('Schedules', 'schedule_b', 'ID_B')
+        first.invalidate_path("/Extractions/Schedules('ID_A')")
+
+        reloaded = IdCache(self.path, 3600)
+        self.assertIsNone(reloaded.get('Schedules', 'schedule_a'))
+        self.assertEqual(reloaded.get('Schedules', 'schedule_b'), 'ID_B')
+
+    @patch('app.utils.cache.time.time')
+    def test_expiry(self, mock_time):
+        """登録から ttl_seconds を経過したエントリは無効として扱うことのテスト"""
+        mock_time.return_value = 1000.0
+        cache = IdCache(self.path, 60)
+        cache.set('InstrumentLists', 'list_a', 'ID_A')
+
+        mock_time.return_value = 1059.0
+        self.assertEqual(cache.get('InstrumentLists', 'list_a'), 'ID_A')
+        mock_time.return_value = 1060.0
+        self.assertIsNone(cache.get('InstrumentLists', 'list_a'))
+
+    def test_disabled(self):
+        """ttl_seconds が0以下の場合はキャッシュを使用しないことのテスト"""
+        cache = IdCache(self.path, 0)
+        cache.set('InstrumentLists', 'list_a', 'ID_A')
+
+        self.assertIsNone(cache.get('InstrumentLists', 'list_a'))
+        self.assertFalse(os.path.exists(self.path))
+
+
+class TestTokenCache(unittest.TestCase):
+    """TokenCacheのテスト"""
+
+    def setUp(self):
+        """テストの前準備"""
+        self.work_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.work_dir, 'cache', 'token.json')
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.work_dir)
+
+    @patch('app.utils.cache.time.time')
+    def test_expiry(self, mock_time):
+        """有効期限までの残り時間が min_remaining_seconds 以下のトークンは返さないことのテスト"""
+        mock_time.return_value = 1000.0
+        cache = TokenCache(self.path, 'https://example.com:user')
+        cache.set('TOKEN', 1100.0)
+
+        self.assertEqual(cache.get(), 'TOKEN')
+        self.assertEqual(cache.get(min_remaining_seconds=99), 'TOKEN')
+        self.assertIsNone(cache.get(min_remaining_seconds=100))
+        mock_time.return_value = 1100.0
+        self.assertIsNone(cache.get())
+
+    def test_other_key(self):
+        """別のキー（接続先・ユーザー）で保存したトークンは返さないことのテスト"""
+        TokenCache(self.path, 'https://example.com:user').set('TOKEN', 4102444800.0)
+
+        self.assertIsNone(TokenCache(self.path, 'https://example.com:other').get())
+        self.assertEqual(TokenCache(self.path, 'https://example.com:user').get(), 'TOKEN')
+
+    def test_file_permission(self):
+        """トークンのファイルは所有者のみ読み書きできることのテスト"""
+        TokenCache(self.path, 'key').set('TOKEN', 4102444800.0)
+
+        if os.name == 'posix':
+            self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
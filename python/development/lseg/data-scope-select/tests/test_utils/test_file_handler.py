@@ -0,0 +1,71 @@
+import unittest
+from unittest.mock import patch
+import io
+import os
+import sys
+import gzip
+import shutil
+import tempfile
+from app.utils.file_handler import convert_extract_to_columnar, import_pyarrow, open_decompressed
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+REPORT_FIELDS = [
+    {'name': 'RIC'},
+    {'name': 'Trade Date', 'type': 'date'},
+    {'name': 'Universal Close Price', 'type': 'float'},
+]
+CSV_BODY = b'RIC,Trade Date,Universal Close Price\n7203.T,2024/01/04,2500.5\n6758.T,2024/01/04,\n'
+
+
+class TestFileHandler(unittest.TestCase):
+    """file_handler のテスト"""
+
+    def setUp(self):
+        """テストの前準備"""
+        self.work_dir = tempfile.mkdtemp()
+        self.output_path = os.path.join(self.work_dir, 'prices.parquet')
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.work_dir)
+
+    def test_open_decompressed(self):
+        """gzip圧縮・非圧縮のどちらも展開後のデータを読み込めることのテスト"""
+        self.assertEqual(open_decompressed(io.BytesIO(gzip.compress(CSV_BODY))).read(), CSV_BODY)
+        self.assertEqual(open_decompressed(io.BytesIO(CSV_BODY)).read(), CSV_BODY)
+
+    def test_import_pyarrow_missing(self):
+        """pyarrow が未インストールの場合にインストール方法を示す ImportError となることのテスト"""
+        with patch.dict(sys.modules, {'pyarrow': None}):
+            with self.assertRaises(ImportError) as context:
+                import_pyarrow()
+        self.assertIn('pip install pyarrow', str(context.exception))
+
+    def test_convert_without_pyarrow(self):
+        """pyarrow が未インストールの場合、変換前に ImportError となりファイルを作成しないことのテスト"""
+        with patch.dict(sys.modules, {'pyarrow': None}):
+            with self.assertRaises(ImportError):
+                convert_extract_to_columnar(io.BytesIO(CSV_BODY), self.output_path, REPORT_FIELDS)
+        self.assertEqual(os.listdir(self.work_dir), [])
+
+    def test_convert_invalid_format(self):
+        """無効な出力形式のテスト"""
+        with self.assertRaises(ValueError):
+            convert_extract_to_columnar(io.BytesIO(CSV_BODY), self.output_path, REPORT_FIELDS, output_format='csv')
+
+    @unittest.skipIf(pyarrow is None, "pyarrow がインストールされていません")
+    def test_convert_to_parquet(self):
+        """gzip圧縮されたCSVを型変換して Parquet に保存することのテスト"""
+        import pyarrow.parquet
+
+        rows = convert_extract_to_columnar(io.BytesIO(gzip.compress(CSV_BODY)), self.output_path, REPORT_FIELDS)
+
+        self.assertEqual(rows, 2)
+        table = pyarrow.parquet.read_table(self.output_path)
+        self.assertEqual(table.column('RIC').to_pylist(), ['7203.T', '6758.T'])
+        self.assertEqual(table.column('Universal Close Price').to_pylist(), [2500.5, None])
+        self.assertEqual(str(table.schema.field('Trade Date').type), 'date32[day]')
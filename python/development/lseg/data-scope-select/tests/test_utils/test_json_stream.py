@@ -0,0 +1,55 @@
+import unittest
+import json
+from app.utils.json_stream import iter_odata_values
+
+
+def split_bytes(data: bytes, size: int):
+    """data を size バイトごとのチャンクに分割する"""
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestIterOdataValues(unittest.TestCase):
+    """iter_odata_values のテスト"""
+
+    def test_split_chunks(self):
+        """要素・数値・マルチバイト文字がチャンクの境界で分割されていても解析できることのテスト"""
+        items = [{'Identifier': '7203.T', 'Price': 2650.5}, {'Identifier': '銘柄', 'Price': 12345}, 1024, 'text']
+        data = json.dumps({'@odata.context': 'ctx', 'value': items}, ensure_ascii=False).encode('utf-8')
+
+        for size in (1, 2, 3, 7, len(data)):
+            with self.subTest(size=size):
+                self.assertEqual(list(iter_odata_values(split_bytes(data, size))), items)
+
+    def test_next_link(self):
+        """配列以外のキー（@odata.nextLink など）を metadata に格納することのテスト"""
+        data = b'{"@odata.context": "ctx", "value": [{"a": 1}], "@odata.nextLink": "https://example.com/?$skiptoken=2"}'
+        metadata = {}
+
+        self.assertEqual(list(iter_odata_values(split_bytes(data, 5), metadata)), [{'a': 1}])
+        self.assertEqual(metadata, {'@odata.context': 'ctx', '@odata.nextLink': 'https://example.com/?$skiptoken=2'})
+
+    def test_empty(self):
+        """空の配列・空のオブジェクトのテスト"""
+        self.assertEqual(list(iter_odata_values([b'{"value": [ ]}'])), [])
+        self.assertEqual(list(iter_odata_values([b' { } '])), [])
+
+    def test_array_key(self):
+        """array_key で指定した配列の要素を返すことのテスト"""
+        data = b'{"Contents": [1, 2], "value": [3]}'
+        metadata = {}
+
+        self.assertEqual(list(iter_odata_values([data], metadata, array_key='Contents')), [1, 2])
+        self.assertEqual(metadata, {'value': [3]})
+
+    def test_truncated(self):
+        """応答が途中で終了した場合、ValueErrorを送出することのテスト"""
+        values = iter_odata_values(split_bytes(b'{"value": [{"a": 1}, {"a": 2', 4))
+
+        self.assertEqual(next(values), {'a': 1})
+        with self.assertRaises(ValueError):
+            next(values)
+
+    def test_invalid(self):
+        """JSONのオブジェクトでない場合、ValueErrorを送出することのテスト"""
+        with self.assertRaises(ValueError):
+            list(iter_odata_values([b'[1, 2]']))
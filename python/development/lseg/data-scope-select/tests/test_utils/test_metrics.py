@@ -0,0 +1,38 @@
+import unittest
+from app.utils.metrics import ClientMetrics, endpoint_of
+
+
+class TestClientMetrics(unittest.TestCase):
+    """ClientMetricsのテスト"""
+
+    def test_endpoint_of(self):
+        """URLをエンドポイント名に変換することのテスト"""
+        self.assertEqual(
+            endpoint_of("https://example.com/RestApi/v1/Extractions/Schedules('0x1')/LastExtraction?$expand=x"),
+            "Extractions/Schedules('*')/LastExtraction"
+        )
+
+    def test_latency_histogram(self):
+        """レイテンシをバケットごとの件数・合計・件数として集計することのテスト"""
+        metrics = ClientMetrics()
+        for seconds in [0.01, 0.05, 0.3, 0.3, 200.0]:
+            metrics.on_request('GET', 'Extractions/Schedules', 200, seconds)
+        metrics.on_request('GET', 'Extractions/Schedules', 0, 0.2)
+
+        text = metrics.to_prometheus()
+        labels = 'method="GET",endpoint="Extractions/Schedules"'
+        self.assertIn(f'dss_request_duration_seconds_bucket{{{labels},le="0.05"}} 2', text)
+        self.assertIn(f'dss_request_duration_seconds_bucket{{{labels},le="0.25"}} 3', text)
+        self.assertIn(f'dss_request_duration_seconds_bucket{{{labels},le="0.5"}} 5', text)
+        self.assertIn(f'dss_request_duration_seconds_bucket{{{labels},le="120"}} 5', text)
+        self.assertIn(f'dss_request_duration_seconds_bucket{{{labels},le="+Inf"}} 6', text)
+        self.assertIn(f'dss_request_duration_seconds_count{{{labels}}} 6', text)
+        self.assertIn(f'dss_requests_total{{{labels},status="0"}} 1', text)
+
+        latency = metrics.summary()['endpoints']['GET Extractions/Schedules']['latency_seconds']
+        self.assertAlmostEqual(latency['total'], 200.86)
+        self.assertEqual(latency['max'], 200.0)
+        # 中央値（3件目）はバケット (0.1, 0.25] 内の線形補間による推定値
+        self.assertAlmostEqual(latency['p50'], 0.25)
+        # +Inf のバケットに含まれる分位数は最大値
+        self.assertEqual(latency['p95'], 200.0)
@@ -0,0 +1,77 @@
+import unittest
+import os
+import shutil
+import tempfile
+from app.utils.price_store import PriceStore
+
+
+def row(ric: str, trade_date: str, price: str = '100') -> dict:
+    return {'RIC': ric, 'Trade Date': trade_date, 'Universal Close Price': price}
+
+
+class TestPriceStore(unittest.TestCase):
+    """PriceStoreのテスト"""
+
+    def setUp(self):
+        """テストの前準備"""
+        self.work_dir = tempfile.mkdtemp()
+        self.store = PriceStore(os.path.join(self.work_dir, 'store'))
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.work_dir)
+
+    def _ranges(self) -> dict:
+        return self.store._load_index()['rics']
+
+    def test_index_ranges(self):
+        """連続するパーティションに含まれるRICを1つの範囲としてインデックスに登録することのテスト"""
+        self.store.ingest_rows([
+            row('A.T', '2024/12/02'), row('A.T', '2024/12/03'), row('A.T', '2024/12/04'),
+            row('B.T', '2024/12/02'), row('B.T', '2024/12/04'),
+        ])
+
+        self.assertEqual(self._ranges(), {
+            'A.T': [['2024-12-02', '2024-12-04']],
+            'B.T': [['2024-12-02', '2024-12-02'], ['2024-12-04', '2024-12-04']],
+        })
+        self.assertEqual(self.store.partitions_for(['B.T']), ['2024-12-02', '2024-12-04'])
+        self.assertEqual(self.store.partitions_for(['A.T'], '2024-12-03'), ['2024-12-03', '2024-12-04'])
+        self.assertEqual(self.store.partitions_for(start_date='2024-12-03', end_date='2024-12-03'), ['2024-12-03'])
+        self.assertEqual(self.store.partitions_for(['X.T']), [])
+
+    def test_insert_partition_inside_range(self):
+        """既存の範囲の途中にパーティションを追加した場合、含まれないRICの範囲を分割することのテスト"""
+        self.store.ingest_rows([
+            row('A.T', '2024/12/02'), row('A.T', '2024/12/04'),
+            row('B.T', '2024/12/02'), row('B.T', '2024/12/04'),
+        ])
+        self.assertEqual(self._ranges()['B.T'], [['2024-12-02', '2024-12-04']])
+
+        self.store.ingest_rows([row('A.T', '2024/12/03')])
+
+        self.assertEqual(self._ranges(), {
+            'A.T': [['2024-12-02', '2024-12-04']],
+            'B.T': [['2024-12-02', '2024-12-02'], ['2024-12-04', '2024-12-04']],
+        })
+        self.assertEqual(self.store.partitions_for(['B.T']), ['2024-12-02', '2024-12-04'])
+
+    def test_query_replaces_rows(self):
+        """同じ（RIC, 取引日）の行は後から取り込んだ行で置き換え、取引日・RICの昇順に返すことのテスト"""
+        self.store.ingest_rows([row('B.T', '2024/12/02', '1'), row('A.T', '2024/12/03', '2')])
+        self.store.ingest_rows([row('B.T', '2024/12/02', '3'), row('A.T', '2024/12/02', '4')])
+
+        rows = [(r['RIC'], r['Trade Date'], r['Universal Close Price']) for r in self.store.query()]
+        self.assertEqual(rows, [
+            ('A.T', '2024/12/02', '4'),
+            ('B.T', '2024/12/02', '3'),
+            ('A.T', '2024/12/03', '2'),
+        ])
+        self.assertEqual(
+            [r['Universal Close Price'] for r in self.store.query(['A.T'], end_date='2024-12-02')], ['4']
+        )
+
+    def test_missing_column(self):
+        """RIC・取引日の列がない場合、ValueErrorを送出することのテスト"""
+        with self.assertRaises(ValueError):
+            self.store.ingest_rows([{'RIC': 'A.T', 'Price': '1'}])
@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import patch
+import os
+import shutil
+import tempfile
+from app.utils.rate_limiter import TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    """TokenBucketのテスト"""
+
+    def setUp(self):
+        """テストの前準備"""
+        self.work_dir = tempfile.mkdtemp()
+        self.now = 1000.0
+        patcher = patch.multiple('app.utils.rate_limiter.time', time=lambda: self.now, sleep=self._sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.work_dir)
+
+    def _sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+    def test_refill(self):
+        """経過時間分のトークンを補充し、容量を超えて貯めないことのテスト"""
+        bucket = TokenBucket(rate=2, capacity=2)
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+
+        self.now += 0.5
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+
+        self.now += 100
+        self.assertTrue(bucket.try_acquire(2))
+        self.assertFalse(bucket.try_acquire())
+
+    def test_acquire_waits(self):
+        """トークンが不足している場合、補充されるまで待機することのテスト"""
+        bucket = TokenBucket(rate=4, capacity=1)
+        self.assertEqual(bucket.acquire(), 0)
+        self.assertAlmostEqual(bucket.acquire(), 0.25)
+        self.assertAlmostEqual(self.now, 1000.25)
+
+    def test_shared_state(self):
+        """同じ状態ファイルを指定したバケット間で残量を共有することのテスト"""
+        state_path = os.path.join(self.work_dir, 'requests.json')
+        first = TokenBucket(rate=1, capacity=2, state_path=state_path)
+        second = TokenBucket(rate=1, capacity=2, state_path=state_path)
+
+        self.assertTrue(first.try_acquire())
+        self.assertTrue(second.try_acquire())
+        self.assertFalse(first.try_acquire())
+        self.assertFalse(second.try_acquire())
+
+        self.now += 1
+        self.assertTrue(second.try_acquire())
+        self.assertFalse(first.try_acquire())
+
+    def test_broken_state_file(self):
+        """状態ファイルが壊れている場合は、プロセス内の残量で動作することのテスト"""
+        state_path = os.path.join(self.work_dir, 'requests.json')
+        with open(state_path, 'w', encoding='utf-8') as f:
+            f.write('{')
+        bucket = TokenBucket(rate=1, capacity=1, state_path=state_path)
+
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
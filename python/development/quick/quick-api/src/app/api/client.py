@@ -1,10 +1,12 @@
 import os
 import gzip
 import time
-from typing import Dict, Optional, Tuple, Literal
-from urllib.error import HTTPError
-import urllib.request
-from app.core.config import get_connection_config
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Literal
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ProtocolError, ReadTimeoutError, SSLError
+from app.api.rate_limiter import QUOTA_WINDOWS, QuotaLimiter
+from app.core.config import get_connection_settings
 from app.core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -15,6 +17,8 @@ class QuickApiClient:
     # 有効なレスポンス形式
     ResponseFormat = Literal["csv", "json", "tsv"]
     VALID_FORMATS = ["csv", "json", "tsv"]
+    # レスポンスをファイルに書き込む単位（バイト）
+    CHUNK_SIZE = 1024 * 1024
 
     def __init__(self, output_dir: str = None, response_format: VALID_FORMATS = None):
         """
@@ -24,17 +28,20 @@ class QuickApiClient:
             output_dir (str, optional): ファイルの保存先ディレクトリ
             response_format (str, optional): レスポンス形式（"csv", "json", "tsv"）
         """
-        self.config = get_connection_config()
-        self.base_url = self.config['api']['base_url'].rstrip('/')
-        self.access_key = self.config['api']['access_key']
-        self.retry_config = self.config['retry']
-        self.output_dir = output_dir or self.config.get('output_dir', 'output/data')
-        self.endpoints = self.config['endpoints']
-        self.universes = self.config.get('universes', {})
-        self.format = response_format or self.config['api'].get('format', 'csv')
+        self.settings = get_connection_settings()
+        self.base_url = self.settings.api.base_url
+        self.access_key = self.settings.api.access_key
+        self.retry_settings = self.settings.retry
+        self.output_dir = output_dir or self.settings.output_dir
+        self.endpoints = self.settings.endpoints
+        self.universes = self.settings.universes
+        self.format = response_format or self.settings.api.format
+        self.timeout = self.settings.api.timeout
         
         self._validate_format(self.format)
         self._init_proxy_settings()
+        self._init_rate_limiter()
+        self.session = self._create_session()
         self._ensure_output_dir()
         logger.info(f"QuickApiClientを初期化しました（レスポンス形式: {self.format}）")
 
@@ -45,60 +52,151 @@ class QuickApiClient:
 
     def _init_proxy_settings(self) -> None:
         """プロキシ設定の初期化"""
-        self.proxy_settings = {}
-        if self.config.get('use_proxy', False) and self.config.get('proxies'):
-            proxy = self.config['proxies']
-            self.proxy_settings = {
-                'proxyHost': proxy.get('host'),
-                'proxyPort': str(proxy.get('port'))
-            }
+        self.proxies = None
+        proxy = self.settings.proxy
+        if proxy:
+            proxy_url = f"http://{proxy.host}:{proxy.port}"
+            self.proxies = {'http': proxy_url, 'https': proxy_url}
             logger.info("プロキシ設定を適用しました")
         else:
             logger.info("プロキシは使用しません")
 
+    def _create_session(self) -> requests.Session:
+        """
+        接続を再利用するHTTPセッションを作成する
+
+        ページ・エンドポイントをまたいで同じ接続（Keep-Alive）を再利用し、
+        リクエストごとのTCP・TLSの接続確立を省きます。コネクションプールの大きさは
+        エンドポイントの同時実行数（collector.max_workers）と先行して要求するページ数
+        （collector.prefetch_pages）に合わせます。
+        レスポンスの圧縮（gzip, deflate）を要求し、展開はセッションが行います。
+
+        Returns:
+            requests.Session: 設定済みのセッション
+        """
+        session = requests.Session()
+        # エンドポイントごとに、受信中のページと先行して要求したページの接続を確保する
+        collector = self.settings.collector
+        pool_size = collector.max_workers * (collector.prefetch_pages + 1)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update({
+            'Authorization': f"Bearer {self.access_key}",
+            'Accept-Encoding': 'gzip, deflate',
+        })
+        if self.proxies:
+            session.proxies = self.proxies
+        return session
+
+    def close(self) -> None:
+        """HTTPセッションを閉じる（プール内の接続を切断する）"""
+        self.session.close()
+
+    def __enter__(self) -> 'QuickApiClient':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _init_rate_limiter(self) -> None:
+        """rate_limits の設定（検証済みの RateLimitSettings）からリクエスト数の制限を初期化"""
+        rate_limits = self.settings.rate_limits
+        limits = {
+            name: (getattr(rate_limits, name), seconds)
+            for name, seconds in QUOTA_WINDOWS.items() if getattr(rate_limits, name)
+        }
+        self.rate_limiter = None
+        if limits:
+            self.rate_limiter = QuotaLimiter(
+                rate_limits.state_path,
+                limits,
+                max_wait_seconds=rate_limits.max_wait_seconds
+            )
+            logger.info(f"リクエスト数の制限を適用します: {', '.join(f'{k}={v[0]}' for k, v in limits.items())}")
+        else:
+            logger.info("リクエスト数の制限は適用しません")
+
+    def get_remaining_quota(self) -> Dict[str, int]:
+        """
+        現在送信できる残りのリクエスト数を取得する
+
+        日次実行・スポット実行など、同じ状態ファイルを使用する他のプロセスのリクエストも含めて計算します。
+
+        Returns:
+            Dict[str, int]: rate_limits のキー（per_10min, per_day）ごとの残りのリクエスト数。
+                制限を適用しない場合は空の辞書
+        """
+        if not self.rate_limiter:
+            return {}
+        return self.rate_limiter.remaining()
+
     def _ensure_output_dir(self) -> None:
         """出力ディレクトリの存在確認と作成"""
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
             logger.info(f"出力ディレクトリを作成しました: {self.output_dir}")
 
-    def _create_request(self, url: str) -> urllib.request.Request:
-        """リクエストオブジェクトを作成"""
-        logger.debug(f"リクエストURL: {url}")
-        req = urllib.request.Request(url)
-        if self.proxy_settings:
-            req.set_proxy(
-                f"{self.proxy_settings['proxyHost']}:{self.proxy_settings['proxyPort']}",
-                "http"
-            )
-        req.add_header("Authorization", f"Bearer {self.access_key}")
-        return req
-
-    def _handle_response(self, response) -> Tuple[str, Optional[str]]:
-        """レスポンスを処理する"""
-        universe_next = response.headers.get('x-universe-next')
-        if response.info().get("Content-Encoding") == "gzip":
-            body = gzip.GzipFile(fileobj=response).read().decode("utf-8")
+    def _iter_raw(self, response: requests.Response) -> Iterator[bytes]:
+        """
+        レスポンスの本文を展開せずにチャンクごとに読み込む
+
+        urllib3 の例外は iter_content と同じ requests の例外に変換し、本文の受信中のリトライの対象とします。
+        """
+        try:
+            yield from response.raw.stream(self.CHUNK_SIZE, decode_content=False)
+        except ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+        except ReadTimeoutError as e:
+            raise requests.exceptions.ConnectionError(e)
+        except SSLError as e:
+            raise requests.exceptions.SSLError(e)
+
+    def _save_response(self, response: requests.Response, output_path: str, keep_gzip: bool = False) -> str:
+        """
+        レスポンスの本文を固定サイズのチャンクごとにファイルへ書き込む
+
+        本文全体をメモリに読み込まずに一時ファイル（.tmp）へ書き込み、完了後に出力パスへ置き換えます。
+        途中で失敗した場合は一時ファイルを削除するため、出力パスに不完全なファイルは残りません。
+
+        Args:
+            response (requests.Response): stream=True で取得したレスポンス
+            output_path (str): 出力ファイルパス
+            keep_gzip (bool): True の場合、展開せずにgzip圧縮のまま保存する（拡張子 .gz を付加）。
+                サーバーがgzip圧縮していない場合は保存時に圧縮する
+
+        Returns:
+            str: 保存したファイルパス
+        """
+        if keep_gzip and not output_path.endswith('.gz'):
+            output_path = f"{output_path}.gz"
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+
+        content_encoding = response.headers.get('Content-Encoding', '').lower()
+        if keep_gzip and content_encoding == 'gzip':
+            chunks = self._iter_raw(response)
+            open_output = open
         else:
-            body = response.read().decode("utf-8")
-        return body, universe_next
+            chunks = response.iter_content(self.CHUNK_SIZE)
+            open_output = gzip.open if keep_gzip else open
 
-    def _save_data(self, data: str, filepath: str) -> str:
-        """データをファイルに保存する"""
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(data)
-        logger.info(f"ファイルを保存しました: {filepath}")
-        return filepath
+        temp_file_path = f"{output_path}.tmp"
+        try:
+            size = 0
+            with open_output(temp_file_path, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+            os.replace(temp_file_path, output_path)
+        except BaseException:
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+            raise
+        logger.info(f"ファイルを保存しました: {output_path}（{size:,} バイト）")
+        return output_path
 
-    def _request(
-        self,
-        endpoint: str,
-        output_path: str,
-        params: Dict[str, str] = None,
-        format_type: Optional[str] = None
-    ) -> Tuple[str, Optional[str]]:
-        """APIリクエストを実行する"""
+    def _build_url(self, endpoint: str, params: Dict[str, str] = None, format_type: Optional[str] = None) -> str:
+        """リクエストURLを構築する"""
         # エンドポイントの存在確認
         if endpoint not in self.endpoints:
             raise ValueError(f"未定義のエンドポイント: {endpoint}")
@@ -107,33 +205,72 @@ class QuickApiClient:
         current_format = format_type or self.format
         self._validate_format(current_format)
 
-        # URLの構築
-        url = f"{self.base_url}/{self.endpoints[endpoint]['path']}.{current_format}"
+        url = f"{self.base_url}/{self.endpoints[endpoint].path}.{current_format}"
         if params:
             query_string = "&".join(f"{k}={v}" for k, v in params.items() if v is not None)
             url = f"{url}?{query_string}"
+        return url
+
+    def _build_params(
+        self,
+        date: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        universe: Optional[str] = None,
+        universe_next: Optional[str] = None
+    ) -> Dict[str, str]:
+        """クエリパラメータを構築する（未指定の項目は含めない）"""
+        params = {}
+        if date:
+            params['date'] = date
+        if date_from:
+            params['date_from'] = date_from
+        if date_to:
+            params['date_to'] = date_to
+        if universe:
+            params['universe'] = universe
+        if universe_next:
+            params['universe_next'] = universe_next
+        return params
+
+    def _send(self, url: str) -> requests.Response:
+        """
+        リクエストを1回送信し、レスポンスヘッダーを受信した時点でレスポンスを返す
+
+        本文は受信していないため、呼び出し側で読み込むか close してください。
+        エラーのステータスが返された場合は HTTPError を送出します（リトライは呼び出し側で行う）。
+        """
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        logger.debug(f"リクエストURL: {url}")
+        response = self.session.get(url, timeout=self.timeout, stream=True)
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as he:
+            response.close()
+            logger.error(f"HTTPエラーが発生しました: {he}")
+            if "x-description" in he.response.headers:
+                logger.error(f"エラー詳細: {he.response.headers['x-description']}")
+            raise
+        return response
+
+    def _with_retry(self, attempt: Callable[[], Any]) -> Any:
+        """
+        attempt を実行し、5xxエラーと通信エラーの場合は retry.max_attempts 回までやり直す
 
-        retry_wait = self.retry_config.get('wait_seconds', 1.0)
-        retry_limit = self.retry_config.get('max_attempts', 2)
+        リクエストの送信と本文の受信のどちらで失敗した場合も同じリトライ回数を消費するため、
+        1回の呼び出しで送信するリクエストは最大 retry.max_attempts + 1 件です。
+        """
+        retry_wait = self.retry_settings.wait_seconds
+        retry_limit = self.retry_settings.max_attempts
 
         for retry_count in range(retry_limit + 1):
             try:
-                request = self._create_request(url)
-                with urllib.request.urlopen(request) as response:
-                    data, universe_next = self._handle_response(response)
-                    filepath = self._save_data(data, output_path)
-                    return filepath, universe_next
-
-            except HTTPError as he:
-                logger.error(f"HTTPエラーが発生しました: {he}")
-                if "x-description" in he.headers:
-                    logger.error(f"エラー詳細: {he.headers['x-description']}")
-                if 400 <= he.code < 500:
-                    raise
-                if retry_count >= retry_limit:
+                return attempt()
+            except requests.exceptions.HTTPError as he:
+                if 400 <= he.response.status_code < 500 or retry_count >= retry_limit:
                     raise
-
-            except Exception as e:
+            except requests.exceptions.RequestException as e:
                 logger.error(f"エラーが発生しました: {str(e)}")
                 if retry_count >= retry_limit:
                     raise
@@ -141,16 +278,102 @@ class QuickApiClient:
             logger.info(f"リトライを実行します ({retry_count + 1}/{retry_limit})")
             time.sleep(retry_wait)
 
-    def request_data(
+    def _open(self, url: str) -> requests.Response:
+        """
+        リクエストを送信し、レスポンスヘッダーを受信した時点でレスポンスを返す
+
+        本文は受信していないため、呼び出し側で読み込むか close してください。
+        5xxエラーと通信エラーの場合は retry.max_attempts 回までリトライします。
+        """
+        return self._with_retry(lambda: self._send(url))
+
+    def _request(
         self,
         endpoint: str,
         output_path: str,
+        params: Dict[str, str] = None,
+        format_type: Optional[str] = None,
+        keep_gzip: Optional[bool] = None
+    ) -> Tuple[str, Optional[str]]:
+        """APIリクエストを実行する（本文の受信中に通信エラーが発生した場合もリクエストからやり直す）"""
+        url = self._build_url(endpoint, params, format_type)
+
+        def attempt() -> Tuple[str, Optional[str]]:
+            with self._send(url) as response:
+                universe_next = response.headers.get('x-universe-next')
+                try:
+                    return self.save_response(endpoint, response, output_path, keep_gzip), universe_next
+                except requests.exceptions.RequestException as e:
+                    logger.error(f"データの受信中にエラーが発生しました: {str(e)}")
+                    raise
+
+        return self._with_retry(attempt)
+
+    def open_response(
+        self,
+        endpoint: str,
         date: Optional[str] = None,
         date_from: Optional[str] = None,
         date_to: Optional[str] = None,
         universe: Optional[str] = None,
         universe_next: Optional[str] = None,
         format_type: Optional[str] = None
+    ) -> requests.Response:
+        """
+        データを要求し、本文を受信する前のレスポンスを取得する
+
+        レスポンスヘッダー（x-universe-next）を受信した時点で返すため、本文の受信・保存
+        （save_response）と並行して次のページを要求できます。
+        本文の受信中に通信エラーが発生した場合のリトライは呼び出し側で行ってください。
+
+        Args:
+            endpoint (str): エンドポイント名
+            date (Optional[str]): 取得日（YYYYMMDD形式）
+            date_from (Optional[str]): 開始日（YYYYMMDD形式）
+            date_to (Optional[str]): 終了日（YYYYMMDD形式）
+            universe (Optional[str]): ユニバース指定
+            universe_next (Optional[str]): 続きのデータ取得用識別子
+            format_type (Optional[str]): レスポンス形式の一時的な指定
+        Returns:
+            requests.Response: ストリーミングのレスポンス（save_response に渡すか close する）
+        """
+        params = self._build_params(date, date_from, date_to, universe, universe_next)
+        return self._open(self._build_url(endpoint, params, format_type))
+
+    def save_response(
+        self,
+        endpoint: str,
+        response: requests.Response,
+        output_path: str,
+        keep_gzip: Optional[bool] = None
+    ) -> str:
+        """
+        open_response で取得したレスポンスの本文をファイルに保存する
+
+        Args:
+            endpoint (str): エンドポイント名
+            response (requests.Response): open_response で取得したレスポンス
+            output_path (str): 出力ファイルパス
+            keep_gzip (Optional[bool]): gzip圧縮のまま保存するか（output_path に .gz を付加）。
+                未指定の場合はエンドポイント定義の keep_gzip の値
+        Returns:
+            str: 保存したファイルパス
+        """
+        if keep_gzip is None:
+            keep_gzip = self.endpoints[endpoint].keep_gzip
+        return self._save_response(response, output_path, keep_gzip)
+
+    def request_data(
+        self,
+        endpoint: str,
+        output_path: str,
+        date: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        universe: Optional[str] = None,
+        universe_next: Optional[str] = None,
+        format_type: Optional[str] = None,
+        keep_gzip: Optional[bool] = None
     ) -> Tuple[str, Optional[str]]:
         """
         データを取得してファイルに保存する
@@ -163,19 +386,10 @@ class QuickApiClient:
             universe (Optional[str]): ユニバース指定
             universe_next (Optional[str]): 続きのデータ取得用識別子
             format_type (Optional[str]): レスポンス形式の一時的な指定
+            keep_gzip (Optional[bool]): gzip圧縮のまま保存するか（output_path に .gz を付加）。
+                未指定の場合はエンドポイント定義の keep_gzip の値
         Returns:
             Tuple[str, Optional[str]]: (保存したファイルパス, 次のuniverse_next)
         """
-        params = {}
-        if date:
-            params['date'] = date
-        if date_from:
-            params['date_from'] = date_from
-        if date_to:
-            params['date_to'] = date_to
-        if universe:
-            params['universe'] = universe
-        if universe_next:
-            params['universe_next'] = universe_next
-
-        return self._request(endpoint, output_path, params, format_type)
\ No newline at end of file
+        params = self._build_params(date, date_from, date_to, universe, universe_next)
+        return self._request(endpoint, output_path, params, format_type, keep_gzip)
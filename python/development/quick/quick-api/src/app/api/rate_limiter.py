@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from app.core.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = get_logger(__name__)
+
+# rate_limits のキーと、そのウィンドウの長さ（秒）
+QUOTA_WINDOWS = {
+    'per_10min': 600,
+    'per_day': 86400,
+}
+
+
+class QuotaExceededError(RuntimeError):
+    """リクエスト数の上限に達し、待機の上限を超えて待つ必要がある場合の例外"""
+
+    def __init__(self, message: str, wait_seconds: float):
+        super().__init__(message)
+        self.wait_seconds = wait_seconds
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    ロックファイルによるプロセス間の排他ロックを取得する
+
+    同じロックファイルを指定した他のプロセスがロックを解放するまで待機します。
+
+    Args:
+        path (str): ロックファイルのパス（存在しない場合は作成）
+    """
+    lock_dir = os.path.dirname(path)
+    if lock_dir:
+        os.makedirs(lock_dir, exist_ok=True)
+    with open(path, 'a+b') as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class QuotaLimiter:
+    """
+    スライディングウィンドウによるリクエスト数の制限
+
+    送信したリクエストの時刻を状態ファイルに記録し、各ウィンドウ（10分・24時間など）内の
+    リクエスト数が上限に達している場合は、最も古いリクエストがウィンドウから外れるまで待機します。
+    状態ファイルはロックファイルで排他制御するため、日次実行とスポット実行など別のプロセスの間でも
+    同じ上限を共有します。
+    """
+
+    def __init__(
+        self,
+        state_path: str,
+        limits: Dict[str, Tuple[int, float]],
+        max_wait_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            state_path (str): 状態ファイルのパス
+            limits (Dict[str, Tuple[int, float]]): 名前をキーとする (最大リクエスト数, ウィンドウの秒数)
+            max_wait_seconds (Optional[float]): 1回の待機の上限（秒）。超える場合は QuotaExceededError。
+                未指定の場合は必要なだけ待機する
+        """
+        self.state_path = state_path
+        self.lock_path = f"{state_path}.lock"
+        self.limits = limits
+        self.max_wait_seconds = max_wait_seconds
+        self._window = max(seconds for _, seconds in limits.values())
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        リクエスト1回分の枠を確保する（必要な場合は枠が空くまで待機する）
+
+        Returns:
+            float: 待機した秒数
+
+        Raises:
+            QuotaExceededError: 枠が空くまでの時間が max_wait_seconds を超える場合
+        """
+        waited = 0.0
+        while True:
+            with self._lock, file_lock(self.lock_path):
+                now = time.time()
+                timestamps = self._load(now)
+                wait_seconds, limit_name = self._wait_time(timestamps, now)
+                if wait_seconds <= 0:
+                    timestamps.append(now)
+                    self._save(timestamps)
+                    return waited
+
+            if self.max_wait_seconds is not None and wait_seconds > self.max_wait_seconds:
+                raise QuotaExceededError(
+                    f"リクエスト数の上限（{limit_name}: {self.limits[limit_name][0]}回）に達しました。"
+                    f"次のリクエストまで {wait_seconds:.0f} 秒待つ必要があります",
+                    wait_seconds
+                )
+            logger.info(f"リクエスト数の上限（{limit_name}）に達したため {wait_seconds:.1f} 秒待機します")
+            time.sleep(wait_seconds)
+            waited += wait_seconds
+
+    def remaining(self) -> Dict[str, int]:
+        """
+        各ウィンドウで現在送信できる残りのリクエスト数を取得する
+
+        Returns:
+            Dict[str, int]: 名前をキーとする残りのリクエスト数
+        """
+        with self._lock, file_lock(self.lock_path):
+            now = time.time()
+            timestamps = self._load(now)
+        return {
+            name: max(0, limit - self._count_since(timestamps, now - seconds))
+            for name, (limit, seconds) in self.limits.items()
+        }
+
+    def _wait_time(self, timestamps: List[float], now: float) -> Tuple[float, Optional[str]]:
+        """
+        次のリクエストを送信できるまでの秒数を求める
+
+        Returns:
+            Tuple[float, Optional[str]]: (待機する秒数, 待機の原因となったウィンドウの名前)
+        """
+        wait_seconds, limit_name = 0.0, None
+        for name, (limit, seconds) in self.limits.items():
+            in_window = [timestamp for timestamp in timestamps if timestamp > now - seconds]
+            if len(in_window) >= limit:
+                # ウィンドウ内のリクエストが limit - 1 件になる時刻まで待つ
+                expires_at = in_window[len(in_window) - limit] + seconds
+                if expires_at - now > wait_seconds:
+                    wait_seconds, limit_name = expires_at - now, name
+        return wait_seconds, limit_name
+
+    @staticmethod
+    def _count_since(timestamps: List[float], since: float) -> int:
+        return sum(1 for timestamp in timestamps if timestamp > since)
+
+    def _load(self, now: float) -> List[float]:
+        """状態ファイルを読み込む（最も長いウィンドウより古い記録は除く）"""
+        if not os.path.exists(self.state_path):
+            return []
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                timestamps = json.load(f).get('requests', [])
+        except (OSError, ValueError) as e:
+            logger.warning(f"レート制限の状態ファイルを読み込めないため、記録なしとして扱います: {str(e)}")
+            return []
+        return sorted(timestamp for timestamp in timestamps if timestamp > now - self._window)
+
+    def _save(self, timestamps: List[float]) -> None:
+        """状態ファイルを書き込む（別名で書き込んでから置き換える）"""
+        with open(f"{self.state_path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump({'requests': timestamps}, f)
+        os.replace(f"{self.state_path}.tmp", self.state_path)
@@ -1,41 +1,332 @@
 import os
+import copy
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
 import yaml
 
+# プロジェクトルート（src/app/core/config.py の3階層上）。相対パスはカレントディレクトリではなくここを基準に解決する
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+CONFIG_DIR = os.path.join(PROJECT_ROOT, 'input', 'config')
+
+# 有効なレスポンス形式
+VALID_FORMATS = ('csv', 'json', 'tsv')
+
+
+def resolve_path(path: str) -> str:
+    """
+    プロジェクトルートを基準にパスを解決する
+
+    Args:
+        path (str): パス（絶対パスの場合はそのまま返す）
+
+    Returns:
+        str: 絶対パス
+    """
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+
+
+@dataclass(frozen=True)
+class ApiSettings:
+    """API基本設定"""
+    base_url: str
+    access_key: str
+    timeout: float = 30
+    format: str = 'csv'
+
+
+@dataclass(frozen=True)
+class RetrySettings:
+    """リトライ設定"""
+    max_attempts: int = 2
+    wait_seconds: float = 1.0
+
+
+@dataclass(frozen=True)
+class RateLimitSettings:
+    """レート制限設定（未設定の場合はNone）"""
+    per_10min: Optional[int] = None
+    per_day: Optional[int] = None
+    state_path: str = ''
+    max_wait_seconds: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class ProxySettings:
+    """プロキシ設定"""
+    host: str
+    port: int
+
+
+@dataclass(frozen=True)
+class EndpointSettings:
+    """エンドポイント定義"""
+    path: str
+    description: str = ''
+    use_date: bool = False
+    use_universe: bool = False
+    use_universe_next: bool = False
+    keep_gzip: bool = False
+
+
+@dataclass(frozen=True)
+class CollectorSettings:
+    """データ収集の並列実行設定"""
+    max_workers: int = 1
+    prefetch_pages: int = 2
+    merge_pages: bool = False
+
+
+@dataclass(frozen=True)
+class ConnectionSettings:
+    """接続設定（connection_config.yml）"""
+    api: ApiSettings
+    retry: RetrySettings
+    rate_limits: RateLimitSettings
+    collector: CollectorSettings
+    proxy: Optional[ProxySettings]
+    output_dir: str
+    endpoints: Dict[str, EndpointSettings]
+    universes: Dict[str, Dict[str, str]]
+    raw: Dict[str, Any] = field(repr=False)
+
+
+@dataclass(frozen=True)
+class DirectorySettings:
+    """モードごとのディレクトリ設定（base_dir はプロジェクトルートを基準に解決済み）"""
+    base_dir: str
+    daily_dir: str
+    spot_dir: str
+
+    def mode_dir(self, mode: str) -> str:
+        if mode == 'daily':
+            return os.path.join(self.base_dir, self.daily_dir)
+        elif mode == 'spot':
+            return os.path.join(self.base_dir, self.spot_dir)
+        else:
+            raise ValueError(f"無効なmode: {mode}")
+
+
+@dataclass(frozen=True)
+class RequestSettings:
+    """リクエスト設定（request_config.yml）"""
+    input: DirectorySettings
+    output: DirectorySettings
+    request_file: str
+    raw: Dict[str, Any] = field(repr=False)
+
+    def input_path(self, mode: str, date: str = None) -> str:
+        """リクエスト定義ファイルのパス"""
+        if mode == 'spot' and not date:
+            raise ValueError("スポット実行にはdate引数が必要です")
+        if mode == 'daily':
+            return os.path.join(self.input.mode_dir(mode), self.request_file)
+        return os.path.join(self.input.mode_dir(mode), date, self.request_file)
+
+    def output_path(self, mode: str, date: str) -> str:
+        """取得データの出力ディレクトリ"""
+        return os.path.join(self.output.mode_dir(mode), date, 'data')
+
+    def report_path(self, mode: str, date: str) -> str:
+        """実行レポートの出力ディレクトリ"""
+        return os.path.join(self.output.mode_dir(mode), date, 'reports')
+
+
+class _ConfigFile:
+    """
+    YAMLの設定ファイルと解析結果のキャッシュ
+
+    解析結果は初回の読み込み時に作成し、ファイルの更新日時・サイズが変わった場合のみ読み込み直します。
+    解析（検証）に失敗した場合はキャッシュを更新せずに例外を送出します。
+    """
+
+    def __init__(self, path: str, parser: Callable[[Dict[str, Any]], Any]):
+        self.path = path
+        self._parser = parser
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._value = None
+
+    def get(self) -> Any:
+        stat = os.stat(self.path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if stamp != self._stamp:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    raw = yaml.safe_load(f) or {}
+                self._value = self._parser(raw)
+                self._stamp = stamp
+            return self._value
+
+
+def _section(raw: Dict[str, Any], key: str, filename: str, required: bool = True) -> Dict[str, Any]:
+    """設定のセクション（辞書）を取得する"""
+    value = raw.get(key)
+    if value is None and not required:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError(f"{filename} の設定が不正です: {key} セクションがありません")
+    return value
+
+
+def _require(section: Dict[str, Any], key: str, name: str, filename: str, value_type: type = str) -> Any:
+    """必須の設定値を取得し、型を検証する"""
+    value = section.get(key)
+    if value is None or value == '':
+        raise ValueError(f"{filename} の設定が不正です: {name} がありません")
+    if not isinstance(value, value_type):
+        raise ValueError(f"{filename} の設定が不正です: {name} の値が不正です（{value!r}）")
+    return value
+
+
+def _number(section: Dict[str, Any], key: str, name: str, filename: str, default, value_type: type = float):
+    """数値の設定値を取得する（未設定の場合は default）"""
+    value = section.get(key, default)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise ValueError(f"{filename} の設定が不正です: {name} には0以上の数値を指定してください（{value!r}）")
+    return value_type(value)
+
+
+def _parse_connection_config(raw: Dict[str, Any]) -> ConnectionSettings:
+    filename = 'connection_config.yml'
+    api = _section(raw, 'api', filename)
+    api_settings = ApiSettings(
+        base_url=_require(api, 'base_url', 'api.base_url', filename).rstrip('/'),
+        access_key=_require(api, 'access_key', 'api.access_key', filename),
+        timeout=_number(api, 'timeout', 'api.timeout', filename, 30),
+        format=api.get('format', 'csv'),
+    )
+    if api_settings.format not in VALID_FORMATS:
+        raise ValueError(f"{filename} の設定が不正です: api.format は {', '.join(VALID_FORMATS)} のいずれかです（{api_settings.format!r}）")
+
+    retry = _section(raw, 'retry', filename, required=False)
+    retry_settings = RetrySettings(
+        max_attempts=_number(retry, 'max_attempts', 'retry.max_attempts', filename, 2, int),
+        wait_seconds=_number(retry, 'wait_seconds', 'retry.wait_seconds', filename, 1.0),
+    )
+
+    rate_limits = _section(raw, 'rate_limits', filename, required=False)
+    rate_limit_settings = RateLimitSettings(
+        per_10min=_number(rate_limits, 'per_10min', 'rate_limits.per_10min', filename, None, int),
+        per_day=_number(rate_limits, 'per_day', 'rate_limits.per_day', filename, None, int),
+        state_path=resolve_path(rate_limits.get('state_path', 'output/state/rate_limit.json')),
+        max_wait_seconds=_number(rate_limits, 'max_wait_seconds', 'rate_limits.max_wait_seconds', filename, None),
+    )
+
+    collector = _section(raw, 'collector', filename, required=False)
+    collector_settings = CollectorSettings(
+        max_workers=max(1, _number(collector, 'max_workers', 'collector.max_workers', filename, 1, int)),
+        prefetch_pages=max(0, _number(collector, 'prefetch_pages', 'collector.prefetch_pages', filename, 2, int)),
+        merge_pages=bool(collector.get('merge_pages', False)),
+    )
+
+    proxy_settings = None
+    if raw.get('use_proxy', False):
+        proxies = _section(raw, 'proxies', filename)
+        proxy_settings = ProxySettings(
+            host=_require(proxies, 'host', 'proxies.host', filename),
+            port=_require(proxies, 'port', 'proxies.port', filename, int),
+        )
+
+    endpoints = {}
+    for name, endpoint in _section(raw, 'endpoints', filename).items():
+        if not isinstance(endpoint, dict):
+            raise ValueError(f"{filename} の設定が不正です: endpoints.{name} の定義がありません")
+        endpoints[name] = EndpointSettings(
+            path=_require(endpoint, 'path', f"endpoints.{name}.path", filename),
+            description=endpoint.get('description', ''),
+            use_date=bool(endpoint.get('use_date', False)),
+            use_universe=bool(endpoint.get('use_universe', False)),
+            use_universe_next=bool(endpoint.get('use_universe_next', False)),
+            keep_gzip=bool(endpoint.get('keep_gzip', False)),
+        )
+
+    return ConnectionSettings(
+        api=api_settings,
+        retry=retry_settings,
+        rate_limits=rate_limit_settings,
+        collector=collector_settings,
+        proxy=proxy_settings,
+        output_dir=resolve_path(raw.get('output_dir', 'output/data')),
+        endpoints=endpoints,
+        universes=_section(raw, 'universes', filename, required=False),
+        raw=raw,
+    )
+
+
+def _parse_directories(raw: Dict[str, Any], key: str, filename: str) -> DirectorySettings:
+    section = _section(raw, key, filename)
+    return DirectorySettings(
+        base_dir=resolve_path(_require(section, 'base_dir', f"{key}.base_dir", filename)),
+        daily_dir=_require(section, 'daily_dir', f"{key}.daily_dir", filename),
+        spot_dir=_require(section, 'spot_dir', f"{key}.spot_dir", filename),
+    )
+
+
+def _parse_request_config(raw: Dict[str, Any]) -> RequestSettings:
+    filename = 'request_config.yml'
+    return RequestSettings(
+        input=_parse_directories(raw, 'input', filename),
+        output=_parse_directories(raw, 'output', filename),
+        request_file=_require(_section(raw, 'input', filename), 'request_file', 'input.request_file', filename),
+        raw=raw,
+    )
+
+
+_connection_config = _ConfigFile(os.path.join(CONFIG_DIR, 'connection_config.yml'), _parse_connection_config)
+_request_config = _ConfigFile(os.path.join(CONFIG_DIR, 'request_config.yml'), _parse_request_config)
+
+
+def get_connection_settings() -> ConnectionSettings:
+    """
+    接続設定を検証済みのオブジェクトとして取得する
+
+    ファイルの解析は初回と、ファイルが更新された場合のみ行います。
+
+    Returns:
+        ConnectionSettings: 接続設定
+
+    Raises:
+        ValueError: 設定が不正な場合
+    """
+    return _connection_config.get()
+
+
+def get_request_settings() -> RequestSettings:
+    """
+    リクエスト設定を検証済みのオブジェクトとして取得する
+
+    Returns:
+        RequestSettings: リクエスト設定（パスはプロジェクトルートを基準に解決済み）
+
+    Raises:
+        ValueError: 設定が不正な場合
+    """
+    return _request_config.get()
+
+
 def get_connection_config():
     """
     接続設定を取得する。
+
+    キャッシュした解析結果の複製を返すため、呼び出し側で変更しても構いません。
     """
-    with open('input/config/connection_config.yml', 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
-    return config
+    return copy.deepcopy(get_connection_settings().raw)
 
 def get_request_config():
     """リクエスト設定を取得する"""
-    with open('input/config/request_config.yml', 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
-    return config
+    return copy.deepcopy(get_request_settings().raw)
 
 def get_input_path(mode: str, date: str = None) -> str:
     """入力パスを取得する"""
-    request_config = get_request_config()
-    base_dir = request_config['input']['base_dir']
-    request_file = request_config['input']['request_file']
-    if mode == 'daily':
-        return os.path.join(base_dir, request_config['input']['daily_dir'], request_file)
-    elif mode == 'spot':
-        if not date:
-            raise ValueError("スポット実行にはdate引数が必要です")
-        return os.path.join(base_dir, request_config['input']['spot_dir'], date, request_file)
-    else:
-        raise ValueError(f"無効なmode: {mode}")
+    return get_request_settings().input_path(mode, date)
 
 def get_output_path(mode: str, date: str) -> str:
     """出力パスを取得する"""
-    request_config = get_request_config()
-    base_dir = request_config['output']['base_dir']
-    if mode == 'daily':
-        return os.path.join(base_dir, request_config['output']['daily_dir'], date, 'data')
-    elif mode == 'spot':
-        return os.path.join(base_dir, request_config['output']['spot_dir'], date, 'data')
-    else:
-        raise ValueError(f"無効なmode: {mode}")
\ No newline at end of file
+    return get_request_settings().output_path(mode, date)
+
+def get_report_path(mode: str, date: str) -> str:
+    """実行レポートの出力パスを取得する"""
+    return get_request_settings().report_path(mode, date)
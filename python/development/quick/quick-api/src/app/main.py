@@ -24,19 +24,19 @@ def main():
     args = parser.parse_args()
 
     try:
-        client = QuickApiClient()
-        collector = DataCollector(client)
-
-        if args.mode == 'daily':
-            logger.info("日次データ収集を開始します")
-            results = collector.execute_daily_requests()
-            collector.create_execution_report(mode='daily')
-        else:
-            if not args.date:
-                raise ValueError("スポット実行には日付の指定が必要です（--date YYYYMMDD）")
-            logger.info(f"スポットリクエスト（{args.date}）を実行します")
-            results = collector.execute_spot_requests(args.date)
-            collector.create_execution_report(mode='spot', date=args.date)
+        with QuickApiClient() as client:
+            collector = DataCollector(client)
+
+            if args.mode == 'daily':
+                logger.info("日次データ収集を開始します")
+                results = collector.execute_daily_requests()
+                collector.create_execution_report(mode='daily')
+            else:
+                if not args.date:
+                    raise ValueError("スポット実行には日付の指定が必要です（--date YYYYMMDD）")
+                logger.info(f"スポットリクエスト（{args.date}）を実行します")
+                results = collector.execute_spot_requests(args.date)
+                collector.create_execution_report(mode='spot', date=args.date)
 
         # 結果のサマリーを表示
         success_count = len(results["success"])
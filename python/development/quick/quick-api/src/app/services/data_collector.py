@@ -1,12 +1,16 @@
 import os
 import yaml
-import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
+import requests
 from pathlib import Path
 from app.api.client import QuickApiClient
-from app.core.config import get_input_path, get_output_path
+from app.core.config import get_connection_settings, get_input_path, get_output_path, get_report_path
 from app.core.logger import get_logger
+from app.utils.file_handler import PageMerger
 
 
 logger = get_logger(__name__)
@@ -14,8 +18,20 @@ logger = get_logger(__name__)
 class DataCollector:
     """データ収集サービス"""
 
-    def __init__(self, client: QuickApiClient):
+    def __init__(self, client: QuickApiClient, max_workers: Optional[int] = None):
+        """
+        Args:
+            client (QuickApiClient): APIクライアント
+            max_workers (Optional[int]): 同時に実行するエンドポイント数。未指定の場合は collector.max_workers の値
+        """
+        connection_settings = get_connection_settings()
+        collector_settings = connection_settings.collector
         self.client = client
+        self.endpoints = connection_settings.endpoints
+        self.universes = connection_settings.universes
+        self.max_workers = max_workers or collector_settings.max_workers
+        self.prefetch_pages = collector_settings.prefetch_pages
+        self.merge_pages = collector_settings.merge_pages
         self.results = {
             "success": [],
             "failure": []
@@ -45,21 +61,14 @@ class DataCollector:
         # 出力ディレクトリを daily/YYYYMMDD/data 配下に設定
         base_dir = get_output_path('daily', execution_date)
         
+        enabled_requests = {}
         for name, config in requests.items():
             if not config.get('enabled', True):
                 logger.info(f"スキップ: {name} (無効化されています)")
                 continue
+            enabled_requests[name] = config
 
-            logger.info(f"{config['description']}を開始します")
-            try:
-                self._execute_request(name, config, base_dir)
-            except Exception as e:
-                logger.error(f"{name}の取得に失敗しました: {e}")
-                self.results["failure"].append(name)
-            else:
-                self.results["success"].append(name)
-
-        return self.results
+        return self._execute_requests(enabled_requests, base_dir)
 
     def execute_spot_requests(self, target_date: str) -> Dict[str, List[str]]:
         """スポットリクエストを実行"""
@@ -75,96 +84,261 @@ class DataCollector:
         # 出力ディレクトリを spot/YYYYMMDD/data 配下に設定
         base_dir = get_output_path('spot', target_date)
         
+        return self._execute_requests(requests, base_dir)
+
+    def _execute_requests(self, requests: Dict[str, dict], base_dir: str) -> Dict[str, List[str]]:
+        """
+        リクエストを最大 max_workers 並列で実行し、結果を定義順に記録する
+
+        エンドポイントごとのリクエストは互いに独立しているため並列に実行します。
+        リクエスト数の制限はクライアント（QuickApiClient）が全エンドポイントで共有して適用するため、
+        並列数に関わらず rate_limits の上限を超えません。
+        成功・失敗の結果は完了順ではなく定義順に記録するため、実行レポートの内容は実行ごとに変わりません。
+
+        ユニバース指定のエンドポイント（use_universe）で markets を指定した場合は、ユニバースごとのリクエストに展開して
+        他のリクエストと同様に並列に実行し、結果は「リクエスト名:ユニバース名」として記録します。
+
+        Args:
+            requests (Dict[str, dict]): リクエスト名をキーとするリクエスト定義
+            base_dir (str): 出力ディレクトリ
+
+        Returns:
+            Dict[str, List[str]]: 成功・失敗したリクエスト名
+        """
+        # (結果に記録する名前, エンドポイント名, リクエスト定義, ユニバース, 展開時のエラー)
+        tasks = []
         for name, config in requests.items():
-            logger.info(f"{config['description']}を開始します")
             try:
-                self._execute_request(name, config, base_dir)
-            except Exception as e:
+                universes = self._resolve_universes(name, config)
+            except ValueError as e:
                 logger.error(f"{name}の取得に失敗しました: {e}")
-                self.results["failure"].append(name)
+                tasks.append((name, name, config, None, e))
+                continue
+            if universes:
+                logger.info(f"{name}を {len(universes)} 件のユニバースに分けて実行します")
+                tasks.extend((f"{name}:{universe}", name, config, universe, None) for universe in universes)
             else:
-                self.results["success"].append(name)
+                tasks.append((name, name, config, None, None))
+
+        workers = max(1, min(self.max_workers, len(tasks)))
+        if len(tasks) > 1:
+            logger.info(f"{len(tasks)} 件のリクエストを最大 {workers} 並列で実行します")
+        remaining = self.client.get_remaining_quota()
+        if remaining:
+            logger.info(f"残りのリクエスト数: {', '.join(f'{k}={v}' for k, v in remaining.items())}")
+
+        def run(task: tuple) -> bool:
+            result_name, name, config, universe, error = task
+            if error:
+                return False
+            logger.info(f"{config['description']}を開始します{f'（{universe}）' if universe else ''}")
+            try:
+                self._execute_request(name, config, base_dir, universe)
+            except Exception as e:
+                logger.error(f"{result_name}の取得に失敗しました: {e}")
+                return False
+            return True
 
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(run, tasks))
+
+        for task, succeeded in zip(tasks, outcomes):
+            self.results["success" if succeeded else "failure"].append(task[0])
         return self.results
 
-    def _execute_request(self, name: str, config: dict, base_dir: str):
-        """個別リクエストを実行"""
+    def _resolve_universes(self, name: str, config: dict) -> List[str]:
+        """
+        ユニバース指定のエンドポイントについて、取得対象のユニバースを求める
+
+        リクエスト定義の markets で指定したユニバースを対象とし、markets: all の場合は
+        connection_config.yml の universes に定義した全ユニバースを対象とします。
+        markets を省略した場合はユニバースに分けずに1件のリクエストとして実行します。
+
+        Args:
+            name (str): エンドポイント名
+            config (dict): リクエスト定義
+
+        Returns:
+            List[str]: ユニバース名。ユニバースに分けない場合は空のリスト
+        """
+        markets = config.get('markets')
+        endpoint = self.endpoints.get(name)
+        if not markets or not endpoint or not endpoint.use_universe:
+            return []
+
+        defined = [universe for group in self.universes.values() for universe in group]
+        if markets == 'all':
+            return defined
+        if isinstance(markets, str):
+            markets = [markets]
+        unknown = [market for market in markets if market not in defined]
+        if unknown:
+            raise ValueError(f"未定義のユニバース: {', '.join(unknown)}")
+        return list(dict.fromkeys(markets))
+
+    def _execute_request(self, name: str, config: dict, base_dir: str, universe: Optional[str] = None) -> List[str]:
+        """個別リクエストを実行（universe を指定した場合はそのユニバースのデータを取得）"""
         try:
+            params = {}
+            if universe:
+                params['universe'] = universe
             if 'date_range' in config:
                 # 期間指定のリクエスト
                 date_range = config['date_range']
-                
-                # universe_next対応の処理追加
-                universe_next = None
-                page = 1
-                while True:
-                    # ページ番号付きのファイル名を生成
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    output_filename = f"{name}_{timestamp}"
-                    if page > 1:
-                        output_filename += f"_page{page}"
-                    output_filename += ".csv"
-                    output_path = os.path.join(base_dir, output_filename)
-
-                    # データ取得
-                    filepath, universe_next = self.client.request_data(
-                        endpoint=name,
-                        output_path=output_path,
-                        date_from=date_range.get('start_date'),
-                        date_to=date_range.get('end_date'),
-                        universe_next=universe_next
-                    )
-
-                    # 続きのデータがない場合は終了
-                    if not universe_next:
-                        break
-
-                    page += 1
-                    time.sleep(1)  # APIレート制限を考慮
+                params['date_from'] = date_range.get('start_date')
+                params['date_to'] = date_range.get('end_date')
+
+            # ページ番号付きのファイル名を生成（全ページで同じタイムスタンプを使用）
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            prefix = f"{name}_{universe}" if universe else name
+            extension = self.client.format
+
+            # 全ページを1ファイルに結合する場合は、1ページ目も含めてページ番号付きのファイルに保存し、
+            # 結合先を確定した後に削除する
+            merge_pages = config.get('merge_pages', self.merge_pages)
+
+            def output_path_for(page: int) -> str:
+                output_filename = f"{prefix}_{timestamp}"
+                if page > 1 or merge_pages:
+                    output_filename += f"_page{page}"
+                return os.path.join(base_dir, f"{output_filename}.{extension}")
+
+            merger = None
+            if merge_pages:
+                merger = PageMerger(os.path.join(base_dir, f"{prefix}_{timestamp}.{extension}"), extension)
+
+            return self._fetch_pages(name, params, output_path_for, merger)
 
-            else:
-                # 通常のリクエスト
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_filename = f"{name}_{timestamp}.csv"
-                output_path = os.path.join(base_dir, output_filename)
-                
-                # universe_next対応の処理追加
-                universe_next = None
-                page = 1
-                while True:
-                    if page > 1:
-                        output_filename = f"{name}_{timestamp}_page{page}.csv"
-                        output_path = os.path.join(base_dir, output_filename)
-
-                    filepath, universe_next = self.client.request_data(
-                        endpoint=name,
-                        output_path=output_path,
-                        universe_next=universe_next
-                    )
-
-                    # 続きのデータがない場合は終了
-                    if not universe_next:
-                        break
-
-                    page += 1
-                    time.sleep(1)  # APIレート制限を考慮
-                
-            self.results["success"].append(name)
-                
         except Exception as e:
-            logger.error(f"{name}の実行中にエラーが発生しました: {e}")
+            logger.error(f"{name}{f'（{universe}）' if universe else ''}の実行中にエラーが発生しました: {e}")
+            raise
+
+    def _fetch_pages(
+        self,
+        name: str,
+        params: dict,
+        output_path_for: Callable[[int], str],
+        merger: Optional[PageMerger] = None
+    ) -> List[str]:
+        """
+        universe_next のページを先行して要求しながら取得する
+
+        レスポンスヘッダーの x-universe-next を受信した時点で次のページを要求し、
+        本文の受信・保存はバックグラウンドの書き込みスレッドがページ順に行います。
+        先行して要求するページ数は collector.prefetch_pages までに制限し、
+        リクエストの間隔はクライアントのリクエスト数の制限のみで決まります。
+
+        Args:
+            name (str): エンドポイント名
+            params (dict): request_data に渡すパラメータ（universe_next 以外）
+            output_path_for (Callable[[int], str]): ページ番号（1から）から出力ファイルパスを求める関数
+            merger (Optional[PageMerger]): 指定した場合、保存したページを書き込みスレッドで順に結合する
+
+        Returns:
+            List[str]: 保存したファイルパス（ページ順）。結合した場合は結合したファイルパスのみ
+        """
+        pending = queue.Queue()
+        # 書き込み中のページ1つと、先行して要求したページの分だけレスポンス（接続）を保持する
+        open_responses = threading.Semaphore(self.prefetch_pages + 1)
+        filepaths: List[str] = []
+        errors: List[Exception] = []
+
+        def write_pages() -> None:
+            while True:
+                item = pending.get()
+                if item is None:
+                    return
+                page, universe_next, response = item
+                try:
+                    if errors:
+                        response.close()
+                        continue
+                    filepath = self._write_page(name, params, page, universe_next, response, output_path_for(page))
+                    if merger:
+                        merger.add_page(filepath, page, universe_next)
+                    filepaths.append(filepath)
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    open_responses.release()
+
+        writer = threading.Thread(target=write_pages, name=f"{name}-writer", daemon=True)
+        writer.start()
+        try:
+            universe_next = None
+            page = 1
+            while True:
+                open_responses.acquire()
+                if errors:
+                    break
+                try:
+                    response = self.client.open_response(endpoint=name, universe_next=universe_next, **params)
+                except Exception:
+                    open_responses.release()
+                    raise
+                next_universe_next = response.headers.get('x-universe-next')
+                pending.put((page, universe_next, response))
+
+                # 続きのデータがない場合は終了
+                if not next_universe_next:
+                    break
+
+                universe_next = next_universe_next
+                page += 1
+        except Exception:
+            pending.put(None)
+            writer.join()
+            if merger:
+                merger.abort()
             raise
+        pending.put(None)
+        writer.join()
+
+        if errors:
+            if merger:
+                merger.abort()
+            raise errors[0]
+        if len(filepaths) > 1:
+            logger.info(f"{name}: {len(filepaths)} ページを取得しました")
+        if merger:
+            return [merger.close()]
+        return filepaths
+
+    def _write_page(
+        self,
+        name: str,
+        params: dict,
+        page: int,
+        universe_next: Optional[str],
+        response,
+        output_path: str
+    ) -> str:
+        """
+        ページの本文をファイルに保存する
+
+        本文の受信中に通信エラーが発生した場合は、同じ universe_next でページを取得し直します
+        （request_data のリトライを適用）。
+        """
+        try:
+            return self.client.save_response(name, response, output_path)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"{name}: {page} ページ目の受信中にエラーが発生したため取得し直します: {e}")
+            filepath, _ = self.client.request_data(
+                endpoint=name,
+                output_path=output_path,
+                universe_next=universe_next,
+                **params
+            )
+            return filepath
+        finally:
+            response.close()
 
     def create_execution_report(self, mode: str, date: Optional[str] = None):
         """実行結果レポートを作成"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         execution_date = date or datetime.now().strftime("%Y%m%d")
         
-        if mode == 'daily':
-            report_dir = os.path.join("output/daily", execution_date, "reports")
-        else:
-            report_dir = os.path.join("output/spot", execution_date, "reports")
-            
+        report_dir = get_report_path(mode, execution_date)
         os.makedirs(report_dir, exist_ok=True)
         report_path = os.path.join(report_dir, f"execution_report_{timestamp}.txt")
         
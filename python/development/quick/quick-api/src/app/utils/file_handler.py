@@ -0,0 +1,168 @@
+import os
+import gzip
+import json
+from typing import BinaryIO, Dict, List, Optional
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ページのファイルを結合先へコピーする単位（バイト）
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _open_file(path: str, mode: str) -> BinaryIO:
+    """拡張子が .gz のファイルはgzipとして開く"""
+    return gzip.open(path, mode) if path.endswith('.gz') else open(path, mode)
+
+
+class PageMerger:
+    """universe_next の各ページを1つのファイルに結合する"""
+
+    def __init__(self, output_path: str, format_type: str):
+        """
+        Args:
+            output_path (str): 結合先のファイルパス。1ページ目が .gz で保存された場合は .gz を付加
+            format_type (str): レスポンス形式（"csv", "json", "tsv"）
+        """
+        self.output_path = output_path
+        self.format_type = format_type
+        self.pages: List[Dict[str, object]] = []
+        self._file: Optional[BinaryIO] = None
+        self._temp_file_path: Optional[str] = None
+        self._header: bytes = b''
+        self._ends_with_newline = True
+        self._json_items = 0
+        self._page_paths: List[str] = []
+
+    @property
+    def manifest_path(self) -> str:
+        """ページごとの行数を記録するマニフェストのパス"""
+        return f"{self.output_path}.manifest.json"
+
+    def add_page(self, page_path: str, page: int, universe_next: Optional[str] = None) -> int:
+        """
+        ページのファイルを結合先に追記する
+
+        CSV・TSVは2ページ目以降のヘッダー行を除き、JSONは各ページの配列の要素を1つの配列にまとめます。
+        ページはページ順に追加してください。ページのファイルは close で結合先を確定した後に削除します。
+
+        Args:
+            page_path (str): ページのファイルパス（.gz の場合は展開して読み込む）
+            page (int): ページ番号（1から）
+            universe_next (Optional[str]): このページの取得に使用した universe_next
+        Returns:
+            int: ページのデータ行数
+
+        Raises:
+            ValueError: CSV・TSVのヘッダー行が先頭のページと異なる場合
+        """
+        if self._file is None:
+            self._open_output(page_path.endswith('.gz'))
+
+        if self.format_type == 'json':
+            rows = self._append_json(page_path)
+        else:
+            rows = self._append_delimited(page_path)
+
+        self._page_paths.append(page_path)
+        self.pages.append({'page': page, 'universe_next': universe_next, 'rows': rows})
+        return rows
+
+    def close(self) -> str:
+        """
+        結合先のファイルを確定してマニフェストを書き込み、ページのファイルを削除する
+
+        Returns:
+            str: 結合したファイルパス
+        """
+        if self._file is None:
+            raise ValueError("結合するページがありません")
+        if self.format_type == 'json':
+            self._file.write(b']\n' if self._json_items else b'[]\n')
+        self._file.close()
+
+        manifest = {
+            'output': os.path.basename(self.output_path),
+            'format': self.format_type,
+            'total_rows': sum(p['rows'] for p in self.pages),
+            'pages': self.pages,
+        }
+        temp_manifest_path = f"{self.manifest_path}.tmp"
+        with open(temp_manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(self._temp_file_path, self.output_path)
+        os.replace(temp_manifest_path, self.manifest_path)
+
+        for page_path in self._page_paths:
+            os.remove(page_path)
+        logger.info(f"{len(self.pages)} ページを結合しました: {self.output_path}（{manifest['total_rows']:,} 行）")
+        return self.output_path
+
+    def abort(self) -> None:
+        """結合中のファイルを削除する（取得済みのページのファイルは残す）"""
+        if self._file is not None:
+            self._file.close()
+        for path in (self._temp_file_path, f"{self.manifest_path}.tmp"):
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    def _open_output(self, compress: bool) -> None:
+        """結合先の一時ファイル（.tmp）を開く"""
+        if compress and not self.output_path.endswith('.gz'):
+            self.output_path = f"{self.output_path}.gz"
+        os.makedirs(os.path.dirname(self.output_path) or '.', exist_ok=True)
+        self._temp_file_path = f"{self.output_path}.tmp"
+        self._file = gzip.open(self._temp_file_path, 'wb') if compress else open(self._temp_file_path, 'wb')
+
+    def _append_delimited(self, page_path: str) -> int:
+        """CSV・TSVのページを追記し、データ行数を返す（2ページ目以降はヘッダー行を除く）"""
+        rows = 0
+        in_quotes = False
+        last_chunk = b''
+        with _open_file(page_path, 'rb') as f:
+            header = f.readline()
+            # 空のページ（ヘッダー行もない）はヘッダーの判定に使用しない
+            if not self._header:
+                self._header = header
+                self._write(header)
+            elif header and header.rstrip(b'\r\n') != self._header.rstrip(b'\r\n'):
+                # 列の構成が異なる行を1つのファイルに混在させない
+                raise ValueError(f"ヘッダー行が先頭のページと異なるため結合できません: {page_path}")
+            # 前のページが改行で終わっていない場合は改行を補う
+            if not self._ends_with_newline:
+                self._write(b'\n')
+            while True:
+                chunk = f.read(COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                self._write(chunk)
+                # 引用符の外の改行を数える（引用符・改行はASCIIのため、文字コードに関わらずバイト列で判定できる）
+                parts = chunk.split(b'"')
+                for i, part in enumerate(parts):
+                    if not in_quotes:
+                        rows += part.count(b'\n')
+                    if i < len(parts) - 1:
+                        in_quotes = not in_quotes
+                last_chunk = chunk
+        # 最終行が改行で終わっていない場合
+        if last_chunk and not last_chunk.endswith(b'\n'):
+            rows += 1
+        return rows
+
+    def _append_json(self, page_path: str) -> int:
+        """JSONのページの配列の要素を追記する（配列でない場合は1要素として扱う）"""
+        with _open_file(page_path, 'rb') as f:
+            data = json.load(f)
+        items = data if isinstance(data, list) else [data]
+        for item in items:
+            self._write(b',\n' if self._json_items else b'[')
+            self._write(json.dumps(item, ensure_ascii=False).encode('utf-8'))
+            self._json_items += 1
+        return len(items)
+
+    def _write(self, data: bytes) -> None:
+        """結合先に書き込む"""
+        if not data:
+            return
+        self._file.write(data)
+        self._ends_with_newline = data.endswith(b'\n')
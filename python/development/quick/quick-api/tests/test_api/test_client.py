@@ -1,8 +1,14 @@
 import unittest
 from unittest.mock import patch, Mock, MagicMock
+import io
 import os
+import gzip
 import shutil
+import requests
+from urllib3 import HTTPResponse
+from urllib3.exceptions import ProtocolError
 from app.api.client import QuickApiClient
+from app.api.rate_limiter import QuotaLimiter
 from app.core.config import get_connection_config
 
 class TestQuickApiClient(unittest.TestCase):
@@ -16,10 +22,15 @@ class TestQuickApiClient(unittest.TestCase):
 
         # クライアントインスタンスの作成
         self.client = QuickApiClient(output_dir=self.test_output_dir)
+        # 実際の送信履歴（output/state）を使用しない
+        self.client.rate_limiter = QuotaLimiter(
+            os.path.join(self.test_output_dir, 'rate_limit.json'), {'per_10min': (360, 600)}
+        )
 
     def tearDown(self):
         """テスト後のクリーンアップ"""
         # テスト用の出力ディレクトリのクリーンアップ
+        self.client.close()
         if os.path.exists(self.test_output_dir):
             shutil.rmtree(self.test_output_dir)
 
@@ -44,24 +55,151 @@ class TestQuickApiClient(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.client._validate_format('invalid_format')
 
-    @patch('urllib.request.urlopen')
-    def test_request_data_success(self, mock_urlopen):
-        """データリクエスト成功のテスト"""
-        # モックレスポンスの設定
-        mock_response = Mock()
-        mock_response.info.return_value = {'Content-Encoding': 'identity'}
-        mock_response.read.return_value = b'test,data\n1,2\n'
-        mock_response.headers = {}
-        mock_urlopen.return_value.__enter__.return_value = mock_response
+    def _mock_response(self, body: bytes, status: int = 200, headers: dict = None) -> requests.Response:
+        """モックレスポンスを作成する"""
+        response = requests.Response()
+        response.status_code = status
+        response._content = body
+        response.raw = io.BytesIO(body)
+        response.headers.update(headers or {})
+        response.url = self.client.base_url
+        return response
 
-        output_path = os.path.join(self.test_output_dir, 'test_output.csv')
-        filepath, universe_next = self.client.request_data(
-            'quote_index',
-            output_path,
-            date='20231208'
-        )
+    def test_request_data_success(self):
+        """データリクエスト成功のテスト"""
+        with patch.object(self.client.session, 'get', return_value=self._mock_response(b'test,data\n1,2\n')) as mock_get:
+            output_path = os.path.join(self.test_output_dir, 'test_output.csv')
+            filepath, universe_next = self.client.request_data(
+                'quote_index',
+                output_path,
+                date='20231208'
+            )
 
         self.assertTrue(os.path.exists(filepath))
         with open(filepath, 'r') as f:
             content = f.read()
-            self.assertEqual(content, 'test,data\n1,2\n')
\ No newline at end of file
+            self.assertEqual(content, 'test,data\n1,2\n')
+        self.assertIsNone(universe_next)
+        mock_get.assert_called_once_with(
+            f"{self.client.base_url}/quote_index.csv?date=20231208", timeout=self.client.timeout, stream=True
+        )
+
+    def test_request_data_keep_gzip(self):
+        """gzip圧縮されたレスポンスを展開せずに保存するテスト"""
+        body = gzip.compress(b'test,data\n1,2\n')
+        response = self._mock_response(b'', headers={'Content-Encoding': 'gzip'})
+        response.raw = HTTPResponse(
+            body=io.BytesIO(body), headers={'Content-Encoding': 'gzip'}, preload_content=False
+        )
+        output_path = os.path.join(self.test_output_dir, 'test_output.csv')
+        with patch.object(self.client.session, 'get', return_value=response):
+            filepath, _ = self.client.request_data('quote_index', output_path, keep_gzip=True)
+
+        self.assertEqual(filepath, f"{output_path}.gz")
+        with open(filepath, 'rb') as f:
+            self.assertEqual(f.read(), body)
+        self.assertFalse(os.path.exists(output_path))
+
+    def test_request_data_keep_gzip_interrupted(self):
+        """gzip圧縮のまま保存する場合も、受信中の切断時にリトライすることのテスト"""
+        body = gzip.compress(b'test,data\n1,2\n')
+
+        def gzip_response(broken: bool) -> requests.Response:
+            response = self._mock_response(b'', headers={'Content-Encoding': 'gzip'})
+            response.raw = HTTPResponse(
+                body=io.BytesIO(body), headers={'Content-Encoding': 'gzip'}, preload_content=False
+            )
+            if broken:
+                response.raw.stream = Mock(side_effect=ProtocolError("接続が切断されました"))
+            return response
+
+        output_path = os.path.join(self.test_output_dir, 'test_output.csv')
+        with patch.object(self.client.session, 'get', side_effect=[gzip_response(True), gzip_response(False)]) as mock_get, \
+                patch('app.api.client.time.sleep'):
+            filepath, _ = self.client.request_data('quote_index', output_path, keep_gzip=True)
+
+        self.assertEqual(mock_get.call_count, 2)
+        with open(filepath, 'rb') as f:
+            self.assertEqual(f.read(), body)
+
+    def test_request_data_keep_gzip_uncompressed_response(self):
+        """圧縮されていないレスポンスを keep_gzip 指定時に圧縮して保存するテスト"""
+        output_path = os.path.join(self.test_output_dir, 'test_output.csv')
+        with patch.object(self.client.session, 'get', return_value=self._mock_response(b'test,data\n')):
+            filepath, _ = self.client.request_data('quote_index', output_path, keep_gzip=True)
+
+        with gzip.open(filepath, 'rb') as f:
+            self.assertEqual(f.read(), b'test,data\n')
+
+    def test_request_data_interrupted(self):
+        """受信中に失敗した場合に不完全なファイルを残さないことのテスト"""
+        def broken_stream(*args, **kwargs):
+            yield b'test,data\n'
+            raise requests.exceptions.ChunkedEncodingError("接続が切断されました")
+
+        responses = []
+        for _ in range(self.client.retry_settings.max_attempts + 1):
+            response = self._mock_response(b'')
+            response.iter_content = broken_stream
+            responses.append(response)
+        output_path = os.path.join(self.test_output_dir, 'test_output.csv')
+        with patch.object(self.client.session, 'get', side_effect=responses), \
+                patch('app.api.client.time.sleep'):
+            with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+                self.client.request_data('quote_index', output_path)
+
+        self.assertEqual(sorted(os.listdir(self.test_output_dir)), ['rate_limit.json', 'rate_limit.json.lock'])
+
+    def test_session_settings(self):
+        """接続を再利用するセッションの設定テスト"""
+        self.assertEqual(self.client.session.headers['Accept-Encoding'], 'gzip, deflate')
+        self.assertEqual(self.client.session.headers['Authorization'], f"Bearer {self.client.access_key}")
+        self.assertEqual(self.client.timeout, get_connection_config()['api']['timeout'])
+
+    def test_request_data_retry(self):
+        """5xxエラー時にリトライすることのテスト"""
+        responses = [
+            self._mock_response(b'', status=503),
+            self._mock_response(b'test,data\n', headers={'x-universe-next': 'next123'}),
+        ]
+        with patch.object(self.client.session, 'get', side_effect=responses) as mock_get, \
+                patch('app.api.client.time.sleep'):
+            _, universe_next = self.client.request_data(
+                'quote_index', os.path.join(self.test_output_dir, 'test_output.csv')
+            )
+
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(universe_next, 'next123')
+
+    def test_request_data_retry_budget(self):
+        """送信時と受信中のエラーで同じリトライ回数を消費することのテスト"""
+        def broken_stream(*args, **kwargs):
+            yield b'test,'
+            raise requests.exceptions.ChunkedEncodingError("接続が切断されました")
+
+        responses = [self._mock_response(b'', status=503)]
+        for _ in range(self.client.retry_settings.max_attempts + 1):
+            response = self._mock_response(b'')
+            response.iter_content = broken_stream
+            responses.append(response)
+        with patch.object(self.client.session, 'get', side_effect=responses) as mock_get, \
+                patch('app.api.client.time.sleep'):
+            with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+                self.client.request_data('quote_index', os.path.join(self.test_output_dir, 'test_output.csv'))
+
+        self.assertEqual(mock_get.call_count, self.client.retry_settings.max_attempts + 1)
+
+    def test_request_data_client_error(self):
+        """4xxエラー時はリトライせずに例外を送出することのテスト"""
+        with patch.object(self.client.session, 'get', return_value=self._mock_response(b'', status=404)) as mock_get:
+            with self.assertRaises(requests.exceptions.HTTPError):
+                self.client.request_data('quote_index', os.path.join(self.test_output_dir, 'test_output.csv'))
+
+        mock_get.assert_called_once()
+
+    def test_request_data_consumes_quota(self):
+        """リクエストごとに残りのリクエスト数が減ることのテスト"""
+        self.assertEqual(self.client.get_remaining_quota(), {'per_10min': 360})
+        with patch.object(self.client.session, 'get', return_value=self._mock_response(b'test,data\n')):
+            self.client.request_data('quote_index', os.path.join(self.test_output_dir, 'test_output.csv'))
+        self.assertEqual(self.client.get_remaining_quota(), {'per_10min': 359})
@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import patch
+import os
+import shutil
+import tempfile
+from app.api.rate_limiter import QuotaExceededError, QuotaLimiter
+
+class TestQuotaLimiter(unittest.TestCase):
+    """QuotaLimiterのテスト"""
+
+    def setUp(self):
+        """テストの前準備"""
+        self.work_dir = tempfile.mkdtemp()
+        self.state_path = os.path.join(self.work_dir, 'state', 'rate_limit.json')
+        self.now = 1_700_000_000.0
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.work_dir)
+
+    def _limiter(self, **kwargs) -> QuotaLimiter:
+        return QuotaLimiter(self.state_path, {'per_10min': (3, 600), 'per_day': (5, 86400)}, **kwargs)
+
+    def _sleep(self, seconds):
+        """time.sleep の代わりに時刻を進める"""
+        self.now += seconds
+
+    def test_remaining(self):
+        """残りのリクエスト数のテスト"""
+        limiter = self._limiter()
+        with patch('app.api.rate_limiter.time.time', side_effect=lambda: self.now):
+            self.assertEqual(limiter.remaining(), {'per_10min': 3, 'per_day': 5})
+            limiter.acquire()
+            limiter.acquire()
+            self.assertEqual(limiter.remaining(), {'per_10min': 1, 'per_day': 3})
+
+    def test_wait_until_window_expires(self):
+        """上限に達した場合、最も古いリクエストがウィンドウから外れるまでだけ待機することのテスト"""
+        limiter = self._limiter()
+        with patch('app.api.rate_limiter.time.time', side_effect=lambda: self.now), \
+                patch('app.api.rate_limiter.time.sleep', side_effect=self._sleep) as mock_sleep:
+            for _ in range(3):
+                self.assertEqual(limiter.acquire(), 0)
+                self.now += 10
+            waited = limiter.acquire()
+
+        mock_sleep.assert_called_once()
+        self.assertAlmostEqual(waited, 570)
+
+    def test_state_is_shared_between_instances(self):
+        """送信履歴が状態ファイルを通じて別のインスタンス（プロセス）と共有されることのテスト"""
+        with patch('app.api.rate_limiter.time.time', side_effect=lambda: self.now):
+            for _ in range(5):
+                self._limiter().acquire()
+                self.now += 600
+            self.assertEqual(self._limiter().remaining(), {'per_10min': 3, 'per_day': 0})
+
+    def test_max_wait_exceeded(self):
+        """待機時間が上限を超える場合に例外を送出することのテスト"""
+        limiter = self._limiter(max_wait_seconds=60)
+        with patch('app.api.rate_limiter.time.time', side_effect=lambda: self.now):
+            for _ in range(3):
+                limiter.acquire()
+            with self.assertRaises(QuotaExceededError) as context:
+                limiter.acquire()
+
+        self.assertAlmostEqual(context.exception.wait_seconds, 600)
@@ -1,5 +1,17 @@
 import unittest
-from app.core.config import get_connection_config
+from unittest.mock import patch
+import os
+import shutil
+import tempfile
+from app.core import config as config_module
+from app.core.config import (
+    PROJECT_ROOT,
+    EndpointSettings,
+    get_connection_config,
+    get_connection_settings,
+    get_input_path,
+    get_output_path,
+)
 
 class TestConfig(unittest.TestCase):
     """設定読み込み機能のテスト"""
@@ -12,4 +24,87 @@ class TestConfig(unittest.TestCase):
         self.assertIn('base_url', config['api'])
         self.assertIn('access_key', config['api'])
         # 必須項目の存在確認
-        self.assertIn('format', config['api'])
\ No newline at end of file
+        self.assertIn('format', config['api'])
+
+    def test_get_connection_settings(self):
+        """接続設定が検証済みのオブジェクトとして取得できることのテスト"""
+        settings = get_connection_settings()
+        self.assertIn(settings.api.format, config_module.VALID_FORMATS)
+        self.assertIsInstance(settings.endpoints['quote_index'], EndpointSettings)
+        self.assertTrue(os.path.isabs(settings.output_dir))
+
+    def test_config_is_cached(self):
+        """ファイルが更新されていない場合は再解析しないことのテスト"""
+        first = get_connection_settings()
+        with patch('app.core.config.yaml.safe_load') as mock_load:
+            self.assertIs(get_connection_settings(), first)
+            mock_load.assert_not_called()
+
+    def test_connection_config_returns_copy(self):
+        """呼び出し側の変更がキャッシュに影響しないことのテスト"""
+        config = get_connection_config()
+        config['api']['base_url'] = 'changed'
+        self.assertNotEqual(get_connection_config()['api']['base_url'], 'changed')
+
+    def test_paths_resolved_from_project_root(self):
+        """パスがカレントディレクトリではなくプロジェクトルートを基準に解決されることのテスト"""
+        cwd = os.getcwd()
+        work_dir = tempfile.mkdtemp()
+        try:
+            os.chdir(work_dir)
+            self.assertEqual(get_input_path('daily'), os.path.join(PROJECT_ROOT, 'input', 'daily', 'requests.yml'))
+            self.assertEqual(
+                get_output_path('spot', '20240101'),
+                os.path.join(PROJECT_ROOT, 'output', 'spot', '20240101', 'data')
+            )
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(work_dir)
+
+    def test_get_input_path_invalid(self):
+        """入力パスの引数が不正な場合のテスト"""
+        with self.assertRaises(ValueError):
+            get_input_path('spot')
+        with self.assertRaises(ValueError):
+            get_input_path('weekly')
+
+
+class TestConfigFile(unittest.TestCase):
+    """設定ファイルのキャッシュのテスト"""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.work_dir, 'connection_config.yml')
+        self._write('api:\n  base_url: "https://example.com/api/"\n  access_key: "key"\nendpoints: {}\n')
+        self.config_file = config_module._ConfigFile(self.path, config_module._parse_connection_config)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def _write(self, content: str, mtime: float = None):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        if mtime:
+            os.utime(self.path, (mtime, mtime))
+
+    def test_reload_on_change(self):
+        """ファイルの更新日時が変わった場合に読み込み直すことのテスト"""
+        settings = self.config_file.get()
+        self.assertEqual(settings.api.base_url, 'https://example.com/api')
+        self.assertIs(self.config_file.get(), settings)
+
+        self._write('api:\n  base_url: "https://example.com/v2"\n  access_key: "key"\nendpoints: {}\n',
+                    mtime=os.stat(self.path).st_mtime + 10)
+        self.assertEqual(self.config_file.get().api.base_url, 'https://example.com/v2')
+
+    def test_invalid_config(self):
+        """不正な設定の場合は例外を送出し、前回の設定を保持することのテスト"""
+        settings = self.config_file.get()
+        self._write('api:\n  base_url: "https://example.com"\n  access_key: "key"\n  format: "xml"\nendpoints: {}\n',
+                    mtime=os.stat(self.path).st_mtime + 10)
+        with self.assertRaises(ValueError):
+            self.config_file.get()
+
+        self._write('api:\n  base_url: "https://example.com/api/"\n  access_key: "key"\nendpoints: {}\n',
+                    mtime=os.stat(self.path).st_mtime + 10)
+        self.assertEqual(self.config_file.get(), settings)
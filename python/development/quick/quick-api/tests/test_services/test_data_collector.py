@@ -1,8 +1,12 @@
 import unittest
 from unittest.mock import patch, Mock
 import os
+import time
 import shutil
+import threading
+import json
 import yaml
+import requests
 from datetime import datetime
 from app.api.client import QuickApiClient
 from app.services.data_collector import DataCollector
@@ -25,6 +29,8 @@ class TestDataCollector(unittest.TestCase):
         os.makedirs(os.path.join(self.test_output_dir, 'spot'), exist_ok=True)
 
         self.mock_client = Mock(spec=QuickApiClient)
+        self.mock_client.get_remaining_quota.return_value = {}
+        self.mock_client.format = 'csv'
         self.collector = DataCollector(self.mock_client)
 
         # テスト用の設定をセットアップ
@@ -89,7 +95,8 @@ class TestDataCollector(unittest.TestCase):
             mock_get_config.return_value = self.test_config
             
             # モックの設定は最小限に
-            self.mock_client.request_data.return_value = ('test_file.csv', None)
+            self.mock_client.open_response.return_value = self._mock_response()
+            self.mock_client.save_response.side_effect = lambda endpoint, response, output_path: output_path
             
             # 実行
             results = self.collector.execute_spot_requests(test_date)
@@ -107,4 +114,175 @@ class TestDataCollector(unittest.TestCase):
             else:
                 # 有効なリクエストが存在しない場合
                 self.assertEqual(len(results['success']), 0)
-                self.assertEqual(len(results['failure']), 0)
\ No newline at end of file
+                self.assertEqual(len(results['failure']), 0)
+
+    def _mock_response(self, universe_next: str = None) -> Mock:
+        """x-universe-next ヘッダーを持つモックレスポンスを作成する"""
+        response = Mock()
+        response.headers = {'x-universe-next': universe_next} if universe_next else {}
+        return response
+
+    def _write_daily_definition(self, requests: dict) -> str:
+        """テスト用の日次定義ファイルを作成する"""
+        path = os.path.join(self.test_output_dir, 'daily', 'requests.yml')
+        with open(path, 'w', encoding='utf-8') as f:
+            yaml.safe_dump({'requests': requests}, f, allow_unicode=True, sort_keys=False)
+        return path
+
+    def test_execute_daily_requests_concurrently(self):
+        """日次リクエスト - 並列実行時も結果が定義順に記録されることのテスト"""
+        names = ['quote_index', 'domestic_stock', 'foreign_fund', 'domestic_fund']
+        definition_path = self._write_daily_definition(
+            {name: {'description': name} for name in names}
+        )
+        lock = threading.Lock()
+        state = {'active': 0, 'max_active': 0}
+
+        def open_response(endpoint, **kwargs):
+            with lock:
+                state['active'] += 1
+                state['max_active'] = max(state['max_active'], state['active'])
+            # 定義順と逆の順序で完了させる
+            time.sleep(0.05 * (len(names) - names.index(endpoint)))
+            with lock:
+                state['active'] -= 1
+            if endpoint == 'foreign_fund':
+                raise RuntimeError("テスト用のエラー")
+            return self._mock_response()
+
+        self.mock_client.open_response.side_effect = open_response
+        self.mock_client.save_response.side_effect = lambda endpoint, response, output_path: output_path
+        collector = DataCollector(self.mock_client, max_workers=2)
+
+        with patch('app.services.data_collector.get_input_path', return_value=definition_path), \
+                patch('app.services.data_collector.get_output_path', return_value=self.test_output_dir):
+            results = collector.execute_daily_requests()
+
+        self.assertEqual(results['success'], ['quote_index', 'domestic_stock', 'domestic_fund'])
+        self.assertEqual(results['failure'], ['foreign_fund'])
+        self.assertEqual(state['max_active'], 2)
+
+    def test_fetch_pages_prefetches_next_page(self):
+        """universe_next - 保存の完了を待たずに次のページを要求することのテスト"""
+        cursors = {None: 'cursor2', 'cursor2': 'cursor3', 'cursor3': None}
+        requested = []
+        first_page_saving = threading.Event()
+        next_page_requested = threading.Event()
+
+        def open_response(endpoint, universe_next=None, **kwargs):
+            requested.append(universe_next)
+            if universe_next is not None:
+                next_page_requested.set()
+            return self._mock_response(cursors[universe_next])
+
+        def save_response(endpoint, response, output_path):
+            if not first_page_saving.is_set():
+                first_page_saving.set()
+                # 1ページ目の保存中に2ページ目が要求されること
+                self.assertTrue(next_page_requested.wait(1.0))
+            return output_path
+
+        self.mock_client.open_response.side_effect = open_response
+        self.mock_client.save_response.side_effect = save_response
+
+        filepaths = self.collector._execute_request(
+            'domestic_stock', {'date_range': {'start_date': '20240101', 'end_date': '20240131'}},
+            self.test_output_dir
+        )
+
+        self.assertEqual(requested, [None, 'cursor2', 'cursor3'])
+        self.assertEqual(len(filepaths), 3)
+        self.assertTrue(filepaths[0].endswith('.csv'))
+        self.assertTrue(filepaths[1].endswith('_page2.csv'))
+        self.assertTrue(filepaths[2].endswith('_page3.csv'))
+        for call in self.mock_client.open_response.call_args_list:
+            self.assertEqual(call.kwargs['date_from'], '20240101')
+            self.assertEqual(call.kwargs['date_to'], '20240131')
+
+    def test_fetch_pages_refetches_page_on_body_error(self):
+        """universe_next - 本文の受信中のエラー時に同じページを取得し直すことのテスト"""
+        self.mock_client.open_response.return_value = self._mock_response()
+        self.mock_client.save_response.side_effect = requests.exceptions.ChunkedEncodingError("切断")
+        self.mock_client.request_data.side_effect = lambda endpoint, output_path, **kwargs: (output_path, None)
+
+        filepaths = self.collector._execute_request('quote_index', {}, self.test_output_dir)
+
+        self.assertEqual(len(filepaths), 1)
+        self.mock_client.request_data.assert_called_once()
+        self.assertIsNone(self.mock_client.request_data.call_args.kwargs['universe_next'])
+
+    def test_fetch_pages_merges_pages_into_single_file(self):
+        """universe_next - merge_pages 指定時に全ページを1ファイルに結合することのテスト"""
+        cursors = {None: 'cursor2', 'cursor2': None}
+        bodies = {None: b'code,price\n1301,100\n1332,200\n', 'cursor2': b'code,price\n1333,300\n'}
+
+        def open_response(endpoint, universe_next=None, **kwargs):
+            response = self._mock_response(cursors[universe_next])
+            response.body = bodies[universe_next]
+            return response
+
+        def save_response(endpoint, response, output_path):
+            with open(output_path, 'wb') as f:
+                f.write(response.body)
+            return output_path
+
+        self.mock_client.open_response.side_effect = open_response
+        self.mock_client.save_response.side_effect = save_response
+
+        filepaths = self.collector._execute_request('domestic_stock', {'merge_pages': True}, self.test_output_dir)
+
+        self.assertEqual(len(filepaths), 1)
+        with open(filepaths[0], 'rb') as f:
+            self.assertEqual(f.read(), b'code,price\n1301,100\n1332,200\n1333,300\n')
+        # ページのファイルは結合後に削除される
+        self.assertFalse(any('_page' in f for f in os.listdir(self.test_output_dir)))
+        with open(f"{filepaths[0]}.manifest.json", encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest['total_rows'], 3)
+        self.assertEqual([p['rows'] for p in manifest['pages']], [2, 1])
+
+    def test_execute_requests_fans_out_universes(self):
+        """ユニバース指定 - markets のユニバースごとに並列実行し、結果をユニバースごとに記録することのテスト"""
+        lock = threading.Lock()
+        requested = []
+
+        def open_response(endpoint, universe=None, **kwargs):
+            with lock:
+                requested.append(universe)
+            if universe == 'hk_stock':
+                raise RuntimeError("テスト用のエラー")
+            return self._mock_response()
+
+        self.mock_client.open_response.side_effect = open_response
+        self.mock_client.save_response.side_effect = lambda endpoint, response, output_path: output_path
+        collector = DataCollector(self.mock_client, max_workers=3)
+
+        results = collector._execute_requests({
+            'foreign_stock': {'description': '海外株', 'markets': ['usa_stock', 'hk_stock', 'lse_stock']},
+            'quote_index': {'description': '各種指標'},
+        }, self.test_output_dir)
+
+        self.assertEqual(set(requested), {None, 'hk_stock', 'lse_stock', 'usa_stock'})
+        self.assertEqual(results['success'], ['foreign_stock:usa_stock', 'foreign_stock:lse_stock', 'quote_index'])
+        self.assertEqual(results['failure'], ['foreign_stock:hk_stock'])
+
+    def test_resolve_universes(self):
+        """ユニバース指定 - 対象ユニバースの解決のテスト"""
+        all_universes = [u for group in self.real_connection_config['universes'].values() for u in group]
+        self.assertEqual(self.collector._resolve_universes('foreign_stock', {'markets': 'all'}), all_universes)
+        # markets を省略した場合はユニバースに分けない
+        self.assertEqual(self.collector._resolve_universes('foreign_stock', {}), [])
+        self.assertEqual(self.collector._resolve_universes('foreign_stock', {'markets': 'usa_stock'}), ['usa_stock'])
+        self.assertEqual(self.collector._resolve_universes('quote_index', {'markets': ['usa_stock']}), [])
+        with self.assertRaises(ValueError):
+            self.collector._resolve_universes('foreign_stock', {'markets': ['unknown_stock']})
+
+    def test_execute_request_with_universe(self):
+        """ユニバース指定 - universe を渡し、出力ファイル名にユニバース名を含めることのテスト"""
+        self.mock_client.open_response.return_value = self._mock_response()
+        self.mock_client.save_response.side_effect = lambda endpoint, response, output_path: output_path
+
+        filepaths = self.collector._execute_request('foreign_stock', {}, self.test_output_dir, 'usa_stock')
+
+        self.assertEqual(self.mock_client.open_response.call_args.kwargs['universe'], 'usa_stock')
+        self.assertTrue(os.path.basename(filepaths[0]).startswith('foreign_stock_usa_stock_'))
@@ -0,0 +1,102 @@
+import unittest
+import os
+import gzip
+import json
+import shutil
+import tempfile
+from app.utils.file_handler import PageMerger
+
+class TestPageMerger(unittest.TestCase):
+    """PageMergerのテスト"""
+
+    def setUp(self):
+        """テストの前準備"""
+        self.work_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        shutil.rmtree(self.work_dir)
+
+    def _write_page(self, filename: str, body: bytes) -> str:
+        path = os.path.join(self.work_dir, filename)
+        opener = gzip.open if filename.endswith('.gz') else open
+        with opener(path, 'wb') as f:
+            f.write(body)
+        return path
+
+    def _read_manifest(self, merger: PageMerger) -> dict:
+        with open(merger.manifest_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_merge_csv_pages(self):
+        """CSV - 2ページ目以降のヘッダー行を除いて結合することのテスト"""
+        merger = PageMerger(os.path.join(self.work_dir, 'stock.csv'), 'csv')
+        merger.add_page(self._write_page('p1.csv', b'code,name\r\n1301,"A\r\nB"\r\n'), 1)
+        # 最終行が改行で終わらないページ
+        merger.add_page(self._write_page('p2.csv', b'code,name\r\n1332,C'), 2, 'cursor2')
+        merger.add_page(self._write_page('p3.csv', b'code,name\r\n1333,D\r\n'), 3, 'cursor3')
+        output_path = merger.close()
+
+        with open(output_path, 'rb') as f:
+            self.assertEqual(f.read(), b'code,name\r\n1301,"A\r\nB"\r\n1332,C\n1333,D\r\n')
+        manifest = self._read_manifest(merger)
+        self.assertEqual(manifest['total_rows'], 3)
+        self.assertEqual(
+            [(p['page'], p['universe_next'], p['rows']) for p in manifest['pages']],
+            [(1, None, 1), (2, 'cursor2', 1), (3, 'cursor3', 1)]
+        )
+        # ページのファイルは結合先を確定した後に削除される
+        self.assertEqual(sorted(os.listdir(self.work_dir)), ['stock.csv', 'stock.csv.manifest.json'])
+
+    def test_merge_csv_empty_first_page(self):
+        """CSV - 1ページ目が空の場合は次のページのヘッダー行を使用することのテスト"""
+        merger = PageMerger(os.path.join(self.work_dir, 'stock.csv'), 'csv')
+        merger.add_page(self._write_page('p1.csv', b''), 1)
+        merger.add_page(self._write_page('p2.csv', b'code,name\r\n1301,A\r\n'), 2, 'cursor2')
+        merger.add_page(self._write_page('p3.csv', b'code,name\r\n1332,B\r\n'), 3, 'cursor3')
+        output_path = merger.close()
+
+        with open(output_path, 'rb') as f:
+            self.assertEqual(f.read(), b'code,name\r\n1301,A\r\n1332,B\r\n')
+        self.assertEqual(self._read_manifest(merger)['total_rows'], 2)
+
+    def test_merge_csv_header_mismatch(self):
+        """CSV - ヘッダー行が先頭のページと異なる場合はエラーとすることのテスト"""
+        merger = PageMerger(os.path.join(self.work_dir, 'stock.csv'), 'csv')
+        merger.add_page(self._write_page('p1.csv', b'code,name\r\n1301,A\r\n'), 1)
+        with self.assertRaises(ValueError):
+            merger.add_page(self._write_page('p2.csv', b'code,price\r\n1332,100\r\n'), 2, 'cursor2')
+        merger.abort()
+
+        # 結合中のファイルは残さない
+        self.assertEqual(sorted(os.listdir(self.work_dir)), ['p1.csv', 'p2.csv'])
+
+    def test_merge_json_pages(self):
+        """JSON - 各ページの配列を1つの配列に結合することのテスト"""
+        merger = PageMerger(os.path.join(self.work_dir, 'fund.json'), 'json')
+        merger.add_page(self._write_page('p1.json', json.dumps([{'code': 1}, {'code': 2}]).encode()), 1)
+        merger.add_page(self._write_page('p2.json', json.dumps([{'code': 3}]).encode()), 2, 'cursor2')
+        output_path = merger.close()
+
+        with open(output_path, encoding='utf-8') as f:
+            self.assertEqual(json.load(f), [{'code': 1}, {'code': 2}, {'code': 3}])
+        self.assertEqual(self._read_manifest(merger)['total_rows'], 3)
+
+    def test_merge_gzip_pages(self):
+        """gzip - ページが .gz の場合は結合先も gzip 圧縮することのテスト"""
+        merger = PageMerger(os.path.join(self.work_dir, 'stock.tsv'), 'tsv')
+        merger.add_page(self._write_page('p1.tsv.gz', b'code\tname\n1301\tA\n'), 1)
+        merger.add_page(self._write_page('p2.tsv.gz', b'code\tname\n1332\tB\n'), 2, 'cursor2')
+        output_path = merger.close()
+
+        self.assertTrue(output_path.endswith('stock.tsv.gz'))
+        with gzip.open(output_path, 'rb') as f:
+            self.assertEqual(f.read(), b'code\tname\n1301\tA\n1332\tB\n')
+
+    def test_abort(self):
+        """中断時に結合中のファイルを残さず、取得済みのページのファイルは残すことのテスト"""
+        merger = PageMerger(os.path.join(self.work_dir, 'stock.csv'), 'csv')
+        merger.add_page(self._write_page('p1.csv', b'code\n1301\n'), 1)
+        merger.abort()
+
+        self.assertEqual(os.listdir(self.work_dir), ['p1.csv'])
@@ -5,7 +5,7 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import requests
 from requests.exceptions import RequestException
-from app.core.config import get_connection_config, get_output_path
+from app.core.config import get_connection_settings, get_output_path
 from app.core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -53,16 +53,16 @@ class SFMCClient:
             mode (str): 実行モード ('daily' or 'spot')
             date (str): 実行日付 (YYYYMMDD形式)
         """
-        # 基本設定の読み込み
-        self.config = get_connection_config()
+        # 基本設定の読み込み（検証済みの設定オブジェクト）
+        self.settings = get_connection_settings()
         # 各種エンドポイントの設定
-        self.auth_url = self.config['sfmc']['base_url']['auth'].rstrip('/')
-        self.rest_url = self.config['sfmc']['base_url']['rest'].rstrip('/')
-        self.soap_url = self.config['sfmc']['base_url']['soap'].rstrip('/')
+        self.auth_url = self.settings.sfmc.auth_url
+        self.rest_url = self.settings.sfmc.rest_url
+        self.soap_url = self.settings.sfmc.soap_url
         # 認証情報
-        self.client_id = self.config['sfmc']['client_id']
-        self.client_secret = self.config['sfmc']['client_secret']
-        self.retry_config = self.config['retry']
+        self.client_id = self.settings.sfmc.client_id
+        self.client_secret = self.settings.sfmc.client_secret
+        self.retry_settings = self.settings.retry
         
         # 実行モードと出力設定
         self.mode = mode
@@ -74,8 +74,8 @@ class SFMCClient:
         self.token_expiry = None
         
         # レート制限の初期化
-        self.rate_limiter = RateLimiter(self.config['rate_limits']['rest_api'])
-        self.msg_rate_limiter = RateLimiter(self.config['rate_limits']['transactional_messaging'])
+        self.rate_limiter = RateLimiter(self.settings.rate_limits['rest_api'])
+        self.msg_rate_limiter = RateLimiter(self.settings.rate_limits['transactional_messaging'])
         
         # 初期設定の実行
         self._init_proxy_settings()
@@ -87,11 +87,11 @@ class SFMCClient:
     def _init_proxy_settings(self) -> None:
         """プロキシ設定の初期化"""
         self.proxies = None
-        if self.config.get('use_proxy', False) and self.config.get('proxies'):
-            proxy = self.config['proxies']
+        proxy = self.settings.proxy
+        if proxy:
             self.proxies = {
-                'http': f"http://{proxy['host']}:{proxy['port']}",
-                'https': f"https://{proxy['host']}:{proxy['port']}"
+                'http': f"http://{proxy.host}:{proxy.port}",
+                'https': f"https://{proxy.host}:{proxy.port}"
             }
             logger.info("プロキシ設定を適用しました")
         else:
@@ -106,10 +106,10 @@ class SFMCClient:
     # プライベートメソッド: 認証関連
     def _get_auth_token(self) -> str:
         """認証トークンを取得または更新"""
-        if self.access_token and self.token_expiry and datetime.now() < self.token_expiry - timedelta(seconds=self.config['sfmc']['auth']['token_refresh_margin_seconds']):
+        if self.access_token and self.token_expiry and datetime.now() < self.token_expiry - timedelta(seconds=self.settings.sfmc.token_refresh_margin_seconds):
             return self.access_token
 
-        auth_url = f"{self.auth_url}{self.config['sfmc']['auth']['token_endpoint']}"
+        auth_url = f"{self.auth_url}{self.settings.sfmc.token_endpoint}"
         payload = {
             "grant_type": "client_credentials",
             "client_id": self.client_id,
@@ -121,7 +121,7 @@ class SFMCClient:
                 auth_url,
                 json=payload,
                 proxies=self.proxies,
-                timeout=self.config['sfmc']['connection']['timeout_seconds']
+                timeout=self.settings.sfmc.timeout_seconds
             )
             response.raise_for_status()
             token_data = response.json()
@@ -172,9 +172,9 @@ class SFMCClient:
         else:
             self.rate_limiter.wait_if_needed()
 
-        retry_wait = self.retry_config.get('initial_wait_seconds', 1.0)
-        retry_limit = self.retry_config.get('max_attempts', 2)
-        backoff_factor = self.retry_config.get('backoff_factor', 2)
+        retry_wait = self.retry_settings.initial_wait_seconds
+        retry_limit = self.retry_settings.max_attempts
+        backoff_factor = self.retry_settings.backoff_factor
 
         for retry_count in range(retry_limit + 1):
             try:
@@ -187,7 +187,7 @@ class SFMCClient:
                 )
                 
                 # レスポンスコードのチェック
-                if response.status_code in self.retry_config['status_forcelist']:
+                if response.status_code in self.retry_settings.status_forcelist:
                     if retry_count >= retry_limit:
                         response.raise_for_status()
                     wait_time = retry_wait * (backoff_factor ** retry_count)
@@ -210,7 +210,7 @@ class SFMCClient:
                         pass
 
                 # 特定のエラーは即座に再スロー
-                if e.response and e.response.status_code in self.retry_config['status_blacklist']:
+                if e.response and e.response.status_code in self.retry_settings.status_blacklist:
                     raise
 
                 if retry_count >= retry_limit:
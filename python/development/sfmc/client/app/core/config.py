@@ -1,41 +1,283 @@
 import os
+import copy
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
 import yaml
 
+# プロジェクトルート（app/core/config.py の2階層上）。相対パスはカレントディレクトリではなくここを基準に解決する
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+CONFIG_DIR = os.path.join(PROJECT_ROOT, 'input', 'config')
+
+
+def resolve_path(path: str) -> str:
+    """
+    プロジェクトルートを基準にパスを解決する
+
+    Args:
+        path (str): パス（絶対パスの場合はそのまま返す）
+
+    Returns:
+        str: 絶対パス
+    """
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+
+
+@dataclass(frozen=True)
+class SfmcSettings:
+    """SFMC API基本設定"""
+    auth_url: str
+    rest_url: str
+    soap_url: str
+    client_id: str
+    client_secret: str
+    account_id: Optional[str]
+    token_endpoint: str
+    token_refresh_margin_seconds: float
+    timeout_seconds: float
+
+
+@dataclass(frozen=True)
+class RetrySettings:
+    """リトライ設定"""
+    max_attempts: int = 2
+    initial_wait_seconds: float = 1.0
+    backoff_factor: float = 2
+    status_forcelist: Tuple[int, ...] = ()
+    status_blacklist: Tuple[int, ...] = ()
+
+
+@dataclass(frozen=True)
+class ProxySettings:
+    """プロキシ設定"""
+    host: str
+    port: int
+
+
+@dataclass(frozen=True)
+class ConnectionSettings:
+    """接続設定（connection_config.yml）"""
+    sfmc: SfmcSettings
+    retry: RetrySettings
+    rate_limits: Dict[str, Dict[str, int]]
+    proxy: Optional[ProxySettings]
+    raw: Dict[str, Any] = field(repr=False)
+
+
+@dataclass(frozen=True)
+class DirectorySettings:
+    """モードごとのディレクトリ設定（base_dir はプロジェクトルートを基準に解決済み）"""
+    base_dir: str
+    daily_dir: str
+    spot_dir: str
+
+    def mode_dir(self, mode: str) -> str:
+        if mode == 'daily':
+            return os.path.join(self.base_dir, self.daily_dir)
+        elif mode == 'spot':
+            return os.path.join(self.base_dir, self.spot_dir)
+        else:
+            raise ValueError(f"無効なmode: {mode}")
+
+
+@dataclass(frozen=True)
+class RequestSettings:
+    """リクエスト設定（request_config.yml）"""
+    input: DirectorySettings
+    output: DirectorySettings
+    request_file: str
+    raw: Dict[str, Any] = field(repr=False)
+
+    def input_path(self, mode: str, date: str = None) -> str:
+        """処理対象ファイルのパス"""
+        if mode == 'spot' and not date:
+            raise ValueError("スポット実行にはdate引数が必要です")
+        if mode == 'daily':
+            return os.path.join(self.input.mode_dir(mode), self.request_file)
+        return os.path.join(self.input.mode_dir(mode), date, self.request_file)
+
+    def output_path(self, mode: str, date: str) -> str:
+        """出力ディレクトリ"""
+        return os.path.join(self.output.mode_dir(mode), date, 'data')
+
+
+class _ConfigFile:
+    """
+    YAMLの設定ファイルと解析結果のキャッシュ
+
+    解析結果は初回の読み込み時に作成し、ファイルの更新日時・サイズが変わった場合のみ読み込み直します。
+    解析（検証）に失敗した場合はキャッシュを更新せずに例外を送出します。
+    """
+
+    def __init__(self, path: str, parser: Callable[[Dict[str, Any]], Any]):
+        self.path = path
+        self._parser = parser
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._value = None
+
+    def get(self) -> Any:
+        stat = os.stat(self.path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if stamp != self._stamp:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    raw = yaml.safe_load(f) or {}
+                self._value = self._parser(raw)
+                self._stamp = stamp
+            return self._value
+
+
+def _section(raw: Dict[str, Any], key: str, filename: str, required: bool = True) -> Dict[str, Any]:
+    """設定のセクション（辞書）を取得する"""
+    value = raw.get(key)
+    if value is None and not required:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError(f"{filename} の設定が不正です: {key} セクションがありません")
+    return value
+
+
+def _require(section: Dict[str, Any], key: str, name: str, filename: str, value_type: type = str) -> Any:
+    """必須の設定値を取得し、型を検証する"""
+    value = section.get(key)
+    if value is None or value == '':
+        raise ValueError(f"{filename} の設定が不正です: {name} がありません")
+    if not isinstance(value, value_type):
+        raise ValueError(f"{filename} の設定が不正です: {name} の値が不正です（{value!r}）")
+    return value
+
+
+def _number(section: Dict[str, Any], key: str, name: str, filename: str, default, value_type: type = float):
+    """数値の設定値を取得する（未設定の場合は default）"""
+    value = section.get(key, default)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise ValueError(f"{filename} の設定が不正です: {name} には0以上の数値を指定してください（{value!r}）")
+    return value_type(value)
+
+
+def _parse_connection_config(raw: Dict[str, Any]) -> ConnectionSettings:
+    filename = 'connection_config.yml'
+    sfmc = _section(raw, 'sfmc', filename)
+    base_url = _section(sfmc, 'base_url', filename)
+    auth = _section(sfmc, 'auth', filename)
+    connection = _section(sfmc, 'connection', filename, required=False)
+    sfmc_settings = SfmcSettings(
+        auth_url=_require(base_url, 'auth', 'sfmc.base_url.auth', filename).rstrip('/'),
+        rest_url=_require(base_url, 'rest', 'sfmc.base_url.rest', filename).rstrip('/'),
+        soap_url=_require(base_url, 'soap', 'sfmc.base_url.soap', filename).rstrip('/'),
+        client_id=_require(sfmc, 'client_id', 'sfmc.client_id', filename),
+        client_secret=_require(sfmc, 'client_secret', 'sfmc.client_secret', filename),
+        account_id=sfmc.get('account_id'),
+        token_endpoint=_require(auth, 'token_endpoint', 'sfmc.auth.token_endpoint', filename),
+        token_refresh_margin_seconds=_number(
+            auth, 'token_refresh_margin_seconds', 'sfmc.auth.token_refresh_margin_seconds', filename, 300
+        ),
+        timeout_seconds=_number(connection, 'timeout_seconds', 'sfmc.connection.timeout_seconds', filename, 30),
+    )
+
+    retry = _section(raw, 'retry', filename, required=False)
+    retry_settings = RetrySettings(
+        max_attempts=_number(retry, 'max_attempts', 'retry.max_attempts', filename, 2, int),
+        initial_wait_seconds=_number(retry, 'initial_wait_seconds', 'retry.initial_wait_seconds', filename, 1.0),
+        backoff_factor=_number(retry, 'backoff_factor', 'retry.backoff_factor', filename, 2),
+        status_forcelist=tuple(retry.get('status_forcelist', ())),
+        status_blacklist=tuple(retry.get('status_blacklist', ())),
+    )
+
+    rate_limits = _section(raw, 'rate_limits', filename)
+    for name in ('rest_api', 'transactional_messaging'):
+        limits = _section(rate_limits, name, filename)
+        per_minute = _require(limits, 'per_minute', f"rate_limits.{name}.per_minute", filename, int)
+        if isinstance(per_minute, bool) or per_minute < 1:
+            raise ValueError(f"{filename} の設定が不正です: rate_limits.{name}.per_minute には1以上の整数を指定してください（{per_minute!r}）")
+
+    proxy_settings = None
+    if raw.get('use_proxy', False):
+        proxies = _section(raw, 'proxies', filename)
+        proxy_settings = ProxySettings(
+            host=_require(proxies, 'host', 'proxies.host', filename),
+            port=_require(proxies, 'port', 'proxies.port', filename, int),
+        )
+
+    return ConnectionSettings(
+        sfmc=sfmc_settings,
+        retry=retry_settings,
+        rate_limits=rate_limits,
+        proxy=proxy_settings,
+        raw=raw,
+    )
+
+
+def _parse_directories(raw: Dict[str, Any], key: str, filename: str) -> DirectorySettings:
+    section = _section(raw, key, filename)
+    return DirectorySettings(
+        base_dir=resolve_path(_require(section, 'base_dir', f"{key}.base_dir", filename)),
+        daily_dir=_require(section, 'daily_dir', f"{key}.daily_dir", filename),
+        spot_dir=_require(section, 'spot_dir', f"{key}.spot_dir", filename),
+    )
+
+
+def _parse_request_config(raw: Dict[str, Any]) -> RequestSettings:
+    filename = 'request_config.yml'
+    return RequestSettings(
+        input=_parse_directories(raw, 'input', filename),
+        output=_parse_directories(raw, 'output', filename),
+        request_file=_require(_section(raw, 'input', filename), 'request_file', 'input.request_file', filename),
+        raw=raw,
+    )
+
+
+_connection_config = _ConfigFile(os.path.join(CONFIG_DIR, 'connection_config.yml'), _parse_connection_config)
+_request_config = _ConfigFile(os.path.join(CONFIG_DIR, 'request_config.yml'), _parse_request_config)
+
+
+def get_connection_settings() -> ConnectionSettings:
+    """
+    接続設定を検証済みのオブジェクトとして取得する
+
+    ファイルの解析は初回と、ファイルが更新された場合のみ行います。
+
+    Returns:
+        ConnectionSettings: 接続設定
+
+    Raises:
+        ValueError: 設定が不正な場合
+    """
+    return _connection_config.get()
+
+
+def get_request_settings() -> RequestSettings:
+    """
+    リクエスト設定を検証済みのオブジェクトとして取得する
+
+    Returns:
+        RequestSettings: リクエスト設定（パスはプロジェクトルートを基準に解決済み）
+
+    Raises:
+        ValueError: 設定が不正な場合
+    """
+    return _request_config.get()
+
+
 def get_connection_config():
     """
     接続設定を取得する。
+
+    キャッシュした解析結果の複製を返すため、呼び出し側で変更しても構いません。
     """
-    with open('input/config/connection_config.yml', 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
-    return config
+    return copy.deepcopy(get_connection_settings().raw)
 
 def get_request_config():
     """リクエスト設定を取得する"""
-    with open('input/config/request_config.yml', 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
-    return config
+    return copy.deepcopy(get_request_settings().raw)
 
 def get_input_path(mode: str, date: str = None) -> str:
     """入力パスを取得する"""
-    request_config = get_request_config()
-    base_dir = request_config['input']['base_dir']
-    request_file = request_config['input']['request_file']
-    if mode == 'daily':
-        return os.path.join(base_dir, request_config['input']['daily_dir'], request_file)
-    elif mode == 'spot':
-        if not date:
-            raise ValueError("スポット実行にはdate引数が必要です")
-        return os.path.join(base_dir, request_config['input']['spot_dir'], date, request_file)
-    else:
-        raise ValueError(f"無効なmode: {mode}")
+    return get_request_settings().input_path(mode, date)
 
 def get_output_path(mode: str, date: str) -> str:
     """出力パスを取得する"""
-    request_config = get_request_config()
-    base_dir = request_config['output']['base_dir']
-    if mode == 'daily':
-        return os.path.join(base_dir, request_config['output']['daily_dir'], date, 'data')
-    elif mode == 'spot':
-        return os.path.join(base_dir, request_config['output']['spot_dir'], date, 'data')
-    else:
-        raise ValueError(f"無効なmode: {mode}")
\ No newline at end of file
+    return get_request_settings().output_path(mode, date)
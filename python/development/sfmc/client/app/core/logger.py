@@ -1,18 +1,26 @@
+import os
 import logging
 import logging.config
 import yaml
+from app.core.config import CONFIG_DIR, resolve_path
 
 def setup_logging():
     """
     ログの設定を行う。
+
+    設定ファイルとログファイルのパスは、カレントディレクトリではなくプロジェクトルートを基準に解決する。
     """
-    with open('input/config/logging_config.yml', 'r', encoding='utf-8') as f:
+    with open(os.path.join(CONFIG_DIR, 'logging_config.yml'), 'r', encoding='utf-8') as f:
         config = yaml.safe_load(f.read())
-        logging.config.dictConfig(config)
+    for handler in config.get('handlers', {}).values():
+        if 'filename' in handler:
+            handler['filename'] = resolve_path(handler['filename'])
+            os.makedirs(os.path.dirname(handler['filename']), exist_ok=True)
+    logging.config.dictConfig(config)
 
 def get_logger(name):
     """
     ロガーを取得する。
     """
     logger = logging.getLogger(name)
-    return logger
\ No newline at end of file
+    return logger